@@ -19,6 +19,7 @@ LOCAL_APPS = [
     "core.authentication.apps.AuthenticationConfig",
     "core.calendar.apps.CalendarConfig",
     "core.events.apps.EventsConfig",
+    "core.sync.apps.SyncConfig",
     "core.users.apps.UsersConfig",
 ]
 
@@ -40,22 +41,25 @@ INSTALLED_APPS: list[str] = [
     "django.contrib.messages",
     "whitenoise.runserver_nostatic",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     *THIRD_PARTY_APPS,
     *LOCAL_APPS,
 ]
 
 
 MIDDLEWARE: list[str] = [
+    # First, to time the whole chain. See `config.settings.profiling`.
+    "core.common.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.common.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "easyaudit.middleware.easyaudit.EasyAuditMiddleware",
+    "core.common.middleware.EasyAuditMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -80,26 +84,9 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 ASGI_APPLICATION = "config.asgi.application"
 
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
-    },
-}
-
-
-# Database
-# https://docs.djangoproject.com/en/3.0/ref/settings/#databases
-
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
-        "NAME": env.str("DB_NAME"),
-        "USER": env.str("DB_USER"),
-        "PASSWORD": env.str("DB_PASSWORD"),
-        "HOST": env.str("DB_HOST"),
-        "PORT": env.str("DB_PORT"),
-    },
-}
+# Serve the event and calendar list/detail reads with async views (`core.api.async_views`).
+# Only worth it under ASGI: under WSGI every async view runs in its own event loop.
+API_ASYNC_VIEWS = env.bool("API_ASYNC_VIEWS", default=False)
 
 
 # Password validation
@@ -168,6 +155,13 @@ from config.settings.logging import *  # noqa
 from config.settings.cors import *  # noqa
 from config.settings.files_and_storages import *  # noqa
 from config.settings.sessions import *  # noqa
+from config.settings.cache import *  # noqa
+from config.settings.database import *  # noqa
+from config.settings.events import *  # noqa
+from config.settings.sync import *  # noqa
+from config.settings.channel_layers import *  # noqa
+from config.settings.audit import *  # noqa
+from config.settings.profiling import *  # noqa
 
 from config.settings.debug_toolbar.settings import *  # noqa
 from config.settings.debug_toolbar.setup import DebugToolbarSetup  # noqa
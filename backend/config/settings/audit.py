@@ -0,0 +1,30 @@
+from config.env import env
+
+"""
+https://github.com/soynatan/django-easy-audit#settings
+"""
+
+# Materialized occurrences are derived data, written in bulk.
+DJANGO_EASY_AUDIT_UNREGISTERED_CLASSES_EXTRA = ["events.EventOccurrence"]
+
+# Restrict auditing to these models (`app_label.ModelName`) / URL regexes, empty means everything.
+DJANGO_EASY_AUDIT_REGISTERED_CLASSES = env.list("AUDIT_MODELS", default=[])
+DJANGO_EASY_AUDIT_REGISTERED_URLS = env.list("AUDIT_URLS", default=[])
+DJANGO_EASY_AUDIT_UNREGISTERED_URLS_EXTRA = env.list("AUDIT_EXCLUDED_URLS", default=[])
+DJANGO_EASY_AUDIT_WATCH_REQUEST_EVENTS = env.bool("AUDIT_REQUEST_EVENTS", default=True)
+
+# The acting user comes from the authenticated request, no need to load it again for every audited write.
+DJANGO_EASY_AUDIT_CHECK_IF_REQUEST_USER_EXISTS = False
+
+# Audit rows are buffered and written in batches by a background thread, see `core.common.audit`.
+# `AUDIT_ASYNC=False` goes back to one INSERT per audited write, inside the request.
+DJANGO_EASY_AUDIT_LOGGING_BACKEND = "core.common.audit.BatchedAuditBackend"
+AUDIT_ASYNC = env.bool("AUDIT_ASYNC", default=True)
+AUDIT_BATCH_SIZE = env.int("AUDIT_BATCH_SIZE", default=500)
+AUDIT_FLUSH_INTERVAL = env.float("AUDIT_FLUSH_INTERVAL", default=1.0)  # seconds
+# Backpressure: once `AUDIT_QUEUE_SIZE` events are waiting, writers block for up to
+# `AUDIT_QUEUE_TIMEOUT` seconds and then write their event themselves.
+AUDIT_QUEUE_SIZE = env.int("AUDIT_QUEUE_SIZE", default=10_000)
+AUDIT_QUEUE_TIMEOUT = env.float("AUDIT_QUEUE_TIMEOUT", default=0.5)
+# Batches that can not be written are appended here (JSON lines) and retried on the next start.
+AUDIT_SPOOL_PATH = env("AUDIT_SPOOL_PATH", default="")
@@ -0,0 +1,25 @@
+from config.env import env
+
+"""
+https://docs.djangoproject.com/en/5.0/topics/cache/
+
+`DJANGO_CACHE_URL` examples:
+
+    locmemcache://                      per process, fine for a single worker and for tests
+    filecache:///var/tmp/django_cache   shared by every process of the host
+
+The `sessions` cache backs the `cached_db` and `cache` session modes (see
+`config.settings.sessions`). With `SESSION_MODE=cache` it is the only copy of the
+sessions: it has to be shared by every worker and must not evict live entries.
+"""
+CACHES = {
+    "default": env.cache("DJANGO_CACHE_URL", default="locmemcache://"),
+    "sessions": env.cache("DJANGO_SESSION_CACHE_URL", default="locmemcache://sessions"),
+}
+
+# Per-user response cache of the calendar/event reads, see `core.common.cache`.
+# Invalidation goes through the cache itself, so with several worker processes
+# the backend has to be shared between them (i.e. not `locmemcache://`).
+API_CACHE_ENABLED = env.bool("API_CACHE_ENABLED", default=False)
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = env.int("API_CACHE_TIMEOUT", default=300)
@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+
+from config.env import env
+
+"""
+`CHANNEL_LAYER_MODE`:
+
+    memory  `InMemoryChannelLayer`: messages never leave their process, fine for a single
+            server process only
+    unix    `core.common.channel_layers.UnixSocketChannelLayer`: the in-memory layer of every
+            process, fanned out to the other processes of the host over Unix datagram sockets
+            in `CHANNEL_LAYER_SOCKET_DIR`. Use it as soon as there is more than one worker.
+"""
+CHANNEL_LAYER_BACKENDS = {
+    "memory": "channels.layers.InMemoryChannelLayer",
+    "unix": "core.common.channel_layers.UnixSocketChannelLayer",
+}
+
+CHANNEL_LAYER_MODE = env("CHANNEL_LAYER_MODE", default="memory")
+
+if CHANNEL_LAYER_MODE not in CHANNEL_LAYER_BACKENDS:
+    raise ImproperlyConfigured(
+        f"CHANNEL_LAYER_MODE must be one of {", ".join(CHANNEL_LAYER_BACKENDS)}, not {CHANNEL_LAYER_MODE!r}",
+    )
+
+CHANNEL_LAYER_CONFIG = {
+    # Seconds a message waits to be received, and a channel stays in a group.
+    "expiry": env.int("CHANNEL_LAYER_EXPIRY", default=60),
+    "group_expiry": env.int("CHANNEL_LAYER_GROUP_EXPIRY", default=86400),
+    # Messages waiting per channel, past that they are dropped.
+    "capacity": env.int("CHANNEL_LAYER_CAPACITY", default=100),
+}
+
+if CHANNEL_LAYER_MODE == "unix":
+    # Shared by the processes of one deployment, and only by them.
+    CHANNEL_LAYER_CONFIG["directory"] = env(
+        "CHANNEL_LAYER_SOCKET_DIR",
+        default=os.path.join(tempfile.gettempdir(), "django-channels"),
+    )
+
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": CHANNEL_LAYER_BACKENDS[CHANNEL_LAYER_MODE],
+        "CONFIG": CHANNEL_LAYER_CONFIG,
+    },
+}
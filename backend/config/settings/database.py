@@ -0,0 +1,66 @@
+from django.core.exceptions import ImproperlyConfigured
+
+from config.env import env
+
+"""
+https://docs.djangoproject.com/en/5.0/ref/databases/#persistent-connections
+
+`DB_CONNECTION_MODE`:
+
+    close       a connection per request, opened by its first query and closed at its end. Every
+                request pays for the connection setup (TCP, TLS, authentication, backend start)
+    persistent  every thread keeps its connection for `DB_CONN_MAX_AGE` seconds. Right for sync
+                and gthread workers, whose threads live as long as the worker; not under ASGI,
+                which runs every request in a new thread
+    pool        `core.common.postgresql_pool`: every process lends up to `DB_POOL_SIZE`
+                connections to its requests, whatever their threads
+
+The processes of a host share `DB_MAX_CONNECTIONS` (keep it under Postgres' `max_connections`,
+minus what migrations, cron jobs and other hosts need): by default a pool gets its share for
+the `WEB_CONCURRENCY` worker processes of the host.
+"""
+DB_CONNECTION_MODES = ["close", "persistent", "pool"]
+
+DB_CONNECTION_MODE = env("DB_CONNECTION_MODE", default="close")
+
+if DB_CONNECTION_MODE not in DB_CONNECTION_MODES:
+    raise ImproperlyConfigured(
+        f"DB_CONNECTION_MODE must be one of {", ".join(DB_CONNECTION_MODES)}, not {DB_CONNECTION_MODE!r}",
+    )
+
+# Ping a reused connection before its first query of a request, reconnecting when it is gone.
+DB_CONN_HEALTH_CHECKS = env.bool("DB_CONN_HEALTH_CHECKS", default=True)
+DB_CONN_MAX_AGE = env.int("DB_CONN_MAX_AGE", default=600)
+
+DB_MAX_CONNECTIONS = env.int("DB_MAX_CONNECTIONS", default=80)
+WEB_CONCURRENCY = env.int("WEB_CONCURRENCY", default=1)
+DB_POOL_SIZE = env.int("DB_POOL_SIZE", default=max(1, DB_MAX_CONNECTIONS // WEB_CONCURRENCY))
+
+DEFAULT_DATABASE = {
+    "ENGINE": "django.db.backends.postgresql_psycopg2",
+    "NAME": env.str("DB_NAME"),
+    "USER": env.str("DB_USER"),
+    "PASSWORD": env.str("DB_PASSWORD"),
+    "HOST": env.str("DB_HOST"),
+    "PORT": env.str("DB_PORT"),
+}
+
+if DB_CONNECTION_MODE == "persistent":
+    DEFAULT_DATABASE["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+    DEFAULT_DATABASE["CONN_HEALTH_CHECKS"] = DB_CONN_HEALTH_CHECKS
+
+if DB_CONNECTION_MODE == "pool":
+    DEFAULT_DATABASE["ENGINE"] = "core.common.postgresql_pool"
+    DEFAULT_DATABASE["OPTIONS"] = {
+        "pool": {
+            "max_size": DB_POOL_SIZE,
+            "timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+            "max_idle": env.float("DB_POOL_MAX_IDLE", default=300.0),
+            "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=3600.0),
+            "check": DB_CONN_HEALTH_CHECKS,
+        },
+    }
+
+DATABASES = {
+    "default": DEFAULT_DATABASE,
+}
@@ -0,0 +1,15 @@
+from config.env import env
+
+# Keep an `EventOccurrence` table in sync with the events, see `core.events.models.EventOccurrence`.
+EVENT_OCCURRENCES_MATERIALIZED = env.bool("EVENT_OCCURRENCES_MATERIALIZED", default=False)
+EVENT_OCCURRENCES_HORIZON_DAYS = env.int("EVENT_OCCURRENCES_HORIZON_DAYS", default=548)  # ~18 months
+# How far back occurrences are kept, older ones are expanded on the fly. Raising it only reaches
+# back for the occurrences materialized afterwards.
+EVENT_OCCURRENCES_RETENTION_DAYS = env.int("EVENT_OCCURRENCES_RETENTION_DAYS", default=90)
+
+# The most events a single bulk create/update/delete request may carry.
+EVENT_BULK_MAX_ITEMS = env.int("EVENT_BULK_MAX_ITEMS", default=10_000)
+
+# How far past the later of two series starts the conflict check walks monthly and yearly series,
+# see `core.events.conflicts`.
+EVENT_CONFLICT_HORIZON_DAYS = env.int("EVENT_CONFLICT_HORIZON_DAYS", default=730)
@@ -36,6 +36,15 @@ HANDLERS = {
         "backupCount": 5,
         "maxBytes": 1024 * 1024 * 5,  # 5 MB
     },
+    "profiling_handler": {
+        "class": "logging.handlers.RotatingFileHandler",
+        "filename": f"{BASE_DIR}/logs/profiling.log",
+        "mode": "a",
+        "encoding": "utf-8",
+        "formatter": "simple",
+        "backupCount": 5,
+        "maxBytes": 1024 * 1024 * 5,  # 5 MB
+    },
 }
 
 LOGGERS = (
@@ -50,6 +59,11 @@ LOGGERS = (
             "level": "WARNING",
             "propagate": False,
         },
+        "core.common.profiling": {
+            "handlers": ["console_handler", "profiling_handler"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 )
 
@@ -0,0 +1,26 @@
+from django.core.exceptions import ImproperlyConfigured
+
+from config.env import env
+
+"""
+`core.common.profiling.ProfilingMiddleware`: logs the wall time, the SQL and the serialization
+time of a sample of the requests, and of the ones sending `PROFILING_HEADER: <PROFILING_TOKEN>`
+(which also get them back in a `Server-Timing` header). Off by default, when it is not in the
+middleware chain at all.
+"""
+
+# Fraction of the requests profiled, from 0 to 1.
+PROFILING_SAMPLE_RATE = env.float("PROFILING_SAMPLE_RATE", default=0.0)
+
+if not 0 <= PROFILING_SAMPLE_RATE <= 1:
+    raise ImproperlyConfigured(f"PROFILING_SAMPLE_RATE must be between 0 and 1, not {PROFILING_SAMPLE_RATE}")
+
+# Empty: profiling can not be asked for with the header.
+PROFILING_TOKEN = env("PROFILING_TOKEN", default="")
+PROFILING_HEADER = env("PROFILING_HEADER", default="X-Profile")
+
+# Run the sampled requests under cProfile too (the requested ones always are), and dump the stats
+# of the ones slower than `PROFILING_SLOW_MS` into `PROFILING_DIR` (empty: never).
+PROFILING_CPROFILE = env.bool("PROFILING_CPROFILE", default=False)
+PROFILING_SLOW_MS = env.float("PROFILING_SLOW_MS", default=500.0)
+PROFILING_DIR = env("PROFILING_DIR", default="")
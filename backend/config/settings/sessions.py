@@ -1,3 +1,5 @@
+from django.core.exceptions import ImproperlyConfigured
+
 from config.env import env
 
 """
@@ -5,7 +7,33 @@ Do read:
 
     1. https://docs.djangoproject.com/en/5.0/ref/settings/#sessions
     2. https://developer.mozilla.org/en-US/docs/Web/HTTP/Cookies
+    3. https://docs.djangoproject.com/en/5.0/topics/http/sessions/#configuring-the-session-engine
+
+`SESSION_MODE`:
+
+    db              every authenticated request reads `django_session`, `login()` writes it
+    cached_db       reads go to the `sessions` cache first, writes go to both
+    cache           sessions only live in the `sessions` cache, see `DJANGO_SESSION_CACHE_URL`
+    signed_cookies  the session is the (signed, not encrypted) cookie itself, nothing is stored
+                    server side and a session can not be revoked before it expires
+
+Expired sessions of the `db` and `cached_db` modes are removed by `manage.py purge_expired_sessions`.
 """
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+SESSION_MODE = env("SESSION_MODE", default="db")
+
+if SESSION_MODE not in SESSION_ENGINES:
+    raise ImproperlyConfigured(f"SESSION_MODE must be one of {", ".join(SESSION_ENGINES)}, not {SESSION_MODE!r}")
+
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+SESSION_CACHE_ALIAS = "sessions"
+
 SESSION_COOKIE_AGE = env.int("SESSION_COOKIE_AGE", default=86400)  # 1 day in seconds
 SESSION_COOKIE_HTTPONLY = env.bool("SESSION_COOKIE_HTTPONLY", default=True)
 SESSION_COOKIE_NAME = env("SESSION_COOKIE_NAME", default="sessionid")
@@ -13,3 +41,10 @@ SESSION_COOKIE_SAMESITE = env("SESSION_COOKIE_SAMESITE", default="Lax")
 SESSION_COOKIE_SECURE = env.bool("SESSION_COOKIE_SECURE", default=False)
 
 CSRF_USE_SESSIONS = env.bool("CSRF_USE_SESSIONS", default=True)
+
+# How long (in seconds) an API process may reuse the user it loaded for a session key,
+# see `core.authentication.sessions`. `0` disables the cache. A logout or a password
+# change reaches the other worker processes through the `sessions` cache, right away
+# when it is shared between them, after up to this long otherwise.
+SESSION_USER_CACHE_TTL = env.int("SESSION_USER_CACHE_TTL", default=30)
+SESSION_USER_CACHE_MAX_ENTRIES = env.int("SESSION_USER_CACHE_MAX_ENTRIES", default=10_000)
@@ -0,0 +1,10 @@
+from config.env import env
+
+# Sync tokens trail the time they are issued by this many seconds, so that rows written by
+# transactions still in flight at that time are sent next time; clients get them twice at worst.
+SYNC_TOKEN_LAG_SECONDS = env.int("SYNC_TOKEN_LAG_SECONDS", default=120)
+# Tombstones of deleted rows are kept this long, older sync tokens are rejected (410) and
+# clients have to sync from scratch.
+SYNC_TOMBSTONE_RETENTION_DAYS = env.int("SYNC_TOMBSTONE_RETENTION_DAYS", default=90)
+# Push changes to the WebSocket clients of the users concerned (`ws/changes/`), see `core.sync.notifications`.
+SYNC_PUSH_ENABLED = env.bool("SYNC_PUSH_ENABLED", default=True)
@@ -0,0 +1,73 @@
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .exception_handler import drf_exception_handler
+from .mixins import aauthenticate
+
+
+class AsyncApiView(View):
+    """
+    Base of the async variants of the read APIs, for ASGI servers (see `API_ASYNC_VIEWS`).
+
+    DRF views are sync only, so this is a plain Django view with `async def` handlers. It gives
+    them what `ApiAuthMixin` and `APIView` give the sync ones: a DRF `Request` (`query_params`,
+    `user`), session authentication, `IsAuthenticated`, the error format of `drf_exception_handler`,
+    and handlers returning DRF `Response`s, rendered with the same `JSONRenderer`. Both variants of
+    an endpoint answer alike.
+    """
+
+    renderer = JSONRenderer()
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request)
+
+        try:
+            user = await aauthenticate(request._request)
+
+            if user is None:
+                raise exceptions.NotAuthenticated()
+
+            request.user = user
+            response = await super().dispatch(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(request, exc)
+
+        return self.finalize_response(response)
+
+    def handle_exception(self, request, exc):
+        response = drf_exception_handler(exc, {"view": self, "request": request})
+
+        if response is None:
+            raise exc
+
+        # Like `APIView`: the session authentication sends no `WWW-Authenticate` header, hence no 401.
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response.status_code = 403
+
+        return response
+
+    def finalize_response(self, response):
+        """
+        Renders a DRF `Response` right away: Django would render it in a worker thread.
+        Always JSON, there is no browsable API here (hence no `Vary: Accept` either).
+        """
+        if not isinstance(response, Response):
+            return response
+
+        content = self.renderer.render(response.data)
+        rendered = HttpResponse(content, status=response.status_code, content_type=self.renderer.media_type)
+
+        if not content:
+            del rendered["Content-Type"]
+
+        for header, value in response.items():
+            if header.lower() != "content-type":
+                rendered[header] = value
+
+        rendered["Allow"] = ", ".join(self._allowed_methods())
+
+        return rendered
@@ -0,0 +1,53 @@
+"""
+Conditional GET support: `ETag` / `If-None-Match`.
+
+The ETag of a response is derived from a cheap version of the rows it is made of
+(see e.g. `get_user_data_version`), not from the response body, so a matching
+request is answered with `304 Not Modified` before the rows are even loaded.
+
+The version must be read before the response is built: if a write lands in
+between, the client gets fresh data with an older ETag and simply reloads once more.
+Views backed by the response cache use the user's cache generation as the version
+instead (see `user_cache_version`), which is also what the cached body is keyed by.
+"""
+
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(request, *version) -> str:
+    """
+    Weak ETag for the request's URL as seen by `request.user`, at the given data `version`.
+    """
+    query = "&".join(f"{key}={value}" for key, values in sorted(request.query_params.lists()) for value in values)
+    parts = [request.path, query, str(request.user.pk), *[str(part) for part in version]]
+    digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False).hexdigest()
+
+    return f"W/{quote_etag(digest)}"
+
+
+def etag_matches(request, etag: str) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+
+    if not if_none_match:
+        return False
+
+    # `If-None-Match` uses the weak comparison: the `W/` prefix does not matter.
+    etags = parse_etags(if_none_match)
+
+    return "*" in etags or etag.removeprefix("W/") in [value.removeprefix("W/") for value in etags]
+
+
+def not_modified(etag: str) -> Response:
+    return set_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    response["ETag"] = etag
+    # The body depends on the session, never reuse it for someone else.
+    response["Cache-Control"] = "private, no-cache"
+
+    return response
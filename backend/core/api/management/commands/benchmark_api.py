@@ -0,0 +1,494 @@
+import functools
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable
+
+import django
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.api.management.commands.check_query_counts import WINDOW
+from core.calendar.models import Calendar
+from core.events.management.commands.benchmark_bulk_events import event_payload
+from core.events.models import Event
+from core.events.services import event_bulk_create
+from core.users.models import User
+
+PASSWORD = "benchmark-password"
+
+# The rules of the seeded events, in turn: one-off events, then every kind of series `RecurrenceExpander` handles.
+RECURRENCES = [
+    {"frequency": "none"},
+    {"frequency": "none"},
+    {"frequency": "DAILY", "repeat_count": 30},
+    {"frequency": "WEEKLY", "weekdays": [1, 3, 5]},
+    {"frequency": "WEEKLY", "interval": 2, "weekdays": [2]},
+    {"frequency": "MONTHLY", "monthly_type": "DATE"},
+    {"frequency": "MONTHLY", "monthly_type": "WEEKDAY", "weekdays": [4], "weekday_ordinal": 2},
+    {"frequency": "YEARLY", "end_date": date(2030, 1, 1)},
+]
+
+# A request ready to be sent, its setup (creating what it deletes, ...) done.
+Request = Callable[[], HttpResponse]
+
+
+def seed_user(*, calendars: int, events_per_calendar: int) -> User:
+    user = User.objects.create_user(
+        email=f"benchmark-{uuid.uuid4().hex}@example.com",
+        password=PASSWORD,
+        first_name="Benchmark",
+        last_name="User",
+        phone_number=uuid.uuid4().int % 10**12,
+    )
+    user_calendars = Calendar.objects.bulk_create(
+        [
+            Calendar(user=user, name=f"Calendar {index}", description="Seeded", color="#3B82F6")
+            for index in range(calendars)
+        ],
+    )
+    start = datetime(2025, 11, 1, 9, tzinfo=timezone.utc)
+
+    events = []
+    for index in range(calendars * events_per_calendar):
+        # Spread over the four months around `WINDOW`.
+        start_time = start + timedelta(hours=index * 37 % (24 * 120))
+        events.append(
+            {
+                "calendar": user_calendars[index % calendars],
+                "title": f"Event {index}",
+                "description": f"Seeded event {index} of {user.email}",
+                "start_time": start_time,
+                "end_time": start_time + timedelta(hours=1),
+                "color": "#3B82F6",
+                "is_all_day": False,
+                "interval": 1,
+                **RECURRENCES[index % len(RECURRENCES)],
+            },
+        )
+
+    event_bulk_create(user=user, events=events)
+
+    return user
+
+
+def seed(*, users: int, calendars: int, events_per_calendar: int) -> list[User]:
+    """
+    `users` accounts of `calendars` calendars holding `events_per_calendar` events each. The requests are
+    sent as the first one; the others are there for the selectors to filter out.
+    """
+    return [seed_user(calendars=calendars, events_per_calendar=events_per_calendar) for _ in range(users)]
+
+
+def endpoints(user: User, *, bulk_size: int) -> dict[str, Callable[[int], list[Request]]]:
+    """
+    Every endpoint of `core.api.urls`, as a function building `count` requests to it.
+    """
+    client = Client()
+    client.force_login(user)
+
+    calendar = user.calendars.first()
+    events = list(user.events.order_by("start_time"))
+
+    @functools.cache
+    def scratch() -> Calendar:
+        # Where the writes go, leaving the seeded calendars as they are.
+        return Calendar.objects.create(user=user, name="Scratch", color="#3B82F6")
+
+    def get(path: str) -> Callable[[int], list[Request]]:
+        return lambda count: [lambda: client.get(path)] * count
+
+    def json_request(method: str, path: str, data) -> Request:
+        return lambda: getattr(client, method)(path, json.dumps(data), content_type="application/json")
+
+    def login(count):
+        return [
+            lambda: Client().post(
+                reverse("api:authentication:auth-login"),
+                {"email": user.email, "password": PASSWORD},
+            ),
+        ] * count
+
+    def logout(count):
+        clients = [Client() for _ in range(count)]
+
+        for logged_in in clients:
+            logged_in.force_login(user)
+
+        return [lambda c=c: c.get(reverse("api:authentication:auth-logout")) for c in clients]
+
+    def register(count):
+        return [
+            lambda: Client().post(
+                reverse("api:authentication:user-register"),
+                {
+                    "email": f"benchmark-{uuid.uuid4().hex}@example.com",
+                    "password": PASSWORD,
+                    "first_name": "Benchmark",
+                    "last_name": "User",
+                    "phone_number": str(uuid.uuid4().int % 10**12),
+                },
+            ),
+        ] * count
+
+    def event_detail(count):
+        return [
+            lambda e=events[index % len(events)]: client.get(
+                reverse("api:events:event-detail", kwargs={"event_id": e.id}),
+            )
+            for index in range(count)
+        ]
+
+    def event_create(count):
+        return [
+            json_request("post", reverse("api:events:event-create"), event_payload(calendar=scratch(), index=index))
+            for index in range(count)
+        ]
+
+    def event_update(count):
+        return [
+            json_request(
+                "put",
+                reverse("api:events:event-update", kwargs={"event_id": event.id}),
+                {**event_payload(calendar=scratch(), index=index), "title": f"Updated {index}"},
+            )
+            for index, event in enumerate(created_events(count))
+        ]
+
+    def created_events(count: int) -> list[Event]:
+        return event_bulk_create(
+            user=user,
+            events=[
+                {
+                    "calendar": scratch(),
+                    "title": f"Disposable {index}",
+                    "description": "",
+                    "start_time": datetime(2026, 1, 1, 9, tzinfo=timezone.utc) + timedelta(hours=index),
+                    "end_time": datetime(2026, 1, 1, 10, tzinfo=timezone.utc) + timedelta(hours=index),
+                    "is_all_day": False,
+                    "frequency": "none",
+                    "interval": 1,
+                }
+                for index in range(count)
+            ],
+        )
+
+    def event_delete(count):
+        return [
+            lambda e=event: client.delete(reverse("api:events:event-delete", kwargs={"event_id": e.id}))
+            for event in created_events(count)
+        ]
+
+    def event_bulk_create_requests(count):
+        payload = [event_payload(calendar=scratch(), index=index) for index in range(bulk_size)]
+        return [json_request("post", reverse("api:events:event-bulk-create"), {"events": payload})] * count
+
+    def event_bulk_update(count):
+        payload = [
+            {**event_payload(calendar=scratch(), index=index), "id": str(event.id), "title": f"Updated {index}"}
+            for index, event in enumerate(created_events(bulk_size))
+        ]
+        return [json_request("put", reverse("api:events:event-bulk-update"), {"events": payload})] * count
+
+    def event_bulk_delete(count):
+        ids = [str(event.id) for event in created_events(count * bulk_size)]
+        return [
+            json_request("post", reverse("api:events:event-bulk-delete"), {"ids": ids[start : start + bulk_size]})
+            for start in range(0, len(ids), bulk_size)
+        ]
+
+    def calendar_payload(index: int) -> dict:
+        return {"name": f"Calendar {index}", "description": "", "color": "#10B981", "is_visible": True}
+
+    def calendar_create(count):
+        return [
+            json_request("post", reverse("api:calendar:calendar-create"), calendar_payload(index))
+            for index in range(count)
+        ]
+
+    def calendar_update(count):
+        path = reverse("api:calendar:calendar-update", kwargs={"calendar_id": scratch().id})
+        return [json_request("put", path, calendar_payload(index)) for index in range(count)]
+
+    def calendar_delete(count):
+        calendars = Calendar.objects.bulk_create(
+            [Calendar(user=user, name=f"Disposable {index}", color="#3B82F6") for index in range(count)],
+        )
+        return [
+            lambda c=c: client.delete(reverse("api:calendar:calendar-delete", kwargs={"calendar_id": c.id}))
+            for c in calendars
+        ]
+
+    def calendar_import(count):
+        # What the export of a seeded calendar holds, into a calendar of its own.
+        export = client.get(reverse("api:calendar:calendar-export", kwargs={"calendar_id": calendar.id}))
+        ics = b"".join(export.streaming_content)
+        target = Calendar.objects.create(user=user, name="Imported", color="#3B82F6")
+        path = reverse("api:calendar:calendar-import", kwargs={"calendar_id": target.id})
+
+        return [
+            lambda: client.post(path, {"file": SimpleUploadedFile("calendar.ics", ics, content_type="text/calendar")}),
+        ] * count
+
+    def sync_delta(count):
+        token = client.get(reverse("api:sync:sync")).json()["token"]
+        return get(f"{reverse("api:sync:sync")}?token={token}")(count)
+
+    calendar_list = reverse("api:calendar:calendar-list")
+    event_list = reverse("api:events:event-list")
+
+    # The reads first, on the seeded data only.
+    return {
+        "auth-me": get(reverse("api:authentication:user-details")),
+        "event-list": get(event_list),
+        "event-list (window)": get(f"{event_list}?{WINDOW}"),
+        "event-occurrences": get(f"{reverse("api:events:event-occurrences")}?{WINDOW}"),
+        "event-freebusy": get(f"{reverse("api:events:event-freebusy")}?{WINDOW}"),
+        "event-search": get(f"{reverse("api:events:event-search")}?q=seeded event"),
+        "event-detail": event_detail,
+        "calendar-list": get(calendar_list),
+        "calendar-list (window)": get(f"{calendar_list}?{WINDOW}"),
+        "calendar-detail": get(reverse("api:calendar:calendar-detail", kwargs={"calendar_id": calendar.id})),
+        "calendar-export": get(reverse("api:calendar:calendar-export", kwargs={"calendar_id": calendar.id})),
+        "sync": get(reverse("api:sync:sync")),
+        "sync (delta)": sync_delta,
+        "event-create": event_create,
+        "event-update": event_update,
+        "event-delete": event_delete,
+        "event-bulk-create": event_bulk_create_requests,
+        "event-bulk-update": event_bulk_update,
+        "event-bulk-delete": event_bulk_delete,
+        "calendar-create": calendar_create,
+        "calendar-update": calendar_update,
+        "calendar-delete": calendar_delete,
+        "calendar-import": calendar_import,
+        "auth-login": login,
+        "auth-logout": logout,
+        "auth-register": register,
+    }
+
+
+def send(name: str, request: Request) -> HttpResponse:
+    response = request()
+
+    # The export streams: generating it is part of the request.
+    if response.streaming:
+        b"".join(response.streaming_content)
+
+    if response.status_code >= 300:
+        raise CommandError(f"{name} returned {response.status_code}: {response.content[:200]!r}")
+
+    return response
+
+
+def measure(name: str, build: Callable[[int], list[Request]], *, iterations: int, warmup: int, samples: int) -> dict:
+    """
+    Response times of `iterations` requests, then the queries and the peak of memory allocated by
+    `samples` more, traced (which slows them down) apart from the timed ones.
+    """
+    for request in build(warmup):
+        send(name, request)
+
+    timings = []
+    for request in build(iterations):
+        started = time.perf_counter()
+        send(name, request)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    queries = []
+    allocations = []
+    tracemalloc.start()
+
+    try:
+        for request in build(samples):
+            tracemalloc.reset_peak()
+            allocated = tracemalloc.get_traced_memory()[0]
+
+            with CaptureQueriesContext(connection) as captured:
+                send(name, request)
+
+            queries.append(len(captured))
+            allocations.append((tracemalloc.get_traced_memory()[1] - allocated) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+
+    return {
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(percentiles[49], 3),
+        "p95_ms": round(percentiles[94], 3),
+        "p99_ms": round(percentiles[98], 3),
+        "queries": max(queries),
+        "allocated_kib": round(statistics.median(allocations), 1),
+    }
+
+
+def git_revision() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        changes = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+    return {"commit": commit, "dirty": bool(changes)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks every endpoint of `core.api.urls` in this process, through the test client and the whole "
+        "middleware chain: seeds N users with M calendars of K events (one-off and every kind of series), "
+        "then reports p50/p95/p99, the queries and the memory allocated per request, and stores them as JSON "
+        "to compare with another commit (`--compare`). Runs against the configured database, SQLite or "
+        "Postgres, in a transaction that is rolled back: nothing is kept, `on_commit` hooks (WebSocket "
+        "pushes) do not run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=3)
+        parser.add_argument("--calendars", type=int, default=3, help="Calendars per user.")
+        parser.add_argument("--events-per-calendar", type=int, default=40)
+        parser.add_argument("--iterations", type=int, default=30, help="Timed requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--samples", type=int, default=3, help="Traced requests per endpoint.")
+        parser.add_argument("--bulk-size", type=int, default=100, help="Events per bulk request.")
+        parser.add_argument("--endpoints", nargs="+", metavar="NAME", help="Only these endpoints.")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", metavar="JSON", help="Results of a previous run to compare with.")
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=None,
+            metavar="PERCENT",
+            help="With --compare, fail if a p50 grew by more than PERCENT or a query count grew.",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 2:
+            raise CommandError("--iterations must be at least 2.")
+
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+
+        results = {
+            **git_revision(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "options": {
+                name: options[name]
+                for name in ["users", "calendars", "events_per_calendar", "iterations", "samples", "bulk_size"]
+            },
+            "endpoints": {},
+        }
+
+        # The audit log written in the requests, not by a thread of its own outside of the transaction.
+        with transaction.atomic(), override_settings(AUDIT_ASYNC=False):
+            started = time.perf_counter()
+            (user, *_) = seed(
+                users=options["users"],
+                calendars=options["calendars"],
+                events_per_calendar=options["events_per_calendar"],
+            )
+            self.stdout.write(
+                f"Seeded {options["users"]} users x {options["calendars"]} calendars x "
+                f"{options["events_per_calendar"]} events in {time.perf_counter() - started:.1f}s "
+                f"({connection.vendor})",
+            )
+
+            selected = endpoints(user, bulk_size=options["bulk_size"])
+
+            unknown = set(options["endpoints"] or []) - set(selected)
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {", ".join(sorted(unknown))}. Known: {", ".join(selected)}")
+
+            for name, build in selected.items():
+                if options["endpoints"] and name not in options["endpoints"]:
+                    continue
+
+                result = measure(
+                    name,
+                    build,
+                    iterations=options["iterations"],
+                    warmup=options["warmup"],
+                    samples=options["samples"],
+                )
+                results["endpoints"][name] = result
+                self.stdout.write(self.format_result(name, result, baseline))
+
+            transaction.set_rollback(True)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+                f.write("\n")
+
+            self.stdout.write(f"Results written to {options["output"]}")
+
+        if baseline is not None:
+            self.compare(results, baseline, options["max_regression"])
+
+    def format_result(self, name: str, result: dict, baseline: dict | None) -> str:
+        line = (
+            f"{name:<24} p50 {result["p50_ms"]:>8.2f} ms  p95 {result["p95_ms"]:>8.2f} ms  "
+            f"p99 {result["p99_ms"]:>8.2f} ms  {result["queries"]:>4} queries  {result["allocated_kib"]:>9,.1f} KiB"
+        )
+
+        previous = (baseline or {}).get("endpoints", {}).get(name)
+        if previous:
+            change = (result["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"] * 100
+            line += f"  p50 {change:+6.1f}%, queries {result["queries"] - previous["queries"]:+d}"
+
+        return line
+
+    def compare(self, results: dict, baseline: dict, max_regression: float | None):
+        self.stdout.write(f"Compared with {baseline.get("commit") or "an unknown commit"} ({baseline.get("date")})")
+
+        if baseline.get("database") != results["database"] or baseline.get("options") != results["options"]:
+            self.stdout.write(self.style.WARNING("The baseline ran on another database or with other options."))
+
+        if max_regression is None:
+            return
+
+        regressions = []
+        for name, result in results["endpoints"].items():
+            previous = baseline.get("endpoints", {}).get(name)
+
+            if previous is None:
+                continue
+
+            if result["queries"] > previous["queries"]:
+                regressions.append(f"{name} ({previous["queries"]} -> {result["queries"]} queries)")
+            elif result["p50_ms"] > previous["p50_ms"] * (1 + max_regression / 100):
+                regressions.append(f"{name} (p50 {previous["p50_ms"]:.2f} -> {result["p50_ms"]:.2f} ms)")
+
+        if regressions:
+            raise CommandError(f"Regressions: {", ".join(regressions)}")
+
+        self.stdout.write(self.style.SUCCESS("No regressions."))
@@ -0,0 +1,160 @@
+import asyncio
+import statistics
+import time
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import path
+
+from core.api.management.commands.check_query_counts import seed_account
+from core.calendar.apis import AsyncCalendarDetailApi, AsyncCalendarListApi, CalendarDetailApi, CalendarListApi
+from core.events.apis import AsyncEventDetailApi, AsyncEventListApi, EventDetailApi, EventListApi
+
+# Both variants of every endpoint, side by side (`ROOT_URLCONF` is this module while benchmarking).
+urlpatterns = [
+    path("sync/events/", EventListApi.as_view()),
+    path("sync/events/<uuid:event_id>/", EventDetailApi.as_view()),
+    path("sync/calendars/", CalendarListApi.as_view()),
+    path("sync/calendars/<uuid:calendar_id>/", CalendarDetailApi.as_view()),
+    path("async/events/", AsyncEventListApi.as_view()),
+    path("async/events/<uuid:event_id>/", AsyncEventDetailApi.as_view()),
+    path("async/calendars/", AsyncCalendarListApi.as_view()),
+    path("async/calendars/<uuid:calendar_id>/", AsyncCalendarDetailApi.as_view()),
+]
+
+
+async def asgi_get(application, url: str, cookie: str) -> tuple[int, float]:
+    """
+    One GET straight through the ASGI application, like a server would send it. Returns the status and the time (ms).
+    """
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    disconnected = asyncio.Event()
+    requested = False
+    status = None
+
+    async def receive():
+        nonlocal requested
+
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        # The client stays connected until the response is sent.
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    started = time.perf_counter()
+    await application(scope, receive, send)
+    elapsed = (time.perf_counter() - started) * 1000
+    disconnected.set()
+
+    return status, elapsed
+
+
+async def load(application, url: str, cookie: str, *, concurrency: int, requests: int) -> tuple[list[float], float]:
+    """
+    `requests` GETs of `url` by `concurrency` clients at once. Returns the response times (ms) and the requests/s.
+    """
+    remaining = requests
+    timings = []
+
+    async def client():
+        nonlocal remaining
+
+        while remaining > 0:
+            remaining -= 1
+            status, elapsed = await asgi_get(application, url, cookie)
+
+            if status != 200:
+                raise CommandError(f"{url} returned {status}")
+
+            timings.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+
+    return timings, requests / (time.perf_counter() - started)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the sync and the async variants (`API_ASYNC_VIEWS`) of the event and calendar list/detail "
+        "APIs under ASGI: N requests per endpoint by C concurrent clients, through the ASGI application in "
+        "this process (the full middleware chain, no network). Reports requests/s and the p50/p99 response "
+        "times. The data is committed, as the requests run on other connections, and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--calendars", type=int, default=5)
+        parser.add_argument("--events-per-calendar", type=int, default=40)
+        parser.add_argument("--limit", type=int, default=50, help="Page size of the list requests.")
+
+    def handle(self, *args, **options):
+        user = seed_account(calendars=options["calendars"], events_per_calendar=options["events_per_calendar"])
+
+        try:
+            client = Client()
+            client.force_login(user)
+            cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+            event = user.events.first()
+            calendar = user.calendars.first()
+            endpoints = {
+                "event list": f"events/?limit={options["limit"]}",
+                "event detail": f"events/{event.id}/",
+                "calendar list": f"calendars/?limit={options["limit"]}",
+                "calendar detail": f"calendars/{calendar.id}/",
+            }
+
+            with override_settings(ROOT_URLCONF=__name__):
+                asyncio.run(self.run(endpoints, cookie, options))
+        finally:
+            user.delete()
+
+    async def run(self, endpoints: dict[str, str], cookie: str, options):
+        application = get_asgi_application()
+
+        self.stdout.write(f"{options["concurrency"]} concurrent clients, {options["requests"]} requests per endpoint")
+
+        for name, url in endpoints.items():
+            for variant in ["sync", "async"]:
+                # Warm up: lazy imports, the session user cache.
+                await load(application, f"/{variant}/{url}", cookie, concurrency=10, requests=20)
+
+                timings, throughput = await load(
+                    application,
+                    f"/{variant}/{url}",
+                    cookie,
+                    concurrency=options["concurrency"],
+                    requests=options["requests"],
+                )
+                timings.sort()
+
+                self.stdout.write(
+                    f"  {name:<16} {variant:<6} {throughput:>8,.0f} requests/s, "
+                    f"p50 {statistics.median(timings):>8.2f} ms, p99 {timings[int(len(timings) * 0.99)]:>8.2f} ms",
+                )
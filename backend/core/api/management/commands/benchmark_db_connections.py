@@ -0,0 +1,134 @@
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, RequestFactory
+from django.urls import reverse
+
+from core.api.management.commands.check_query_counts import seed_account
+
+
+def wsgi_get(application: WSGIHandler, url: str, cookie: str) -> tuple[int, float]:
+    """
+    One GET through the WSGI application, closing the response like a server does: that is what
+    ends the request (`request_finished`), when Django closes or gives back its connection.
+    """
+    path, _, query = url.partition("?")
+    environ = RequestFactory()._base_environ(PATH_INFO=path, QUERY_STRING=query, HTTP_COOKIE=cookie)
+    status = None
+
+    def start_response(response_status, headers, exc_info=None):
+        nonlocal status
+        status = int(response_status.split()[0])
+
+    started = time.perf_counter()
+    response = application(environ, start_response)
+    b"".join(response)
+    response.close()
+
+    return status, (time.perf_counter() - started) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-request latency of a few read APIs in every `DB_CONNECTION_MODE`, each in a process of its own "
+        "(the settings are read at startup) calling the WSGI application from T threads, like a gthread worker. "
+        "Run it against the real database server: the connection setup is what is measured."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint and mode.")
+        parser.add_argument("--threads", type=int, default=1)
+        parser.add_argument("--modes", nargs="+", choices=settings.DB_CONNECTION_MODES, default=None)
+        # Set when running a single mode in a child process.
+        parser.add_argument("--cookie", help="Session cookie of the user to send the requests as.")
+        parser.add_argument("--urls", nargs="+", default=[])
+
+    def handle(self, *args, **options):
+        if options["cookie"]:
+            self.run(options)
+            return
+
+        user = seed_account(calendars=3, events_per_calendar=20)
+
+        try:
+            client = Client()
+            client.force_login(user)
+
+            command = [
+                sys.executable,
+                "-m",
+                "django",
+                "benchmark_db_connections",
+                "--requests",
+                str(options["requests"]),
+                "--threads",
+                str(options["threads"]),
+                "--cookie",
+                f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}",
+                "--urls",
+                reverse("api:authentication:user-details"),
+                reverse("api:events:event-detail", kwargs={"event_id": user.events.first().id}),
+                f"{reverse("api:events:event-list")}?limit=20",
+            ]
+
+            self.stdout.write(f"{options["threads"]} threads, {options["requests"]} requests per endpoint")
+
+            for mode in options["modes"] or settings.DB_CONNECTION_MODES:
+                self.stdout.write(f"{mode}:")
+                subprocess.run(
+                    command,
+                    env={**os.environ, "DB_CONNECTION_MODE": mode},
+                    cwd=settings.BASE_DIR,
+                    check=True,
+                )
+        finally:
+            user.delete()
+
+    def run(self, options):
+        application = WSGIHandler()
+        count = options["requests"]
+        threads = options["threads"]
+
+        for url in options["urls"]:
+            # Warm up: lazy imports, the session user cache.
+            for _ in range(10):
+                wsgi_get(application, url, options["cookie"])
+
+            timings = []
+            errors = []
+
+            def worker():
+                for _ in range(count // threads):
+                    status, elapsed = wsgi_get(application, url, options["cookie"])
+
+                    if status != 200:
+                        errors.append(status)
+
+                    timings.append(elapsed)
+
+            started = time.perf_counter()
+            workers = [threading.Thread(target=worker) for _ in range(threads)]
+
+            for thread in workers:
+                thread.start()
+
+            for thread in workers:
+                thread.join()
+
+            seconds = time.perf_counter() - started
+
+            if errors:
+                raise CommandError(f"{url} returned {errors[0]} ({len(errors)} errors)")
+
+            timings.sort()
+            self.stdout.write(
+                f"  {url:<60} mean {statistics.mean(timings):>6.2f} ms, p50 {statistics.median(timings):>6.2f} ms, "
+                f"p99 {timings[int(len(timings) * 0.99)]:>6.2f} ms, {len(timings) / seconds:>7,.0f} requests/s",
+            )
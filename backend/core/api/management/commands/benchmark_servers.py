@@ -0,0 +1,212 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from core.api.management.commands.check_query_counts import seed_account
+
+PRESETS = ["sync", "gthread", "uvicorn"]
+
+
+async def http_get(port: int, url: str, cookie: str) -> tuple[int, float]:
+    """
+    One GET over a connection of its own, closed after the response, the way nginx talks to its upstreams
+    by default. Returns the status and the time (ms), connecting included.
+    """
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    try:
+        writer.write(f"GET {url} HTTP/1.1\r\nHost: localhost\r\nCookie: {cookie}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+
+    status = int(response.split(b" ", 2)[1]) if response else 0
+
+    return status, (time.perf_counter() - started) * 1000
+
+
+async def load(
+    port: int,
+    url: str,
+    cookie: str,
+    *,
+    concurrency: int,
+    duration: float,
+) -> tuple[list[float], list, float]:
+    """
+    GETs of `url` by `concurrency` clients at once for `duration` seconds. Returns the response times (ms)
+    of the successful ones, the errors and the requests/s.
+    """
+    deadline = time.perf_counter() + duration
+    timings = []
+    errors = []
+
+    async def client():
+        while time.perf_counter() < deadline:
+            try:
+                status, elapsed = await http_get(port, url, cookie)
+            except OSError as e:
+                errors.append(e)
+                continue
+
+            if status != 200:
+                errors.append(status)
+            else:
+                timings.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+
+    return timings, errors, (len(timings) + len(errors)) / (time.perf_counter() - started)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"gunicorn exited with {process.returncode}")
+
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+
+    raise CommandError(f"gunicorn did not listen on {port} after {timeout}s")
+
+
+def memory_mib(pid: int) -> float:
+    """
+    Proportional set size of the process and its children (the gunicorn master and its workers): the
+    memory pages they share - a preloaded app - are counted once between them.
+    """
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        pids = [pid, *map(int, f.read().split())]
+
+    pss = 0
+
+    for process_id in pids:
+        with open(f"/proc/{process_id}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    pss += int(line.split()[1])
+
+    return pss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test of the `GUNICORN_PRESET`s (`gunicorn.conf.py`): starts gunicorn with each, then C clients "
+        "GET a few read APIs for S seconds each, a connection per request. Reports requests/s, p50/p99, the "
+        "errors and the memory of the master and workers. Run it against the real database server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--presets", nargs="+", choices=PRESETS, default=PRESETS)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--duration", type=float, default=10, help="Seconds of load per endpoint.")
+        parser.add_argument(
+            "--no-preload",
+            action="store_true",
+            help="Also run every preset with `GUNICORN_PRELOAD=False`, to compare the memory.",
+        )
+
+    def handle(self, *args, **options):
+        if not sys.platform.startswith("linux"):
+            raise CommandError("Reads the memory of the server processes from /proc: Linux only.")
+
+        user = seed_account(calendars=3, events_per_calendar=20)
+
+        try:
+            client = Client()
+            client.force_login(user)
+            cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+            endpoints = {
+                "me": reverse("api:authentication:user-details"),
+                "event detail": reverse("api:events:event-detail", kwargs={"event_id": user.events.first().id}),
+                "event list": f"{reverse("api:events:event-list")}?limit=20",
+            }
+
+            self.stdout.write(
+                f"{os.cpu_count()} CPUs, {options["concurrency"]} concurrent clients, "
+                f"{options["duration"]:g}s per endpoint",
+            )
+
+            for preset in options["presets"]:
+                for preload in [True, False] if options["no_preload"] else [True]:
+                    self.run(preset, preload, endpoints, cookie, options)
+        finally:
+            user.delete()
+
+    def run(self, preset: str, preload: bool, endpoints: dict[str, str], cookie: str, options):
+        port = free_port()
+        env = {**os.environ, "GUNICORN_PRESET": preset, "GUNICORN_PRELOAD": str(preload)}
+        # Left to the preset.
+        env.pop("DB_CONNECTION_MODE", None)
+        env.pop("WEB_CONCURRENCY", None)
+
+        # Not a pipe: nothing reads it while the load runs, and a full pipe would block the server.
+        log = tempfile.TemporaryFile(mode="w+")
+        process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}"],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+        )
+
+        try:
+            wait_for_port(port, process)
+            self.stdout.write(f"{preset} (preload {preload}):")
+
+            for name, url in endpoints.items():
+                # Warm up every worker: lazy imports, the session user cache, the connections.
+                asyncio.run(load(port, url, cookie, concurrency=options["concurrency"], duration=1))
+
+                timings, errors, throughput = asyncio.run(
+                    load(port, url, cookie, concurrency=options["concurrency"], duration=options["duration"]),
+                )
+
+                if not timings:
+                    raise CommandError(f"{url} failed on every request: {errors[0]!r}")
+
+                timings.sort()
+                self.stdout.write(
+                    f"  {name:<14} {throughput:>7,.0f} requests/s, p50 {statistics.median(timings):>8.2f} ms, "
+                    f"p99 {timings[int(len(timings) * 0.99)]:>8.2f} ms, {len(errors)} errors",
+                )
+
+            self.stdout.write(f"  memory         {memory_mib(process.pid):>7,.1f} MiB (PSS, master and workers)")
+        finally:
+            process.terminate()
+
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+            with log:
+                if process.returncode != 0:
+                    log.seek(0)
+                    self.stderr.write(log.read())
@@ -0,0 +1,116 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.calendar.models import Calendar
+from core.events.models import Event, RecurrenceRule
+from core.events.recurrence import event_series_end_time
+from core.users.models import User
+
+WINDOW = "from=2026-01-01T00:00:00Z&to=2026-02-01T00:00:00Z"
+
+
+def seed_account(*, calendars: int, events_per_calendar: int) -> User:
+    user = User.objects.create_user(
+        email=f"query-counts-{uuid.uuid4().hex}@example.com",
+        first_name="Query",
+        last_name="Counts",
+        phone_number=uuid.uuid4().int % 10**12,
+    )
+    start = datetime(2026, 1, 1, 9, tzinfo=timezone.utc)
+
+    user_calendars = Calendar.objects.bulk_create(
+        [Calendar(user=user, name=f"Calendar {index}", color="#3B82F6") for index in range(calendars)],
+    )
+    rules = RecurrenceRule.objects.bulk_create(
+        [
+            RecurrenceRule(frequency=RecurrenceRule.WEEKLY if index % 2 else "none", weekdays=[1, 3])
+            for index in range(calendars * events_per_calendar)
+        ],
+    )
+    user_events = [
+        Event(
+            user=user,
+            calendar=user_calendars[index % calendars],
+            title=f"Event {index}",
+            start_time=start + timedelta(hours=index),
+            end_time=start + timedelta(hours=index + 1),
+            recurrence=rule,
+        )
+        for index, rule in enumerate(rules)
+    ]
+    for event in user_events:
+        event.series_end_time = event_series_end_time(event)
+    Event.objects.bulk_create(user_events)
+
+    return user
+
+
+def list_endpoints(user: User) -> dict[str, str]:
+    calendar = user.calendars.first()
+    calendar_list = reverse("api:calendar:calendar-list")
+    event_list = reverse("api:events:event-list")
+    event_occurrences = reverse("api:events:event-occurrences")
+
+    return {
+        "calendar-list": calendar_list,
+        "calendar-list (window)": f"{calendar_list}?{WINDOW}",
+        "calendar-detail": reverse("api:calendar:calendar-detail", kwargs={"calendar_id": calendar.id}),
+        "event-list": event_list,
+        "event-list (window)": f"{event_list}?{WINDOW}",
+        "event-occurrences": f"{event_occurrences}?{WINDOW}",
+        "sync": reverse("api:sync:sync"),
+    }
+
+
+def count_queries(*, calendars: int, events_per_calendar: int) -> dict[str, int]:
+    user = seed_account(calendars=calendars, events_per_calendar=events_per_calendar)
+    client = Client()
+    client.force_login(user)
+
+    counts = {}
+    for name, url in list_endpoints(user).items():
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+
+        if response.status_code != 200:
+            raise CommandError(f"{name}: {url} returned {response.status_code}")
+
+        counts[name] = len(queries)
+
+    return counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs every list endpoint against a small and a large account and fails if the number of queries "
+        "grows with the number of rows. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--small", type=int, nargs=2, default=[2, 3], metavar=("CALENDARS", "EVENTS"))
+        parser.add_argument("--large", type=int, nargs=2, default=[10, 25], metavar=("CALENDARS", "EVENTS"))
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            small = count_queries(calendars=options["small"][0], events_per_calendar=options["small"][1])
+            large = count_queries(calendars=options["large"][0], events_per_calendar=options["large"][1])
+            transaction.set_rollback(True)
+
+        regressions = []
+        for name, small_count in small.items():
+            self.stdout.write(f"{name:<24} {small_count:>4} -> {large[name]:>4} queries")
+
+            if large[name] > small_count:
+                regressions.append(name)
+
+        if regressions:
+            names = ", ".join(regressions)
+            raise CommandError(f"Query count grows with the number of rows: {names}")
+
+        self.stdout.write(self.style.SUCCESS("Query counts do not depend on the number of rows."))
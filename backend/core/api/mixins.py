@@ -1,11 +1,18 @@
-from importlib import import_module
-from typing import Sequence, Type
+from typing import Optional, Sequence, Type
 
-from django.conf import settings
 from django.contrib import auth
 from rest_framework.authentication import BaseAuthentication, SessionAuthentication
 from rest_framework.permissions import BasePermission, IsAuthenticated
 
+from core.authentication.sessions import (
+    asession_user_get,
+    asession_user_set,
+    get_session_store_class,
+    session_user_get,
+    session_user_set,
+)
+from core.users.models import User
+
 
 def get_auth_header(headers):
     value = headers.get("Authorization")
@@ -26,6 +33,7 @@ class SessionAsHeaderAuthentication(BaseAuthentication):
     Authorization: Session 7wvz4sxcp3chm9quyw015n6ryre29b3u
 
     Run the standard Django auth & try obtaining user.
+    The user is reused from the session user cache when possible.
     """
 
     def authenticate(self, request):
@@ -39,12 +47,15 @@ class SessionAsHeaderAuthentication(BaseAuthentication):
         if auth_type != "Session":
             return None
 
-        engine = import_module(settings.SESSION_ENGINE)
-        SessionStore = engine.SessionStore  # noqa: N806
+        SessionStore = get_session_store_class()  # noqa: N806
         session_key = auth_value
 
         request.session = SessionStore(session_key)
-        user = auth.get_user(request)
+        user = session_user_get(session_key)
+
+        if user is None:
+            user = auth.get_user(request)
+            session_user_set(session_key, user)
 
         return user, None
 
@@ -53,8 +64,26 @@ class CsrfExemptedSessionAuthentication(SessionAuthentication):
     """
     DRF SessionAuthentication is enforcing CSRF, which may be problematic.
     That's why we want to make sure we are exempting any kind of CSRF checks for APIs.
+    The user is reused from the session user cache when possible.
     """
 
+    def authenticate(self, request):
+        session_key = request._request.session.session_key
+        user = session_user_get(session_key)
+
+        if user is None:
+            user_auth_tuple = super().authenticate(request)
+
+            if user_auth_tuple is not None:
+                session_user_set(session_key, user_auth_tuple[0])
+
+            return user_auth_tuple
+
+        if not user.is_active:
+            return None
+
+        return user, None
+
     def enforce_csrf(self, request):
         return
 
@@ -65,3 +94,40 @@ class ApiAuthMixin:
         SessionAsHeaderAuthentication,
     ]
     permission_classes: Sequence[Type[BasePermission]] = [IsAuthenticated]
+
+
+async def aauthenticate(request) -> Optional[User]:
+    """
+    The authentication of `ApiAuthMixin` for async views: the session cookie, then the
+    `Authorization: Session <key>` header. The user comes from the session user cache when
+    possible, and is loaded with `auth.aget_user` otherwise.
+    """
+    user = await _asession_user(request)
+
+    if user is None:
+        auth_header = get_auth_header(request.headers)
+
+        if auth_header is not None and auth_header[0] == "Session":
+            SessionStore = get_session_store_class()  # noqa: N806
+            request.session = SessionStore(auth_header[1])
+            user = await _asession_user(request)
+
+    return user
+
+
+async def _asession_user(request) -> Optional[User]:
+    session_key = request.session.session_key
+
+    if not session_key:
+        return None
+
+    user = await asession_user_get(session_key)
+
+    if user is None:
+        user = await auth.aget_user(request)
+        await asession_user_set(session_key, user)
+
+    if not user.is_authenticated or not user.is_active:
+        return None
+
+    return user
@@ -0,0 +1,140 @@
+import base64
+import binascii
+import json
+from typing import Optional
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps([str(value) for value in values]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+    if not isinstance(values, list):
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+    return values
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a unique ordering, e.g. `("start_time", "id")`.
+
+    The cursor is the ordering values of the last row of the previous page, so every
+    page is an index range scan starting right after it, however deep the client is:
+    no OFFSET, no COUNT. The cursor is opaque to clients.
+
+    Query params: `?limit=50&cursor=...`, see `from_request`.
+    """
+
+    ordering: tuple[str, ...] = ("id",)
+    descending = False
+    default_limit = 50
+    max_limit = 500
+
+    limit_query_param = "limit"
+    cursor_query_param = "cursor"
+
+    def __init__(self):
+        self.limit = self.default_limit
+        self.cursor: Optional[list] = None
+        self.next_cursor: Optional[str] = None
+
+    @classmethod
+    def from_request(cls, request) -> Optional["KeysetPagination"]:
+        """
+        Validates `limit`/`cursor` up front. Pagination is opt-in, so this returns None
+        when the client asked for neither and expects the plain list.
+        """
+        if cls.limit_query_param not in request.query_params and cls.cursor_query_param not in request.query_params:
+            return None
+
+        paginator = cls()
+
+        try:
+            limit = int(request.query_params.get(cls.limit_query_param, cls.default_limit))
+        except ValueError:
+            raise ValidationError({cls.limit_query_param: "A valid integer is required."})
+
+        paginator.limit = min(max(limit, 1), cls.max_limit)
+
+        cursor = request.query_params.get(cls.cursor_query_param)
+        if cursor:
+            paginator.cursor = decode_cursor(cursor)
+
+            if len(paginator.cursor) != len(cls.ordering):
+                raise ValidationError({cls.cursor_query_param: "Invalid cursor."})
+
+        return paginator
+
+    def paginate_queryset(self, queryset: QuerySet, request=None, view=None) -> list:
+        return self.get_page(list(self.get_page_queryset(queryset)))
+
+    async def apaginate_queryset(self, queryset: QuerySet) -> list:
+        return self.get_page([row async for row in self.get_page_queryset(queryset)])
+
+    def get_page_queryset(self, queryset: QuerySet) -> QuerySet:
+        prefix = "-" if self.descending else ""
+
+        queryset = queryset.order_by(*[f"{prefix}{field}" for field in self.ordering])
+
+        if self.cursor:
+            queryset = queryset.filter(self.get_seek_q(queryset, self.cursor))
+
+        # One extra row tells us whether there is a next page.
+        return queryset[: self.limit + 1]
+
+    def get_page(self, page: list) -> list:
+        if len(page) > self.limit:
+            page = page[: self.limit]
+            last = page[-1]
+            # Works for model instances as well as for `.values()` rows.
+            values = [last[field] if isinstance(last, dict) else getattr(last, field) for field in self.ordering]
+            self.next_cursor = encode_cursor(values)
+
+        return page
+
+    def get_seek_q(self, queryset: QuerySet, values: list) -> Q:
+        """
+        `(a, b) > (x, y)` spelled as `a >= x AND (a > x OR (a = x AND b > y))`,
+        the leading `a >= x` being what bounds the index scan.
+        """
+        try:
+            values = [
+                queryset.model._meta.get_field(field).to_python(value) for field, value in zip(self.ordering, values)
+            ]
+        except DjangoValidationError:
+            raise ValidationError({"cursor": "Invalid cursor."})
+
+        strict = "lt" if self.descending else "gt"
+        inclusive = "lte" if self.descending else "gte"
+
+        pairs = list(zip(self.ordering, values))
+        last_field, last_value = pairs[-1]
+
+        after = Q(**{f"{last_field}__{strict}": last_value})
+        for field, value in reversed(pairs[:-1]):
+            after = Q(**{f"{field}__{strict}": value}) | (Q(**{field: value}) & after)
+
+        return Q(**{f"{self.ordering[0]}__{inclusive}": values[0]}) & after
+
+    def get_paginated_data(self, data) -> dict:
+        return {
+            "limit": self.limit,
+            "next": self.next_cursor,
+            "results": data,
+        }
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(self.get_paginated_data(data))
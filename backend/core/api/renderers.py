@@ -0,0 +1,18 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class ICalendarRenderer(BaseRenderer):
+    """
+    Lets `Accept: text/calendar` (or `?format=ics`) through content negotiation.
+    The views stream the calendar themselves, only errors are rendered here, with an empty body.
+    """
+
+    media_type = "text/calendar"
+    format = "ics"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+
+        return b""
@@ -5,4 +5,5 @@ urlpatterns: list[URLResolver] = [
     path("auth/", include(("core.authentication.urls", "authentication"), namespace="authentication")),
     path("events/", include(("core.events.urls", "events"), namespace="events")),
     path("calendars/", include(("core.calendar.urls", "calendar"), namespace="calendar")),
+    path("sync/", include(("core.sync.urls", "sync"), namespace="sync")),
 ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from rest_framework import serializers
 from rest_framework.exceptions import AuthenticationFailed, NotFound, ValidationError
@@ -30,6 +31,10 @@ class LoginApi(APIView):
 
             login(request, user)
 
+            if settings.SESSION_MODE == "signed_cookies":
+                # The key is the signed session data itself, it has to be produced after `login()`.
+                request.session.save()
+
             session_key = request.session.session_key
 
             return Response(
@@ -95,6 +100,10 @@ class RegisterApi(APIView):
 
             login(request, user)
 
+            if settings.SESSION_MODE == "signed_cookies":
+                # The key is the signed session data itself, it has to be produced after `login()`.
+                request.session.save()
+
             session_key = request.session.session_key
 
             return Response(
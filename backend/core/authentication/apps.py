@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core.authentication"
+
+    def ready(self):
+        # Connects the signal receivers that keep the session user cache fresh.
+        from core.authentication import sessions  # noqa: F401
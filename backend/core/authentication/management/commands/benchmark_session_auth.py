@@ -0,0 +1,93 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.authentication.sessions import _users
+from core.users.models import User
+
+
+def is_auth_query(query: dict) -> bool:
+    return '"users_user"' in query["sql"] or '"django_session"' in query["sql"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Calls the `me` API N times in every session mode, with the session in a cookie and in the "
+        "`Authorization` header, with and without the session user cache, and reports the time and the "
+        "queries per request. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--modes", nargs="+", choices=list(settings.SESSION_ENGINES), default=None)
+
+    def handle(self, *args, **options):
+        count = options["requests"]
+        url = reverse("api:authentication:user-details")
+        ttl = settings.SESSION_USER_CACHE_TTL or 30
+
+        self.stdout.write(f"sessions cache: {settings.CACHES["sessions"]["BACKEND"]}")
+
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email=f"session-auth-{uuid.uuid4().hex}@example.com",
+                first_name="Session",
+                last_name="Auth",
+                phone_number=uuid.uuid4().int % 10**12,
+            )
+
+            for mode in options["modes"] or settings.SESSION_ENGINES:
+                with override_settings(SESSION_MODE=mode, SESSION_ENGINE=settings.SESSION_ENGINES[mode]):
+                    # The session middleware resolves the engine once, hence new clients per mode.
+                    cookie_client = Client()
+
+                    with CaptureQueriesContext(connection) as queries:
+                        cookie_client.force_login(user)
+
+                    self.stdout.write(
+                        f"{mode}: login {len([query for query in queries.captured_queries if is_auth_query(query)])} "
+                        "session/user queries",
+                    )
+
+                    session_key = cookie_client.session.session_key
+                    header_client = Client(headers={"Authorization": f"Session {session_key}"})
+
+                    for name, client in [("cookie", cookie_client), ("header", header_client)]:
+                        for cache_ttl in [0, ttl]:
+                            _users.clear()
+
+                            with override_settings(SESSION_USER_CACHE_TTL=cache_ttl):
+                                self.run(
+                                    f"{mode}, {name}, user cache {cache_ttl}s",
+                                    client=client,
+                                    url=url,
+                                    count=count,
+                                )
+
+            transaction.set_rollback(True)
+
+    def run(self, name: str, *, client: Client, url: str, count: int):
+        # Warm up: fills the caches and the lazy imports.
+        client.get(url)
+
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(count):
+                response = client.get(url)
+
+                if response.status_code != 200:
+                    raise CommandError(f"{url} returned {response.status_code}")
+        seconds = time.perf_counter() - started
+
+        auth_queries = [query for query in queries.captured_queries if is_auth_query(query)]
+
+        self.stdout.write(
+            f"  {name:<40} {seconds / count * 1000:>7.3f} ms/request "
+            f"{len(queries) / count:>5.2f} queries/request ({len(auth_queries) / count:.2f} session/user)",
+        )
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.authentication.services import session_purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the expired sessions (`db` and `cached_db` session modes). "
+        "Meant to run periodically, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        deleted = session_purge_expired(batch_size=options["batch_size"])
+
+        self.stdout.write(f"Deleted {deleted} expired sessions (SESSION_MODE={settings.SESSION_MODE}).")
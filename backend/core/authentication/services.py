@@ -0,0 +1,32 @@
+from django.contrib.sessions.backends.db import SessionStore as DatabaseSessionStore
+from django.utils import timezone
+
+from core.authentication.sessions import get_session_store_class
+
+
+def session_purge_expired(*, batch_size: int = 5000) -> int:
+    """
+    Deletes the expired sessions of the `db` / `cached_db` modes, `batch_size` rows at a time
+    so that a large backlog does not hold one long lock on `django_session`.
+
+    The `cache` and `signed_cookies` modes expire on their own, nothing to do there.
+    """
+    SessionStore = get_session_store_class()  # noqa: N806
+
+    if not issubclass(SessionStore, DatabaseSessionStore):
+        return 0
+
+    Session = SessionStore.get_model_class()  # noqa: N806
+    now = timezone.now()
+    deleted = 0
+
+    while True:
+        session_keys = list(
+            Session.objects.filter(expire_date__lt=now).values_list("session_key", flat=True)[:batch_size],
+        )
+
+        if not session_keys:
+            return deleted
+
+        Session.objects.filter(session_key__in=session_keys).delete()
+        deleted += len(session_keys)
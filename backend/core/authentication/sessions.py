@@ -0,0 +1,177 @@
+"""
+In-process cache of `session key -> user` for the API authentication classes.
+
+Without it every authenticated request loads the session and then the user from
+the database. Entries live for `SESSION_USER_CACHE_TTL` seconds, set it to `0` to
+disable the cache.
+
+Every user has a generation token in the `sessions` cache, each entry holds the
+token it was cached under and is only used while the token is still the same: one
+cache GET per request, no query. Logging out and saving the user (password change,
+deactivation, ...) replace the token, which drops the user's entries in every
+process sharing that cache. With a per-process (`locmemcache://`) `sessions` cache,
+other processes notice at most `SESSION_USER_CACHE_TTL` seconds later.
+"""
+
+import copy
+import time
+import uuid
+from functools import lru_cache
+from importlib import import_module
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.users.models import User
+
+# session key -> (expires at, generation, user)
+_users: dict[str, tuple[float, str, User]] = {}
+
+
+@lru_cache(maxsize=None)
+def _session_store_class(engine: str):
+    return import_module(engine).SessionStore
+
+
+def get_session_store_class():
+    return _session_store_class(settings.SESSION_ENGINE)
+
+
+def _cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def _generation_key(user_id) -> str:
+    return f"sessions:user:{user_id}:generation"
+
+
+def get_user_session_generation(user_id) -> str:
+    cache = _cache()
+    key = _generation_key(user_id)
+
+    generation = cache.get(key)
+
+    if generation is None:
+        # Another process may have set it in between, `add` keeps theirs.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(key)
+
+    return generation
+
+
+async def aget_user_session_generation(user_id) -> str:
+    cache = _cache()
+    key = _generation_key(user_id)
+
+    generation = await cache.aget(key)
+
+    if generation is None:
+        await cache.aadd(key, uuid.uuid4().hex, timeout=None)
+        generation = await cache.aget(key)
+
+    return generation
+
+
+def bump_user_session_generation(user_id) -> None:
+    _cache().set(_generation_key(user_id), uuid.uuid4().hex, timeout=None)
+
+
+def _entry_get(session_key: Optional[str]) -> Optional[tuple[str, User]]:
+    if not session_key or not settings.SESSION_USER_CACHE_TTL:
+        return None
+
+    entry = _users.get(session_key)
+
+    if entry is None:
+        return None
+
+    expires_at, generation, user = entry
+
+    if expires_at < time.monotonic():
+        _users.pop(session_key, None)
+        return None
+
+    return generation, user
+
+
+def _entry_check(session_key: str, entry: tuple[str, User], generation: Optional[str]) -> Optional[User]:
+    cached_generation, user = entry
+
+    if generation != cached_generation:
+        # Logged out or saved since, or the token has been evicted.
+        _users.pop(session_key, None)
+        return None
+
+    # Views are free to modify `request.user`, never hand out the cached instance itself.
+    return copy.copy(user)
+
+
+def session_user_get(session_key: Optional[str]) -> Optional[User]:
+    entry = _entry_get(session_key)
+
+    if entry is None:
+        return None
+
+    return _entry_check(session_key, entry, _cache().get(_generation_key(entry[1].pk)))
+
+
+async def asession_user_get(session_key: Optional[str]) -> Optional[User]:
+    entry = _entry_get(session_key)
+
+    if entry is None:
+        return None
+
+    return _entry_check(session_key, entry, await _cache().aget(_generation_key(entry[1].pk)))
+
+
+def _entry_set(session_key: str, user, generation: str) -> None:
+    if session_key not in _users and len(_users) >= settings.SESSION_USER_CACHE_MAX_ENTRIES:
+        # Dicts keep insertion order: drop the oldest entry.
+        try:
+            _users.pop(next(iter(_users)), None)
+        except (StopIteration, RuntimeError):
+            pass
+
+    _users[session_key] = (time.monotonic() + settings.SESSION_USER_CACHE_TTL, generation, copy.copy(user))
+
+
+def session_user_set(session_key: Optional[str], user) -> None:
+    if not session_key or not settings.SESSION_USER_CACHE_TTL or not user.is_authenticated:
+        return
+
+    _entry_set(session_key, user, get_user_session_generation(user.pk))
+
+
+async def asession_user_set(session_key: Optional[str], user) -> None:
+    if not session_key or not settings.SESSION_USER_CACHE_TTL or not user.is_authenticated:
+        return
+
+    _entry_set(session_key, user, await aget_user_session_generation(user.pk))
+
+
+def user_sessions_forget(user_id) -> None:
+    """
+    Drops the cached entries of every session of the user, in every process, once the transaction commits.
+    """
+    transaction.on_commit(lambda: bump_user_session_generation(user_id))
+
+
+@receiver(user_logged_out)
+def _forget_logged_out_session(sender, request, user, **kwargs):
+    if user is not None:
+        user_sessions_forget(user.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _forget_user_sessions(sender, instance: User, update_fields=None, **kwargs):
+    # `login()` only updates `last_login`, which does not make a session invalid.
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+
+    user_sessions_forget(instance.pk)
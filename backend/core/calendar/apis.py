@@ -1,17 +1,39 @@
 # calendars/api.py
 
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.text import slugify
 from rest_framework import serializers, status
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.api.async_views import AsyncApiView
+from core.api.conditional import etag_matches, make_etag, not_modified, set_etag
 from core.api.mixins import ApiAuthMixin
+from core.api.pagination import KeysetPagination
+from core.api.renderers import ICalendarRenderer
+from core.common.cache import auser_cache_version, auser_cached, cache_status_header, user_cache_version, user_cached
 from core.common.utils import inline_serializer
-from core.events.serializers import RecurrenceRuleSerializer
+from core.events.ics import acalendar_to_ics, calendar_to_ics
+from core.events.representations import acalendars_to_representation, calendar_values, calendars_to_representation
+from core.events.serializers import RecurrenceRuleSerializer, TimeWindowSerializer
+from core.events.services import event_ics_import
 
+from .models import Calendar
 from .selectors import (
+    aget_calendar_by_id_for_user,
+    aget_calendar_data_version,
+    aget_calendar_events_for_export,
+    aget_user_data_version,
     get_all_calendars_for_user,
     get_calendar_by_id_for_user,
+    get_calendar_data_version,
+    get_calendar_events,
+    get_calendar_events_for_export,
+    get_calendar_for_user,
+    get_user_data_version,
 )
 from .services import (
     calendar_create,
@@ -42,15 +64,53 @@ class CalendarListApi(ApiAuthMixin, APIView):
             },
         )
 
+    class Pagination(KeysetPagination):
+        ordering = ("created_at", "id")
+
     serializer_class = OutputSerializer
 
     def get(self, request):
+        # Optionally limit the nested events to the ones visible in a `from`/`to` window.
+        window = {}
+        if {"from", "to"} & set(request.query_params):
+            window_serializer = TimeWindowSerializer(data=request.query_params)
+            window_serializer.is_valid(raise_exception=True)
+            window = window_serializer.validated_data
+
+        paginator = self.Pagination.from_request(request)
+
+        def compute():
+            calendars = get_all_calendars_for_user(
+                user=request.user,
+                window_start=window.get("from"),
+                window_end=window.get("to"),
+            )
+
+            events = get_calendar_events(window_start=window.get("from"), window_end=window.get("to"))
+
+            # `OutputSerializer` documents the shape, `calendars_to_representation` produces it.
+            # Pages leave out the nested `events`, page through `/events/?calendar_id=` for them.
+            if paginator is not None:
+                page = paginator.paginate_queryset(calendar_values(calendars))
+                return paginator.get_paginated_data(calendars_to_representation(page, events=None))
+
+            return calendars_to_representation(calendar_values(calendars), events=events)
+
         try:
-            calendars = get_all_calendars_for_user(user=request.user)
+            version = user_cache_version(request.user, lambda: get_user_data_version(request.user))
+            etag = make_etag(request, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
 
-            serializer = self.OutputSerializer(calendars, many=True)
+            data, hit = user_cached(
+                user=request.user,
+                namespace="calendars:list",
+                params=request.query_params,
+                compute=compute,
+                version=version,
+            )
 
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return set_etag(cache_status_header(Response(data, status=status.HTTP_200_OK), hit), etag)
         except ValidationError as e:
             # print("Validation error:", e)
             raise ValidationError(e)
@@ -59,6 +119,61 @@ class CalendarListApi(ApiAuthMixin, APIView):
             return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class AsyncCalendarListApi(AsyncApiView):
+    """
+    `CalendarListApi` for ASGI servers, see `API_ASYNC_VIEWS`.
+    """
+
+    OutputSerializer = CalendarListApi.OutputSerializer
+    Pagination = CalendarListApi.Pagination
+
+    async def get(self, request):
+        window = {}
+        if {"from", "to"} & set(request.query_params):
+            window_serializer = TimeWindowSerializer(data=request.query_params)
+            window_serializer.is_valid(raise_exception=True)
+            window = window_serializer.validated_data
+
+        paginator = self.Pagination.from_request(request)
+
+        async def compute():
+            calendars = get_all_calendars_for_user(
+                user=request.user,
+                window_start=window.get("from"),
+                window_end=window.get("to"),
+            )
+
+            events = get_calendar_events(window_start=window.get("from"), window_end=window.get("to"))
+
+            if paginator is not None:
+                page = await paginator.apaginate_queryset(calendar_values(calendars))
+                return paginator.get_paginated_data(await acalendars_to_representation(page, events=None))
+
+            calendar_rows = [row async for row in calendar_values(calendars)]
+
+            return await acalendars_to_representation(calendar_rows, events=events)
+
+        try:
+            version = await auser_cache_version(request.user, lambda: aget_user_data_version(request.user))
+            etag = make_etag(request, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            data, hit = await auser_cached(
+                user=request.user,
+                namespace="calendars:list",
+                params=request.query_params,
+                compute=compute,
+                version=version,
+            )
+
+            return set_etag(cache_status_header(Response(data, status=status.HTTP_200_OK), hit), etag)
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class CalendarCreateApi(ApiAuthMixin, APIView):
     class InputSerializer(serializers.Serializer):
         name = serializers.CharField(max_length=255)
@@ -133,10 +248,64 @@ class CalendarDetailApi(ApiAuthMixin, APIView):
     serializer_class = OutputSerializer
 
     def get(self, request, calendar_id):
-        try:
+        def compute():
             calendar = get_calendar_by_id_for_user(calendar_id=calendar_id, user=request.user)
-            serializer = self.OutputSerializer(calendar)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return self.OutputSerializer(calendar).data
+
+        try:
+            version = user_cache_version(
+                request.user,
+                lambda: get_calendar_data_version(calendar_id=calendar_id, user=request.user),
+            )
+            etag = make_etag(request, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            data, hit = user_cached(
+                user=request.user,
+                namespace=f"calendars:detail:{calendar_id}",
+                params=request.query_params,
+                compute=compute,
+                version=version,
+            )
+            return set_etag(cache_status_header(Response(data, status=status.HTTP_200_OK), hit), etag)
+
+        except ValidationError as e:
+            raise ValidationError(e)
+
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncCalendarDetailApi(AsyncApiView):
+    """
+    `CalendarDetailApi` for ASGI servers, see `API_ASYNC_VIEWS`.
+    """
+
+    OutputSerializer = CalendarDetailApi.OutputSerializer
+
+    async def get(self, request, calendar_id):
+        async def compute():
+            calendar = await aget_calendar_by_id_for_user(calendar_id=calendar_id, user=request.user)
+            return self.OutputSerializer(calendar).data
+
+        try:
+            version = await auser_cache_version(
+                request.user,
+                lambda: aget_calendar_data_version(calendar_id=calendar_id, user=request.user),
+            )
+            etag = make_etag(request, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            data, hit = await auser_cached(
+                user=request.user,
+                namespace=f"calendars:detail:{calendar_id}",
+                params=request.query_params,
+                compute=compute,
+                version=version,
+            )
+            return set_etag(cache_status_header(Response(data, status=status.HTTP_200_OK), hit), etag)
 
         except ValidationError as e:
             raise ValidationError(e)
@@ -187,3 +356,83 @@ class CalendarDeleteApi(ApiAuthMixin, APIView):
     def delete(self, request, calendar_id):
         calendar_delete(calendar_id=calendar_id, user=request.user)
         return Response(status=status.HTTP_200_OK)
+
+
+class CalendarExportApi(ApiAuthMixin, APIView):
+    """
+    Streams the calendar as an iCalendar (.ics) file. Memory use does not depend on the number of events.
+    """
+
+    renderer_classes = [JSONRenderer, ICalendarRenderer]
+
+    def get(self, request, calendar_id):
+        try:
+            calendar = get_calendar_for_user(calendar_id=calendar_id, user=request.user)
+
+            if isinstance(request._request, ASGIRequest):
+                # Under ASGI, Django reads a sync iterator into a list before sending it: stream an async one.
+                content = acalendar_to_ics(
+                    name=calendar.name,
+                    description=calendar.description,
+                    event_rows=aget_calendar_events_for_export(calendar),
+                )
+            else:
+                content = calendar_to_ics(
+                    name=calendar.name,
+                    description=calendar.description,
+                    event_rows=get_calendar_events_for_export(calendar),
+                )
+
+            response = StreamingHttpResponse(content, content_type="text/calendar; charset=utf-8")
+            response["Content-Disposition"] = f'attachment; filename="{slugify(calendar.name) or "calendar"}.ics"'
+
+            return response
+
+        except Calendar.DoesNotExist:
+            raise NotFound("Calendar not found.")
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class CalendarImportApi(ApiAuthMixin, APIView):
+    """
+    Imports the events of an iCalendar (.ics) file into the calendar. The file is read line by line and the
+    events are inserted in batches; the ones that can not be imported are reported with their errors.
+    """
+
+    class InputSerializer(serializers.Serializer):
+        file = serializers.FileField()
+
+    class OutputSerializer(serializers.Serializer):
+        imported = serializers.IntegerField()
+        failed = serializers.IntegerField()
+        errors = inline_serializer(
+            many=True,
+            fields={
+                "line": serializers.IntegerField(),
+                "uid": serializers.CharField(allow_null=True),
+                "error": serializers.CharField(),
+            },
+        )
+
+    serializer_class = InputSerializer
+
+    def post(self, request, calendar_id):
+        serializer = self.InputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            calendar = get_calendar_for_user(calendar_id=calendar_id, user=request.user)
+
+            result = event_ics_import(user=request.user, calendar=calendar, lines=serializer.validated_data["file"])
+
+            return Response(self.OutputSerializer(result).data, status=status.HTTP_200_OK)
+
+        except Calendar.DoesNotExist:
+            raise NotFound("Calendar not found.")
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar', '0002_alter_calendar_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calendar',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='calendar_user_created_idx'),
+        ),
+    ]
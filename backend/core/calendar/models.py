@@ -20,3 +20,7 @@ class Calendar(BaseModel):
     class Meta:
         verbose_name = "Calendar"
         verbose_name_plural = "Calendars"
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"], name="calendar_user_created_idx"),
+            models.Index(fields=["user", "updated_at"], name="calendar_user_updated_idx"),
+        ]
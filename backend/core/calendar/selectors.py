@@ -1,13 +1,149 @@
 # calendars/selectors.py
 
-from django.db.models import QuerySet
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from django.db.models import Count, Max, Prefetch, Q, QuerySet
+
+from core.events.ics import EXPORT_VALUES
+from core.events.models import Event
+from core.events.selectors import in_window_q
 
 from .models import Calendar
 
 
-def get_all_calendars_for_user(user) -> QuerySet:
-    return Calendar.objects.filter(user=user)
+def calendar_events_prefetch(
+    *,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+    lookup: str = "events",
+) -> Prefetch:
+    """
+    Loads the nested `calendar.events` (and their recurrence) in one query for all calendars.
+    """
+    events = get_calendar_events(window_start=window_start, window_end=window_end).select_related("recurrence")
+
+    return Prefetch(lookup, queryset=events)
+
+
+def get_calendar_events(
+    *,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+) -> QuerySet[Event]:
+    events = Event.objects.order_by("start_time")
+
+    if window_start is not None and window_end is not None:
+        events = events.filter(in_window_q(window_start=window_start, window_end=window_end))
+
+    return events
+
+
+def get_all_calendars_for_user(
+    user,
+    *,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+) -> QuerySet:
+    return Calendar.objects.filter(user=user).prefetch_related(
+        calendar_events_prefetch(window_start=window_start, window_end=window_end),
+    )
 
 
 def get_calendar_by_id_for_user(calendar_id: str, user) -> Calendar:
+    return Calendar.objects.prefetch_related(calendar_events_prefetch()).get(id=calendar_id, user=user)
+
+
+async def aget_calendar_by_id_for_user(calendar_id: str, user) -> Calendar:
+    return await Calendar.objects.prefetch_related(calendar_events_prefetch()).aget(id=calendar_id, user=user)
+
+
+def get_calendar_for_user(calendar_id: str, user) -> Calendar:
     return Calendar.objects.get(id=calendar_id, user=user)
+
+
+def calendar_events_for_export(calendar: Calendar) -> QuerySet:
+    return Event.objects.filter(calendar=calendar).order_by("start_time", "id").values(*EXPORT_VALUES)
+
+
+def get_calendar_events_for_export(calendar: Calendar, *, chunk_size: int = 2000) -> Iterator[dict]:
+    """
+    Streams the rows of `calendar.events` needed by `calendar_to_ics`. On Postgres `iterator`
+    reads them through a server-side cursor, `chunk_size` rows at a time.
+    """
+    return calendar_events_for_export(calendar).iterator(chunk_size=chunk_size)
+
+
+def aget_calendar_events_for_export(calendar: Calendar, *, chunk_size: int = 2000) -> AsyncIterator[dict]:
+    """
+    `get_calendar_events_for_export` for `acalendar_to_ics`: each chunk is fetched in a thread.
+    """
+    return calendar_events_for_export(calendar).aiterator(chunk_size=chunk_size)
+
+
+def user_data_querysets(user) -> tuple[QuerySet, QuerySet]:
+    """
+    The calendars and the events the calendar/event lists of `user` are made of. Calendars of
+    other users count too when `user` has events in them.
+    """
+    calendar_ids = Calendar.objects.filter(Q(user=user) | Q(events__user=user)).values("id")
+
+    return (
+        Calendar.objects.filter(id__in=calendar_ids),
+        Event.objects.filter(Q(user=user) | Q(calendar_id__in=calendar_ids)),
+    )
+
+
+def get_calendar_user_ids(calendar_ids: Iterable) -> set:
+    """
+    The users whose calendar/event lists the calendars are part of, see `user_data_querysets`:
+    their owners and everyone with an event in them.
+    """
+    calendar_ids = list(calendar_ids)
+    owners = Calendar.objects.filter(id__in=calendar_ids).order_by().values_list("user_id", flat=True)
+    authors = Event.objects.filter(calendar_id__in=calendar_ids).order_by().values_list("user_id", flat=True)
+
+    return set(owners.union(authors))
+
+
+def get_user_data_version(user) -> tuple:
+    """
+    Changes whenever anything the calendar/event lists of `user` are made of changes:
+    `(max(updated_at), count)` of their calendars and events, the counts catching deletions.
+    """
+    calendars, events = user_data_querysets(user)
+
+    calendars = calendars.aggregate(updated_at=Max("updated_at"), count=Count("id"))
+    events = events.aggregate(updated_at=Max("updated_at"), count=Count("id"))
+
+    return user.updated_at, calendars["updated_at"], calendars["count"], events["updated_at"], events["count"]
+
+
+async def aget_user_data_version(user) -> tuple:
+    calendars, events = user_data_querysets(user)
+
+    calendars = await calendars.aaggregate(updated_at=Max("updated_at"), count=Count("id"))
+    events = await events.aaggregate(updated_at=Max("updated_at"), count=Count("id"))
+
+    return user.updated_at, calendars["updated_at"], calendars["count"], events["updated_at"], events["count"]
+
+
+def get_calendar_data_version(calendar_id: str, user) -> tuple:
+    calendar_updated_at = (
+        Calendar.objects.filter(id=calendar_id, user=user).values_list("updated_at", flat=True).first()
+    )
+    events = Event.objects.filter(calendar_id=calendar_id).aggregate(updated_at=Max("updated_at"), count=Count("id"))
+
+    return calendar_updated_at, events["updated_at"], events["count"]
+
+
+async def aget_calendar_data_version(calendar_id: str, user) -> tuple:
+    calendar_updated_at = (
+        await Calendar.objects.filter(id=calendar_id, user=user).values_list("updated_at", flat=True).afirst()
+    )
+    events = await Event.objects.filter(calendar_id=calendar_id).aaggregate(
+        updated_at=Max("updated_at"),
+        count=Count("id"),
+    )
+
+    return calendar_updated_at, events["updated_at"], events["count"]
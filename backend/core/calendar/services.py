@@ -1,14 +1,23 @@
 # calendars/services.py
 
+from typing import Iterable
+
+from django.conf import settings
 from django.db import transaction
 
+from core.common.cache import user_cache_invalidate
+from core.events.models import Event, RecurrenceRule
+from core.sync.models import Tombstone
+from core.sync.notifications import CREATED, DELETED, UPDATED, changes_notify
+from core.sync.services import tombstones_create
 from core.users.models import User
 
 from .models import Calendar
+from .selectors import get_calendar_user_ids
 
 
 def calendar_create(user: User, *, name: str, description: str, color: str, is_visible: bool) -> Calendar:
-    return Calendar.objects.create(
+    calendar = Calendar.objects.create(
         user=user,
         name=name,
         description=description,
@@ -16,6 +25,11 @@ def calendar_create(user: User, *, name: str, description: str, color: str, is_v
         is_visible=is_visible,
     )
 
+    user_cache_invalidate(user.id)
+    changes_notify(kind=Tombstone.CALENDAR, action=CREATED, changes=[(calendar.id, [user.id])])
+
+    return calendar
+
 
 @transaction.atomic
 def calendar_update(calendar_id: str, user, *, name: str, description: str, color: str, is_visible: bool) -> Calendar:
@@ -25,8 +39,58 @@ def calendar_update(calendar_id: str, user, *, name: str, description: str, colo
     calendar.color = color
     calendar.is_visible = is_visible
     calendar.save()
+
+    # The calendar is in the lists, and on the clients, of everyone with an event in it.
+    user_ids = get_calendar_user_ids([calendar.id])
+    user_cache_invalidate(*user_ids)
+    changes_notify(kind=Tombstone.CALENDAR, action=UPDATED, changes=[(calendar.id, user_ids)])
+
     return calendar
 
 
 def calendar_delete(calendar_id: str, user) -> None:
-    Calendar.objects.filter(id=calendar_id, user=user).delete()
+    with transaction.atomic():
+        rows = list(
+            Event.objects.filter(calendar_id=calendar_id, calendar__user=user).values_list(
+                "id",
+                "recurrence_id",
+                "user_id",
+            ),
+        )
+
+        # The events and their materialized occurrences go with the calendar through the cascade.
+        deleted, _ = Calendar.objects.filter(id=calendar_id, user=user).delete()
+
+        if not deleted:
+            return
+
+        # The cascade does not reach the rules, the events point to them.
+        RecurrenceRule.objects.filter(id__in=[recurrence_id for _, recurrence_id, _ in rows if recurrence_id]).delete()
+
+        event_user_ids = {event_user_id for _, _, event_user_id in rows}
+        calendar_deletions = [(calendar_id, [user.id, *event_user_ids])]
+        event_deletions = [(event_id, [user.id, event_user_id]) for event_id, _, event_user_id in rows]
+
+        tombstones_create(kind=Tombstone.CALENDAR, deletions=calendar_deletions)
+        tombstones_create(kind=Tombstone.EVENT, deletions=event_deletions)
+        tombstones_create(
+            kind=Tombstone.RECURRENCE_RULE,
+            deletions=[
+                (recurrence_id, [user.id, event_user_id]) for _, recurrence_id, event_user_id in rows if recurrence_id
+            ],
+        )
+
+        user_cache_invalidate(user.id, *event_user_ids)
+        changes_notify(kind=Tombstone.CALENDAR, action=DELETED, changes=calendar_deletions)
+        changes_notify(kind=Tombstone.EVENT, action=DELETED, changes=event_deletions)
+
+
+def calendar_users_cache_invalidate(calendar_ids: Iterable, *user_ids) -> None:
+    """
+    `user_cache_invalidate` for `user_ids` and for everyone whose lists show the calendars, see
+    `get_calendar_user_ids`. Call it after the write: the users it adds are read from the database.
+    """
+    if not settings.API_CACHE_ENABLED:
+        return
+
+    user_cache_invalidate(*user_ids, *get_calendar_user_ids(calendar_ids))
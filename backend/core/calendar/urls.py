@@ -1,14 +1,33 @@
+from django.conf import settings
 from django.urls import path
 from django.urls.resolvers import URLPattern
 
-from .apis import CalendarCreateApi, CalendarDeleteApi, CalendarDetailApi, CalendarListApi, CalendarUpdateApi
+from .apis import (
+    AsyncCalendarDetailApi,
+    AsyncCalendarListApi,
+    CalendarCreateApi,
+    CalendarDeleteApi,
+    CalendarDetailApi,
+    CalendarExportApi,
+    CalendarImportApi,
+    CalendarListApi,
+    CalendarUpdateApi,
+)
 
 app_name = "calendar"
 
+# See `API_ASYNC_VIEWS`.
+if settings.API_ASYNC_VIEWS:
+    list_api, detail_api = AsyncCalendarListApi, AsyncCalendarDetailApi
+else:
+    list_api, detail_api = CalendarListApi, CalendarDetailApi
+
 urlpatterns: list[URLPattern] = [
-    path("", CalendarListApi.as_view(), name="calendar-list"),
+    path("", list_api.as_view(), name="calendar-list"),
     path("create/", CalendarCreateApi.as_view(), name="calendar-create"),
-    path("<uuid:calendar_id>/", CalendarDetailApi.as_view(), name="calendar-detail"),
+    path("<uuid:calendar_id>/", detail_api.as_view(), name="calendar-detail"),
     path("<uuid:calendar_id>/update/", CalendarUpdateApi.as_view(), name="calendar-update"),
     path("<uuid:calendar_id>/delete/", CalendarDeleteApi.as_view(), name="calendar-delete"),
+    path("<uuid:calendar_id>/export.ics", CalendarExportApi.as_view(), name="calendar-export"),
+    path("<uuid:calendar_id>/import/", CalendarImportApi.as_view(), name="calendar-import"),
 ]
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core.common"
+
+    def ready(self):
+        # Connects the signal receivers that keep the API response cache fresh.
+        from core.common import cache  # noqa: F401
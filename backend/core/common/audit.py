@@ -0,0 +1,368 @@
+"""
+Batched easyaudit logging backend.
+
+easyaudit hands every request / CRUD / login event to its logging backend, the
+stock one INSERTs it right away, inside the request. `BatchedAuditBackend` puts
+the event on an in-memory queue instead, and a background thread (one per
+process, started on the first event) writes the queue with one `bulk_create`
+per model and batch.
+
+- Backpressure: when `AUDIT_QUEUE_SIZE` events are waiting, the writer blocks for
+  up to `AUDIT_QUEUE_TIMEOUT` seconds and then writes its event itself.
+- Shutdown: the queue is flushed when the process exits (`atexit`).
+- Failures: a batch that can not be written is retried row by row, rows that still
+  fail are appended to `AUDIT_SPOOL_PATH` and written on the next start.
+
+Events still in memory when a process is killed are lost.
+
+Writes that send no model signals (`bulk_create`, `_raw_delete`) are logged with
+`audit_crud_log`, the same CRUD events easyaudit would record for them one by one.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, close_old_connections, connections, transaction
+from django.db.models import Model
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from easyaudit.models import CRUDEvent, LoginEvent, RequestEvent
+from easyaudit.settings import DATABASE_ALIAS, WATCH_MODEL_EVENTS
+
+logger = logging.getLogger(__name__)
+
+EVENT_MODELS = {
+    "request": RequestEvent,
+    "crud": CRUDEvent,
+    "login": LoginEvent,
+}
+
+_STOP = object()
+
+
+class SpoolEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # ASGI requests carry their query string as bytes.
+        if isinstance(o, bytes):
+            return o.decode("utf-8", "replace")
+
+        return super().default(o)
+
+
+class AuditSink:
+    def __init__(
+        self,
+        *,
+        batch_size: int,
+        flush_interval: float,
+        queue_size: int,
+        queue_timeout: float,
+        spool_path: str = "",
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.spool_path = Path(spool_path) if spool_path else None
+
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+
+    def put(self, kind: str, data: dict):
+        self._ensure_started()
+
+        try:
+            self.queue.put((kind, data), timeout=self.queue_timeout)
+        except queue.Full:
+            # The writer thread is behind: write this event inline rather than dropping it.
+            self.write([(kind, data)])
+
+    def put_many(self, kind: str, items: Iterable[dict]):
+        """
+        `put` for many events at once: the ones the queue has no room for are written right away, in batches.
+        """
+        self._ensure_started()
+        overflow = []
+
+        for data in items:
+            if not overflow:
+                try:
+                    self.queue.put_nowait((kind, data))
+                    continue
+                except queue.Full:
+                    pass
+
+            overflow.append((kind, data))
+
+        if overflow:
+            self.write(overflow)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Waits until every queued event is written. Returns `False` on timeout.
+        """
+        deadline = time.monotonic() + timeout
+
+        while self.queue.unfinished_tasks:
+            if time.monotonic() > deadline or not self._is_running():
+                return False
+
+            time.sleep(0.01)
+
+        return True
+
+    def close(self, timeout: float = 10.0):
+        if not self._is_running():
+            return
+
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.error("Audit queue still full on shutdown, %d events are lost", self.queue.qsize())
+            return
+
+        self._thread.join(timeout)
+
+    def _is_running(self) -> bool:
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def _ensure_started(self):
+        if self._is_running():
+            return
+
+        with self._lock:
+            if self._is_running():
+                return
+
+            if self._pid != os.getpid():
+                # Forked (e.g. gunicorn workers): the parent's queue and its locks are not ours.
+                self.queue = queue.Queue(maxsize=self.queue_size)
+                atexit.register(self.close)
+
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            self.replay_spool()
+
+            stopping = False
+            while not stopping:
+                batch, stopping = self._take_batch()
+
+                if batch:
+                    close_old_connections()
+                    self.write(batch)
+                    # Between batches the connection is closed or given back to the pool, unless it is persistent.
+                    close_old_connections()
+
+                for _ in range(len(batch) + stopping):
+                    self.queue.task_done()
+        finally:
+            connections.close_all()
+
+    def _take_batch(self) -> tuple[list, bool]:
+        item = self.queue.get()
+
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+
+            try:
+                item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is _STOP:
+                return batch, True
+
+            batch.append(item)
+
+        return batch, False
+
+    def write(self, batch: list[tuple[str, dict]]):
+        rows = defaultdict(list)
+
+        for kind, data in batch:
+            rows[EVENT_MODELS[kind]].append(EVENT_MODELS[kind](**data))
+
+        try:
+            with transaction.atomic(using=DATABASE_ALIAS):
+                for model, objs in rows.items():
+                    model.objects.bulk_create(objs, batch_size=self.batch_size)
+        except Exception:
+            logger.exception("Could not write a batch of %d audit events, writing them one by one", len(batch))
+
+            for kind, data in batch:
+                self._write_one(kind, data)
+
+    def _write_one(self, kind: str, data: dict):
+        try:
+            try:
+                with transaction.atomic(using=DATABASE_ALIAS):
+                    EVENT_MODELS[kind].objects.create(**data)
+            except IntegrityError:
+                if data.get("user_id") is None:
+                    raise
+
+                # The acting user has been deleted in the meantime.
+                with transaction.atomic(using=DATABASE_ALIAS):
+                    EVENT_MODELS[kind].objects.create(**{**data, "user_id": None})
+        except Exception:
+            logger.exception("Could not write a %s audit event", kind)
+            self.spool([(kind, data)])
+
+    def spool(self, batch: list[tuple[str, dict]]):
+        if self.spool_path is None:
+            logger.error("Dropping %d audit events, AUDIT_SPOOL_PATH is not set", len(batch))
+            return
+
+        with self._spool_lock, self.spool_path.open("a", encoding="utf-8") as spool:
+            for kind, data in batch:
+                spool.write(json.dumps({"kind": kind, "data": data}, cls=SpoolEncoder) + "\n")
+
+    def replay_spool(self):
+        if self.spool_path is None or not self.spool_path.exists():
+            return
+
+        # Events that fail again are spooled to `spool_path` anew.
+        replaying = self.spool_path.with_name(f"{self.spool_path.name}.{os.getpid()}.replaying")
+
+        with self._spool_lock:
+            try:
+                self.spool_path.rename(replaying)
+            except FileNotFoundError:
+                # Another process got there first.
+                return
+
+        batch = []
+        with replaying.open(encoding="utf-8") as spool:
+            for line in spool:
+                item = json.loads(line)
+                item["data"]["datetime"] = parse_datetime(item["data"]["datetime"])
+                batch.append((item["kind"], item["data"]))
+
+                if len(batch) >= self.batch_size:
+                    self.write(batch)
+                    batch = []
+
+        if batch:
+            self.write(batch)
+
+        replaying.unlink()
+
+
+_sink: Optional[AuditSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_audit_sink() -> AuditSink:
+    global _sink
+
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = AuditSink(
+                    batch_size=settings.AUDIT_BATCH_SIZE,
+                    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+                    queue_size=settings.AUDIT_QUEUE_SIZE,
+                    queue_timeout=settings.AUDIT_QUEUE_TIMEOUT,
+                    spool_path=settings.AUDIT_SPOOL_PATH,
+                )
+
+    return _sink
+
+
+class BatchedAuditBackend:
+    """
+    `DJANGO_EASY_AUDIT_LOGGING_BACKEND` that queues the events, see the module docstring.
+    With `AUDIT_ASYNC=False` every event is written right away, like easyaudit's `ModelBackend`.
+    """
+
+    def request(self, request_info: dict):
+        self._log("request", request_info)
+
+    def crud(self, crud_info: dict):
+        self._log("crud", crud_info)
+
+    def login(self, login_info: dict):
+        self._log("login", login_info)
+
+    def _log(self, kind: str, data: dict):
+        if settings.AUDIT_ASYNC:
+            get_audit_sink().put(kind, data)
+        else:
+            EVENT_MODELS[kind].objects.create(**data)
+
+
+def audit_crud_log(
+    event_type: int,
+    instances: Iterable[Model],
+    *,
+    changed_fields: Optional[list[dict]] = None,
+    using: str = DEFAULT_DB_ALIAS,
+):
+    """
+    Logs the `CRUDEvent.CREATE`, `UPDATE` or `DELETE` of `instances`, all of one model, written without the
+    signals easyaudit listens to. `changed_fields`, for updates, holds the `easyaudit.utils.model_delta` of
+    each instance. The events are built now and queued (or, with `AUDIT_ASYNC=False`, written in batches)
+    once the transaction commits, like easyaudit does.
+    """
+    # easyaudit's signals module loads the logging backend, this module, on import.
+    from easyaudit.signals.model_signals import get_current_user_details, should_audit
+
+    instances = list(instances)
+
+    if not WATCH_MODEL_EVENTS or not instances or not should_audit(instances[0]):
+        return
+
+    user_id, user_pk_as_string = get_current_user_details()
+    content_type_id = ContentType.objects.get_for_model(instances[0]).id
+    now = timezone.now()
+
+    events = []
+    for index, instance in enumerate(instances):
+        data = {
+            "event_type": event_type,
+            "object_repr": str(instance),
+            "object_json_repr": serializers.serialize("json", [instance]),
+            "content_type_id": content_type_id,
+            "object_id": instance.pk,
+            "user_id": user_id,
+            "datetime": now,
+            "user_pk_as_string": user_pk_as_string,
+        }
+
+        if changed_fields is not None:
+            data["changed_fields"] = json.dumps(changed_fields[index])
+
+        events.append(data)
+
+    def log():
+        if settings.AUDIT_ASYNC:
+            get_audit_sink().put_many("crud", events)
+        else:
+            get_audit_sink().write([("crud", data) for data in events])
+
+    transaction.on_commit(log, using=using)
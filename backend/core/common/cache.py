@@ -0,0 +1,205 @@
+"""
+Versioned per-user response cache.
+
+Every user has a generation token and each cached response is keyed by it.
+Writes replace the token once the transaction commits, which orphans every cached
+response of that user at once; orphaned entries simply expire.
+
+The token is replaced by a fresh random value instead of being incremented. A
+response computed after reading token T was computed after T was written, hence
+after the commit of the write that produced T, so it can never be stale - even
+when two processes replace the token concurrently on a backend without atomic
+increments (like the file based one).
+
+With the cache on, the ETags of the cached views are made of the generation too
+(see `user_cache_version`): a conditional request costs one cache read, and the
+ETag always names the generation the body was cached under.
+"""
+
+import hashlib
+import uuid
+from collections import Counter
+from typing import Any, Awaitable, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+_MISSING = object()
+
+_metrics: Counter = Counter()
+
+
+def _cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _generation_key(user_id) -> str:
+    return f"api:user:{user_id}:generation"
+
+
+def get_user_generation(user_id) -> str:
+    cache = _cache()
+    key = _generation_key(user_id)
+
+    generation = cache.get(key)
+
+    if generation is None:
+        # Another process may have set it in between, `add` keeps theirs.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(key)
+
+    return generation
+
+
+async def aget_user_generation(user_id) -> str:
+    cache = _cache()
+    key = _generation_key(user_id)
+
+    generation = await cache.aget(key)
+
+    if generation is None:
+        await cache.aadd(key, uuid.uuid4().hex, timeout=None)
+        generation = await cache.aget(key)
+
+    return generation
+
+
+def bump_user_generation(user_id) -> None:
+    _cache().set(_generation_key(user_id), uuid.uuid4().hex, timeout=None)
+
+
+def user_cache_invalidate(*user_ids) -> None:
+    """
+    Called by the services on every write, with the users whose responses include the written rows.
+    """
+    if not settings.API_CACHE_ENABLED:
+        return
+
+    for user_id in set(user_ids):
+        transaction.on_commit(lambda user_id=user_id: bump_user_generation(user_id))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def _invalidate_saved_user(sender, instance, update_fields=None, **kwargs):
+    # `login()` only updates `last_login`, which no response shows.
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+
+    user_cache_invalidate(instance.pk)
+
+
+def user_cache_version(user, version: Callable[[], tuple]) -> tuple:
+    """
+    The version the ETag of a cached view is made of, see `make_etag`.
+    With the cache on it is `(generation,)`, one cache read and no query: pass it on to `user_cached` so
+    the body is looked up under that same generation. With the cache off it is `version()`, the
+    database version of the rows, e.g. `get_user_data_version`.
+    """
+    if not settings.API_CACHE_ENABLED:
+        return version()
+
+    return (get_user_generation(user.id),)
+
+
+async def auser_cache_version(user, version: Callable[[], Awaitable[tuple]]) -> tuple:
+    if not settings.API_CACHE_ENABLED:
+        return await version()
+
+    return (await aget_user_generation(user.id),)
+
+
+def _response_key(*, user_id, generation: str, namespace: str, params) -> str:
+    query = "&".join(f"{key}={value}" for key, values in sorted(params.lists()) for value in values)
+    digest = hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+
+    return f"api:user:{user_id}:{generation}:{namespace}:{digest}"
+
+
+def user_cached(
+    *,
+    user,
+    namespace: str,
+    params,
+    compute: Callable[[], Any],
+    version: Optional[tuple] = None,
+) -> tuple[Any, bool]:
+    """
+    Returns `(data, hit)`, computing and caching `data` on a miss.
+    `params` are the query params, `namespace` tells apart the views and their URL kwargs.
+    `version` is the one from `user_cache_version` the ETag was made of, read otherwise.
+    """
+    if not settings.API_CACHE_ENABLED:
+        return compute(), False
+
+    cache = _cache()
+    key = _response_key(
+        user_id=user.id,
+        generation=version[0] if version else get_user_generation(user.id),
+        namespace=namespace,
+        params=params,
+    )
+
+    data = cache.get(key, _MISSING)
+
+    if data is not _MISSING:
+        _metrics["hits"] += 1
+        return data, True
+
+    _metrics["misses"] += 1
+    data = compute()
+    cache.set(key, data, timeout=settings.API_CACHE_TIMEOUT)
+
+    return data, False
+
+
+async def auser_cached(
+    *,
+    user,
+    namespace: str,
+    params,
+    compute: Callable[[], Awaitable[Any]],
+    version: Optional[tuple] = None,
+) -> tuple[Any, bool]:
+    """
+    `user_cached` for async views, `compute` being a coroutine function.
+    """
+    if not settings.API_CACHE_ENABLED:
+        return await compute(), False
+
+    cache = _cache()
+    key = _response_key(
+        user_id=user.id,
+        generation=version[0] if version else await aget_user_generation(user.id),
+        namespace=namespace,
+        params=params,
+    )
+
+    data = await cache.aget(key, _MISSING)
+
+    if data is not _MISSING:
+        _metrics["hits"] += 1
+        return data, True
+
+    _metrics["misses"] += 1
+    data = await compute()
+    await cache.aset(key, data, timeout=settings.API_CACHE_TIMEOUT)
+
+    return data, False
+
+
+def user_cache_metrics() -> dict:
+    hits, misses = _metrics["hits"], _metrics["misses"]
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+    }
+
+
+def cache_status_header(response, hit: bool):
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    return response
@@ -0,0 +1,254 @@
+"""
+A channel layer for several server processes on one host, without a broker.
+
+`UnixSocketChannelLayer` is the `InMemoryChannelLayer` of each process, plus one Unix datagram
+socket per process in a shared directory. A process binds its socket when it first creates a
+channel (`new_channel`, i.e. when a consumer connects), and the names of its channels carry the
+token its socket is named after:
+
+- `send` to a channel of another process is one datagram to that process' socket;
+- `group_send` delivers to the members in this process and sends one datagram to every other
+  bound socket, whose process delivers to its own members. Group membership never leaves the
+  process of the channel, so it expires with `group_expiry` like in memory.
+
+Processes that only send (WSGI workers, management commands) never bind a socket. Messages are
+delivered at most once. A sender waits up to `send_timeout` seconds for a peer whose socket queue
+is full (`net.unix.max_dgram_qlen` datagrams), then drops the message, as a full channel would.
+Sockets left behind by dead processes are removed on the first failed send. Channels that are
+not process-specific (no `!`) stay in their process.
+"""
+
+import asyncio
+import atexit
+import errno
+import os
+import secrets
+import socket
+import time
+
+import msgpack
+from channels.layers import InMemoryChannelLayer
+
+# Datagram kinds.
+CHANNEL = "c"
+GROUP = "g"
+
+
+class UnixSocketChannelLayer(InMemoryChannelLayer):
+    def __init__(
+        self,
+        directory: str,
+        expiry: int = 60,
+        group_expiry: int = 86400,
+        capacity: int = 100,
+        channel_capacity=None,
+        max_message_size: int = 64 * 1024,
+        send_timeout: float = 0.5,
+        **kwargs,
+    ):
+        super().__init__(
+            expiry=expiry,
+            group_expiry=group_expiry,
+            capacity=capacity,
+            channel_capacity=channel_capacity,
+            **kwargs,
+        )
+        self.directory = directory
+        self.max_message_size = max_message_size
+        self.send_timeout = send_timeout
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self.token = f"{self._pid}-{secrets.token_hex(4)}"
+        self._socket = None
+        self._reader_loop = None
+
+    def _check_fork(self):
+        # A forked worker gets a copy of the layer: its own token, socket and (empty) channels.
+        if os.getpid() != self._pid:
+            self._reset()
+            self.channels = {}
+            self.groups = {}
+
+    def _path(self, token: str) -> str:
+        return os.path.join(self.directory, f"{token}.sock")
+
+    def _sender(self) -> socket.socket:
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.setblocking(False)
+
+        return self._socket
+
+    def _bind(self):
+        if self._socket is not None and self._socket.getsockname():
+            return
+
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.setblocking(False)
+        receiver.bind(self._path(self.token))
+
+        if self._socket is not None:
+            self._socket.close()
+
+        self._socket = receiver
+        atexit.register(self._unlink, self._path(self.token))
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def _listen(self):
+        """
+        Binds the socket of the process and reads it from the running event loop.
+        """
+        self._bind()
+        loop = asyncio.get_running_loop()
+
+        if self._reader_loop is loop:
+            return
+
+        if self._reader_loop is not None and not self._reader_loop.is_closed():
+            self._reader_loop.remove_reader(self._socket.fileno())
+
+        loop.add_reader(self._socket.fileno(), self._read)
+        self._reader_loop = loop
+
+    def _read(self):
+        while True:
+            try:
+                data = self._socket.recv(self.max_message_size)
+            except BlockingIOError:
+                return
+
+            kind, name, message = msgpack.unpackb(data, raw=False)
+
+            if kind == CHANNEL:
+                self._deliver(name, message)
+            else:
+                self._clean_expired()
+
+                for channel in list(self.groups.get(name, ())):
+                    self._deliver(channel, message)
+
+    def _deliver(self, channel: str, message: dict):
+        queue = self.channels.setdefault(channel, asyncio.Queue())
+
+        # A full channel drops the message, as `group_send` does.
+        if queue.qsize() < self.capacity:
+            queue.put_nowait((time.time() + self.expiry, message))
+
+    def _channel_token(self, channel: str):
+        if "!" not in channel:
+            return None
+
+        return channel[: channel.index("!")].rsplit(".", 1)[-1]
+
+    async def _send_datagram(self, token: str, data: bytes) -> None:
+        deadline = None
+        delay = 0.0001
+
+        while True:
+            try:
+                self._sender().sendto(data, self._path(token))
+                return
+            except FileNotFoundError:
+                return
+            except BlockingIOError:
+                # The queue of the peer is full, give it some time to catch up before dropping the message.
+                now = time.monotonic()
+                deadline = deadline or now + self.send_timeout
+
+                if now >= deadline:
+                    return
+
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.01)
+            except OSError as e:
+                if e.errno not in (errno.ECONNREFUSED, errno.ENOTSOCK):
+                    raise
+
+                # Left behind by a process that is gone.
+                self._unlink(self._path(token))
+                return
+
+    def _encode(self, kind: str, name: str, message: dict) -> bytes:
+        data = msgpack.packb([kind, name, message], use_bin_type=True)
+
+        if len(data) > self.max_message_size:
+            raise ValueError(f"Message of {len(data)} bytes is over max_message_size ({self.max_message_size})")
+
+        return data
+
+    def _peers(self) -> list[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        own = f"{self.token}.sock"
+
+        return [name[: -len(".sock")] for name in names if name.endswith(".sock") and name != own]
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        self._check_fork()
+        token = self._channel_token(channel)
+
+        if token is None or token == self.token:
+            await super().send(channel, message)
+            return
+
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+
+        await self._send_datagram(token, self._encode(CHANNEL, channel, message))
+
+    async def receive(self, channel):
+        self._check_fork()
+
+        if self._channel_token(channel) == self.token:
+            self._listen()
+
+        return await super().receive(channel)
+
+    async def new_channel(self, prefix="specific."):
+        self._check_fork()
+        self._listen()
+
+        return f"{prefix}{self.token}!{secrets.token_hex(6)}"
+
+    async def group_add(self, group, channel):
+        self._check_fork()
+        await super().group_add(group, channel)
+
+    async def group_send(self, group, message):
+        self._check_fork()
+        await super().group_send(group, message)
+
+        peers = self._peers()
+
+        if peers:
+            data = self._encode(GROUP, group, message)
+
+            for token in peers:
+                await self._send_datagram(token, data)
+
+    async def close(self):
+        if self._reader_loop is not None and not self._reader_loop.is_closed():
+            self._reader_loop.remove_reader(self._socket.fileno())
+
+        if self._socket is not None:
+            if self._socket.getsockname():
+                self._unlink(self._path(self.token))
+
+            self._socket.close()
+
+        self._reset()
@@ -0,0 +1,70 @@
+"""
+Async-capable versions of the sync-only third-party middleware in `MIDDLEWARE`.
+
+Django adapts the middleware chain once, at the first sync-only middleware: everything below
+it then runs in a worker thread, and an async view is called back on the event loop from
+there. With these, the chain stays on the event loop under ASGI and async views run without
+a thread hop. Under WSGI they are the original middleware.
+"""
+
+from asgiref.local import Local
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from easyaudit.middleware import easyaudit
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+# easyaudit keeps the current request (whose user its CRUD events are attributed to) in a
+# `threading.local`, which does not follow a request between the event loop and the thread
+# running its sync code. asgiref's `Local` does, and is a thread local everywhere else.
+easyaudit._thread_locals = Local()
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        static_file = self.find_file(request.path_info) if self.autorefresh else self.files.get(request.path_info)
+
+        if static_file is not None:
+            # Opens and stats the file.
+            return await sync_to_async(self.serve)(static_file, request)
+
+        return await self.get_response(request)
+
+
+class EasyAuditMiddleware(easyaudit.EasyAuditMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        easyaudit._thread_locals.request = request
+
+        try:
+            return await self.get_response(request)
+        finally:
+            easyaudit.clear_request()
@@ -0,0 +1,29 @@
+"""
+Migration operations for PostgreSQL-only schema. Production runs on PostgreSQL;
+the operations below keep the migrations applicable to the SQLite databases used
+offline and in tests, which simply go without the index.
+"""
+
+from django.db import migrations
+
+
+class AddPostgresIndex(migrations.AddIndex):
+    """
+    `AddIndex` for index types only PostgreSQL has (GIN, GiST, operator classes), skipped on
+    other databases. The index is left out of the migration state, so it is not declared in
+    `Meta.indexes` either: SQLite rebuilds tables with every index of the state.
+    """
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def reduce(self, operation, app_label):
+        return False
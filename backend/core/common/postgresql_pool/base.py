@@ -0,0 +1,199 @@
+"""
+PostgreSQL backend lending connections from a pool kept by every process (`DB_CONNECTION_MODE=pool`).
+
+Django 5.0 has no pool for psycopg2 (5.1 adds one for psycopg 3). Here `connect()` borrows a
+connection from the pool of the process instead of opening one, and `close()` - at the end of
+every request, `CONN_MAX_AGE` being 0 - gives it back. Unlike persistent connections, which
+stay with their thread, a connection serves whichever thread needs one next: the number of
+connections follows the number of requests running at once, up to `max_size`, not the number
+of threads that ever ran (ASGI runs every request in a new thread).
+
+`OPTIONS["pool"]` takes the names of Django 5.1's pool settings:
+
+    max_size      connections the process may have; when they are all lent, `connect()` waits
+                  for one to be given back, first come first served
+    timeout       seconds `connect()` waits for a connection before raising `OperationalError`
+    max_idle      seconds a connection may stay unused before it is closed
+    max_lifetime  seconds after which a connection is closed once given back
+    check         ping (`SELECT 1`) a connection before lending it again
+
+Connections are lent newest first, so the ones a quieter load no longer needs reach `max_idle`.
+Transactions left open are rolled back when a connection is given back. A forked process
+(e.g. a gunicorn worker of a preloaded app) starts with a pool of its own.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, connect, *, max_size: int, timeout: float, max_idle: float, max_lifetime: float, check: bool):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check = check
+
+        self._lock = threading.Lock()
+        self._lent = 0
+        # Threads waiting for a connection, each handed the slot of the next one given back in turn.
+        self._waiting: deque[threading.Event] = deque()
+        # `(connection, given back at)`, the connection given back last at the right.
+        self._idle: deque = deque()
+        # `id(connection)` -> opened at, of the connections lent and idle.
+        self._opened_at: dict[int, float] = {}
+
+    def get(self):
+        with self._lock:
+            if self._lent < self.max_size and not self._waiting:
+                self._lent += 1
+                waiter = None
+            else:
+                waiter = threading.Event()
+                self._waiting.append(waiter)
+
+        if waiter is not None and not waiter.wait(self.timeout):
+            with self._lock:
+                # Unless it was handed a slot in the meantime.
+                timed_out = waiter in self._waiting
+
+                if timed_out:
+                    self._waiting.remove(waiter)
+
+            if timed_out:
+                raise base.Database.OperationalError(
+                    f"No database connection free after {self.timeout}s, all {self.max_size} of the pool are in use",
+                )
+
+        try:
+            return self._get_idle() or self._open()
+        except BaseException:
+            self._release()
+            raise
+
+    def put(self, connection, *, reuse: bool = True):
+        try:
+            if reuse and self._reusable(connection):
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+            else:
+                self._discard(connection)
+        finally:
+            self._release()
+
+    def _release(self):
+        with self._lock:
+            if self._waiting:
+                self._waiting.popleft().set()
+            else:
+                self._lent -= 1
+
+    def _open(self):
+        connection = self.connect()
+        self._opened_at[id(connection)] = time.monotonic()
+
+        return connection
+
+    def _get_idle(self):
+        while True:
+            now = time.monotonic()
+            expired = []
+
+            with self._lock:
+                while self._idle and now - self._idle[0][1] > self.max_idle:
+                    expired.append(self._idle.popleft()[0])
+
+                connection = self._idle.pop()[0] if self._idle else None
+
+            for idle_connection in expired:
+                self._discard(idle_connection)
+
+            if connection is None or self._usable(connection):
+                return connection
+
+            self._discard(connection)
+
+    def _usable(self, connection) -> bool:
+        if connection.closed:
+            return False
+
+        if not self.check:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+
+            # Given back out of autocommit, the ping began a transaction.
+            if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except base.Database.Error:
+            return False
+
+        return True
+
+    def _reusable(self, connection) -> bool:
+        if connection.closed or time.monotonic() - self._opened_at[id(connection)] > self.max_lifetime:
+            return False
+
+        if connection.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE:
+            return True
+
+        try:
+            connection.rollback()
+        except base.Database.Error:
+            return False
+
+        return connection.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+
+    def _discard(self, connection):
+        self._opened_at.pop(id(connection), None)
+
+        try:
+            connection.close()
+        except base.Database.Error:
+            pass
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+
+        return conn_params
+
+    def get_pool(self, conn_params) -> ConnectionPool:
+        key = (os.getpid(), self.alias, conn_params.get("dbname"), conn_params.get("host"), conn_params.get("port"))
+
+        with _pools_lock:
+            if key not in _pools:
+                _pools[key] = ConnectionPool(
+                    lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                    **self.settings_dict["OPTIONS"]["pool"],
+                )
+
+            return _pools[key]
+
+    def get_new_connection(self, conn_params):
+        self.connection_pool = self.get_pool(conn_params)
+        self.connection_pool_pid = os.getpid()
+
+        return self.connection_pool.get()
+
+    def _close(self):
+        # Inherited by a forked process, the connection is the parent's: leave it alone.
+        if self.connection_pool_pid != os.getpid():
+            return
+
+        with self.wrap_database_errors:
+            # Closed inside `atomic()`, the connection stays referenced until the block exits: never lend it again.
+            self.connection_pool.put(self.connection, reuse=not self.in_atomic_block)
@@ -0,0 +1,241 @@
+"""
+Request profiling in production, see `config.settings.profiling`.
+
+A sampled request (`PROFILING_SAMPLE_RATE`), or one sending `PROFILING_HEADER` with the value of
+`PROFILING_TOKEN`, is logged to `core.common.profiling` with its wall time, the number and time
+of its SQL queries, and the time spent turning data into its representation (DRF serializers,
+`core.events.representations`) and rendering it, the queries those run lazily excluded. With
+`PROFILING_CPROFILE` (always for the header), it also runs under cProfile, and the stats of the
+ones slower than `PROFILING_SLOW_MS` are dumped to `PROFILING_DIR` (`python -m pstats <file>`).
+
+One cProfile runs at a time in a process: a request profiled while another one is gets only
+the timings. From Python 3.12 on, cProfile records every thread of the process, so its stats
+include whatever ran concurrently.
+
+With neither a sample rate nor a token, the middleware takes itself out of the chain.
+"""
+
+import cProfile
+import functools
+import logging
+import os
+import random
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_cprofile_lock = threading.Lock()
+
+
+class RequestProfile:
+    def __init__(self, *, requested: bool):
+        self.requested = requested
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.timings = {"serialize": 0.0, "render": 0.0}
+        # The section being timed: sections called from inside it (a serializer nested in another) are part of it.
+        self.section = None
+        self.profiler: Optional[cProfile.Profile] = None
+
+
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def timed(section: str):
+    """
+    Adds the time spent in the decorated function to `section` of the profile of the current request, if any.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profile = _profile.get()
+
+            if profile is None or profile.section is not None:
+                return function(*args, **kwargs)
+
+            profile.section = section
+            sql_ms = profile.sql_ms
+            started = time.perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                profile.timings[section] += elapsed - (profile.sql_ms - sql_ms)
+                profile.section = None
+
+        return wrapper
+
+    return decorator
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    profile = _profile.get()
+
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.sql_count += 1
+        profile.sql_ms += (time.perf_counter() - started) * 1000
+
+
+def _connection_created(sender, connection, **kwargs):
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+@functools.cache
+def install():
+    """
+    Times the queries of every connection, and DRF's serializers and JSON rendering.
+    """
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.serializers import BaseSerializer
+
+    connection_created.connect(_connection_created, dispatch_uid="core.common.profiling")
+
+    for connection in connections.all(initialized_only=True):
+        _connection_created(sender=None, connection=connection)
+
+    BaseSerializer.data = property(timed("serialize")(BaseSerializer.data.fget))
+    JSONRenderer.render = timed("render")(JSONRenderer.render)
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_SAMPLE_RATE and not settings.PROFILING_TOKEN:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+        install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        profile = self.start(request)
+
+        if profile is None:
+            return self.get_response(request)
+
+        token = _profile.set(profile)
+        started = time.perf_counter()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop(profile)
+            _profile.reset(token)
+
+        self.report(request, response, profile, (time.perf_counter() - started) * 1000)
+
+        return response
+
+    async def __acall__(self, request):
+        profile = self.start(request)
+
+        if profile is None:
+            return await self.get_response(request)
+
+        # Sync views run in a thread with a copy of this context: the profile follows them there.
+        token = _profile.set(profile)
+        started = time.perf_counter()
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop(profile)
+            _profile.reset(token)
+
+        self.report(request, response, profile, (time.perf_counter() - started) * 1000)
+
+        return response
+
+    def start(self, request) -> Optional[RequestProfile]:
+        value = request.headers.get(settings.PROFILING_HEADER)
+        # Bytes: `compare_digest` raises on non-ASCII strings, header values are decoded as latin-1.
+        requested = bool(value and settings.PROFILING_TOKEN) and secrets.compare_digest(
+            value.encode("latin-1"),
+            settings.PROFILING_TOKEN.encode(),
+        )
+
+        if not requested and random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return None
+
+        profile = RequestProfile(requested=requested)
+
+        if (requested or settings.PROFILING_CPROFILE) and _cprofile_lock.acquire(blocking=False):
+            profile.profiler = cProfile.Profile()
+            profile.profiler.enable()
+
+        return profile
+
+    def stop(self, profile: RequestProfile):
+        if profile.profiler is not None:
+            profile.profiler.disable()
+            _cprofile_lock.release()
+
+    def report(self, request, response, profile: RequestProfile, wall_ms: float):
+        match = request.resolver_match
+        view = match.view_name if match else "-"
+        stats_path = None
+
+        if profile.profiler is not None and settings.PROFILING_DIR and wall_ms >= settings.PROFILING_SLOW_MS:
+            stats_path = os.path.join(
+                settings.PROFILING_DIR,
+                f"{time.strftime("%Y%m%dT%H%M%S")}-{view.replace(":", ".")}-{wall_ms:.0f}ms-{os.getpid()}.prof",
+            )
+
+            try:
+                os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+                profile.profiler.dump_stats(stats_path)
+            except OSError:
+                logger.exception("Could not write the profile of %s %s", request.method, request.path)
+                stats_path = None
+
+        logger.info(
+            "%s %s %s %s %.1fms sql=%d/%.1fms serialize=%.1fms render=%.1fms%s",
+            request.method,
+            request.path,
+            view,
+            response.status_code,
+            wall_ms,
+            profile.sql_count,
+            profile.sql_ms,
+            profile.timings["serialize"],
+            profile.timings["render"],
+            f" profile={stats_path}" if stats_path else "",
+        )
+
+        if profile.requested:
+            response["Server-Timing"] = ", ".join(
+                [
+                    f"total;dur={wall_ms:.1f}",
+                    f'sql;dur={profile.sql_ms:.1f};desc="{profile.sql_count} queries"',
+                    f"serialize;dur={profile.timings["serialize"]:.1f}",
+                    f"render;dur={profile.timings["render"]:.1f}",
+                ],
+            )
@@ -1,5 +1,6 @@
 from django.http import Http404
 from django.shortcuts import get_list_or_404, get_object_or_404
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
 
@@ -29,3 +30,26 @@ def inline_serializer(*, fields, data=None, **kwargs):
         return serializer_class(data=data, **kwargs)
 
     return serializer_class(**kwargs)
+
+
+def datetime_to_representation(value, tz=None):
+    """
+    Same output as `serializers.DateTimeField().to_representation`, without the field machinery.
+    Pass `tz` when formatting many values; it defaults to the current timezone.
+    """
+    if not value:
+        return None
+
+    value = value.astimezone(tz or timezone.get_current_timezone()).isoformat()
+
+    if value.endswith("+00:00"):
+        return value[:-6] + "Z"
+
+    return value
+
+
+def date_to_representation(value):
+    if not value:
+        return None
+
+    return value.isoformat()
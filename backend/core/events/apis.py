@@ -1,17 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers, status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.api.async_views import AsyncApiView
+from core.api.conditional import etag_matches, make_etag, not_modified, set_etag
 from core.api.mixins import ApiAuthMixin
+from core.api.pagination import KeysetPagination
 from core.calendar.models import Calendar
+from core.calendar.selectors import aget_user_data_version, get_user_data_version
 from core.calendar.serializers import CalendarSerializer
+from core.common.cache import auser_cache_version, auser_cached, cache_status_header, user_cache_version, user_cached
+from core.common.utils import datetime_to_representation
 from core.users.serializers import UserSerializer
 
+from .conflicts import EventConflictError
 from .models import Event
-from .selectors import get_event_by_id, get_user_events
-from .serializers import RecurrenceRuleSerializer
-from .services import event_create, event_delete, event_update
+from .representations import aevents_to_representation, event_values, events_to_representation
+from .selectors import (
+    aget_event_by_id,
+    aget_event_data_version,
+    get_event_by_id,
+    get_event_data_version,
+    get_user_busy_blocks,
+    get_user_event_occurrences,
+    get_user_events,
+    search_user_events,
+)
+from .serializers import EventInputSerializer, RecurrenceRuleSerializer, TimeWindowSerializer, validate_bulk_items
+from .services import (
+    event_bulk_create,
+    event_bulk_delete,
+    event_bulk_update,
+    event_create,
+    event_delete,
+    event_update,
+)
 
 
 class EventListApi(ApiAuthMixin, APIView):
@@ -29,15 +57,59 @@ class EventListApi(ApiAuthMixin, APIView):
         updated_at = serializers.DateTimeField()
         recurrence = RecurrenceRuleSerializer()
 
+    class FilterSerializer(serializers.Serializer):
+        calendar_id = serializers.UUIDField(required=False)
+
+    class Pagination(KeysetPagination):
+        ordering = ("start_time", "id")
+        descending = True
+
     serializer_class = OutputSerializer
 
     def get(self, request):
+        filter_serializer = self.FilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+
+        # The window is optional, but `from` and `to` go together.
+        window = {}
+        if {"from", "to"} & set(request.query_params):
+            window_serializer = TimeWindowSerializer(data=request.query_params)
+            window_serializer.is_valid(raise_exception=True)
+            window = window_serializer.validated_data
+
+        paginator = self.Pagination.from_request(request)
+
+        def compute():
+            events = get_user_events(
+                user=request.user,
+                calendar_id=filter_serializer.validated_data.get("calendar_id"),
+                window_start=window.get("from"),
+                window_end=window.get("to"),
+            )
+
+            # `OutputSerializer` documents the shape, `events_to_representation` produces it.
+            # Pages leave out `calendar.events`, their size would grow with the calendars.
+            if paginator is not None:
+                page = paginator.paginate_queryset(event_values(events))
+                return paginator.get_paginated_data(events_to_representation(page, with_calendar_events=False))
+
+            return events_to_representation(event_values(events))
+
         try:
-            events = get_user_events(user=request.user)
+            version = user_cache_version(request.user, lambda: get_user_data_version(request.user))
+            etag = make_etag(request, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
 
-            serializer = self.OutputSerializer(events, many=True)
+            data, hit = user_cached(
+                user=request.user,
+                namespace="events:list",
+                params=request.query_params,
+                compute=compute,
+                version=version,
+            )
 
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return set_etag(cache_status_header(Response(data, status=status.HTTP_200_OK), hit), etag)
 
         except ValidationError as e:
             raise ValidationError(e)
@@ -45,21 +117,233 @@ class EventListApi(ApiAuthMixin, APIView):
             return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class EventCreateApi(ApiAuthMixin, APIView):
-    class InputSerializer(serializers.Serializer):
+class AsyncEventListApi(AsyncApiView):
+    """
+    `EventListApi` for ASGI servers, see `API_ASYNC_VIEWS`.
+    """
+
+    OutputSerializer = EventListApi.OutputSerializer
+    FilterSerializer = EventListApi.FilterSerializer
+    Pagination = EventListApi.Pagination
+
+    async def get(self, request):
+        filter_serializer = self.FilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+
+        window = {}
+        if {"from", "to"} & set(request.query_params):
+            window_serializer = TimeWindowSerializer(data=request.query_params)
+            window_serializer.is_valid(raise_exception=True)
+            window = window_serializer.validated_data
+
+        paginator = self.Pagination.from_request(request)
+
+        async def compute():
+            events = get_user_events(
+                user=request.user,
+                calendar_id=filter_serializer.validated_data.get("calendar_id"),
+                window_start=window.get("from"),
+                window_end=window.get("to"),
+            )
+
+            if paginator is not None:
+                page = await paginator.apaginate_queryset(event_values(events))
+                return paginator.get_paginated_data(await aevents_to_representation(page, with_calendar_events=False))
+
+            return await aevents_to_representation([row async for row in event_values(events)])
+
+        try:
+            version = await auser_cache_version(request.user, lambda: aget_user_data_version(request.user))
+            etag = make_etag(request, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            data, hit = await auser_cached(
+                user=request.user,
+                namespace="events:list",
+                params=request.query_params,
+                compute=compute,
+                version=version,
+            )
+
+            return set_etag(cache_status_header(Response(data, status=status.HTTP_200_OK), hit), etag)
+
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class EventOccurrenceListApi(ApiAuthMixin, APIView):
+    class FilterSerializer(TimeWindowSerializer):
+        max_span = timedelta(days=366)
+
+    class OutputSerializer(serializers.Serializer):
+        event_id = serializers.UUIDField(source="event.id")
+        calendar_id = serializers.UUIDField(source="event.calendar_id")
+        title = serializers.CharField(source="event.title")
+        description = serializers.CharField(source="event.description")
+        color = serializers.CharField(source="event.color", allow_null=True)
+        is_all_day = serializers.BooleanField(source="event.is_all_day")
+        start_time = serializers.DateTimeField()
+        end_time = serializers.DateTimeField()
+        recurrence = RecurrenceRuleSerializer(source="event.recurrence")
+
+    serializer_class = OutputSerializer
+
+    def get(self, request):
+        filter_serializer = self.FilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+
+        try:
+            etag = make_etag(request, *get_user_data_version(request.user))
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            occurrences = get_user_event_occurrences(
+                user=request.user,
+                window_start=filter_serializer.validated_data["from"],
+                window_end=filter_serializer.validated_data["to"],
+            )
+
+            serializer = self.OutputSerializer(occurrences, many=True)
+
+            return set_etag(Response(serializer.data, status=status.HTTP_200_OK), etag)
+
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class EventFreeBusyApi(ApiAuthMixin, APIView):
+    """
+    When is the user busy in `[from, to)`: the occurrences of the events of their visible
+    calendars, merged into sorted, non-overlapping blocks.
+    """
+
+    class FilterSerializer(TimeWindowSerializer):
+        max_span = timedelta(days=366)
+
+        include_all_day = serializers.BooleanField(default=True)
+
+    class OutputSerializer(serializers.Serializer):
+        class BusyBlockSerializer(serializers.Serializer):
+            start = serializers.DateTimeField()
+            end = serializers.DateTimeField()
+
+        busy = BusyBlockSerializer(many=True)
+
+    serializer_class = OutputSerializer
+
+    def get(self, request):
+        filter_serializer = self.FilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+
+        def compute():
+            blocks = get_user_busy_blocks(
+                user=request.user,
+                window_start=filter_serializer.validated_data["from"],
+                window_end=filter_serializer.validated_data["to"],
+                include_all_day=filter_serializer.validated_data["include_all_day"],
+            )
+
+            # `OutputSerializer` documents the shape, the blocks are formatted directly.
+            tz = timezone.get_current_timezone()
+
+            return {
+                "busy": [
+                    {"start": datetime_to_representation(start, tz), "end": datetime_to_representation(end, tz)}
+                    for start, end in blocks
+                ],
+            }
+
+        try:
+            version = user_cache_version(request.user, lambda: get_user_data_version(request.user))
+            etag = make_etag(request, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            data, hit = user_cached(
+                user=request.user,
+                namespace="events:freebusy",
+                params=request.query_params,
+                compute=compute,
+                version=version,
+            )
+
+            return set_etag(cache_status_header(Response(data, status=status.HTTP_200_OK), hit), etag)
+
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class EventSearchApi(ApiAuthMixin, APIView):
+    """
+    Full-text search over the titles and descriptions of the user's events, best match first.
+    """
+
+    class FilterSerializer(serializers.Serializer):
+        q = serializers.CharField(max_length=200)
+        calendar_id = serializers.UUIDField(required=False)
+        limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    class OutputSerializer(serializers.Serializer):
+        id = serializers.UUIDField()
         calendar_id = serializers.UUIDField()
-        title = serializers.CharField(max_length=255)
-        description = serializers.CharField(allow_blank=True)
+        title = serializers.CharField()
+        description = serializers.CharField()
         start_time = serializers.DateTimeField()
         end_time = serializers.DateTimeField()
-        color = serializers.CharField(max_length=7, allow_blank=True, required=False)
+        color = serializers.CharField(allow_null=True)
         is_all_day = serializers.BooleanField()
-        frequency = serializers.CharField()
-        interval = serializers.IntegerField(default=1)
-        weekdays = serializers.JSONField(required=False, allow_null=True)
-        weekday_ordinal = serializers.IntegerField(required=False, allow_null=True)
-        end_date = serializers.DateField(required=False, allow_null=True)
-        repeat_count = serializers.IntegerField(required=False, allow_null=True)
+        recurrence = RecurrenceRuleSerializer()
+        rank = serializers.FloatField()
+
+    serializer_class = OutputSerializer
+
+    def get(self, request):
+        filter_serializer = self.FilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+
+        def compute():
+            events = search_user_events(
+                user=request.user,
+                query=filter_serializer.validated_data["q"],
+                calendar_id=filter_serializer.validated_data.get("calendar_id"),
+                limit=filter_serializer.validated_data["limit"],
+            )
+
+            return self.OutputSerializer(events, many=True).data
+
+        try:
+            version = user_cache_version(request.user, lambda: get_user_data_version(request.user))
+            etag = make_etag(request, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            data, hit = user_cached(
+                user=request.user,
+                namespace="events:search",
+                params=request.query_params,
+                compute=compute,
+                version=version,
+            )
+
+            return set_etag(cache_status_header(Response(data, status=status.HTTP_200_OK), hit), etag)
+
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class EventCreateApi(ApiAuthMixin, APIView):
+    class InputSerializer(EventInputSerializer):
+        # Reject the write with a 409 listing the overlapping events, see `core.events.conflicts`.
+        check_conflicts = serializers.BooleanField(default=False)
 
     class OutputSerializer(serializers.Serializer):
         id = serializers.UUIDField()
@@ -93,6 +377,8 @@ class EventCreateApi(ApiAuthMixin, APIView):
 
             return Response(output_serializer.data, status=status.HTTP_201_CREATED)
 
+        except EventConflictError as e:
+            return Response({"message": e.message, "extra": e.extra}, status=status.HTTP_409_CONFLICT)
         except ValidationError as e:
             raise ValidationError(e)
         except Exception as e:
@@ -113,13 +399,72 @@ class EventDetailApi(ApiAuthMixin, APIView):
     serializer_class = OutputSerializer
 
     def get(self, request, event_id):
+        def compute():
+            event = get_event_by_id(event_id=event_id, user=request.user)
+
+            return self.OutputSerializer(event).data
+
         try:
-            event = get_event_by_id(event_id=event_id)
+            version = user_cache_version(
+                request.user,
+                lambda: get_event_data_version(event_id=event_id, user=request.user),
+            )
+            etag = make_etag(request, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
 
-            serializer = self.OutputSerializer(event)
+            data, hit = user_cached(
+                user=request.user,
+                namespace=f"events:detail:{event_id}",
+                params=request.query_params,
+                compute=compute,
+                version=version,
+            )
 
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return set_etag(cache_status_header(Response(data, status=status.HTTP_200_OK), hit), etag)
 
+        except Event.DoesNotExist:
+            raise NotFound("Event not found.")
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncEventDetailApi(AsyncApiView):
+    """
+    `EventDetailApi` for ASGI servers, see `API_ASYNC_VIEWS`.
+    """
+
+    OutputSerializer = EventDetailApi.OutputSerializer
+
+    async def get(self, request, event_id):
+        async def compute():
+            event = await aget_event_by_id(event_id=event_id, user=request.user)
+
+            return self.OutputSerializer(event).data
+
+        try:
+            version = await auser_cache_version(
+                request.user,
+                lambda: aget_event_data_version(event_id=event_id, user=request.user),
+            )
+            etag = make_etag(request, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            data, hit = await auser_cached(
+                user=request.user,
+                namespace=f"events:detail:{event_id}",
+                params=request.query_params,
+                compute=compute,
+                version=version,
+            )
+
+            return set_etag(cache_status_header(Response(data, status=status.HTTP_200_OK), hit), etag)
+
+        except Event.DoesNotExist:
+            raise NotFound("Event not found.")
         except ValidationError as e:
             raise ValidationError(e)
         except Exception as e:
@@ -127,20 +472,9 @@ class EventDetailApi(ApiAuthMixin, APIView):
 
 
 class EventUpdateApi(ApiAuthMixin, APIView):
-    class InputSerializer(serializers.Serializer):
-        calendar_id = serializers.UUIDField()
-        title = serializers.CharField(max_length=255)
-        description = serializers.CharField(allow_blank=True)
-        start_time = serializers.DateTimeField()
-        end_time = serializers.DateTimeField()
-        color = serializers.CharField(max_length=7, allow_blank=True, required=False)
-        is_all_day = serializers.BooleanField()
-        frequency = serializers.CharField()
-        interval = serializers.IntegerField(default=1)
-        weekdays = serializers.JSONField(required=False, allow_null=True)
-        weekday_ordinal = serializers.IntegerField(required=False, allow_null=True)
-        end_date = serializers.DateField(required=False, allow_null=True)
-        repeat_count = serializers.IntegerField(required=False, allow_null=True)
+    class InputSerializer(EventInputSerializer):
+        # Reject the write with a 409 listing the overlapping events, see `core.events.conflicts`.
+        check_conflicts = serializers.BooleanField(default=False)
 
     class OutputSerializer(serializers.Serializer):
         id = serializers.UUIDField()
@@ -181,6 +515,8 @@ class EventUpdateApi(ApiAuthMixin, APIView):
             raise NotFound("Event not found.")
         except Calendar.DoesNotExist:
             raise NotFound("Calendar not found.")
+        except EventConflictError as e:
+            return Response({"message": e.message, "extra": e.extra}, status=status.HTTP_409_CONFLICT)
         except ValidationError as e:
             raise ValidationError(e)
         except Exception as e:
@@ -200,3 +536,169 @@ class EventDeleteApi(ApiAuthMixin, APIView):
             raise ValidationError(e)
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def bulk_results(*, done: dict[int, dict], errors: dict[int, dict], status_name: str) -> dict:
+    results = [{"index": index, "status": status_name, **result} for index, result in done.items()]
+    results += [{"index": index, "status": "error", "errors": error} for index, error in errors.items()]
+    results.sort(key=lambda result: result["index"])
+
+    return {status_name: len(done), "failed": len(errors), "results": results}
+
+
+class EventBulkCreateApi(ApiAuthMixin, APIView):
+    """
+    Creates up to `EVENT_BULK_MAX_ITEMS` events in one transaction. Every item is validated on its own:
+    the valid ones are created, the others are reported in `results` with their errors.
+    """
+
+    class InputSerializer(serializers.Serializer):
+        events = serializers.ListField(
+            child=serializers.DictField(),
+            allow_empty=False,
+            max_length=settings.EVENT_BULK_MAX_ITEMS,
+        )
+
+    serializer_class = InputSerializer
+
+    def post(self, request):
+        serializer = self.InputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            items, errors = validate_bulk_items(EventInputSerializer(), serializer.validated_data["events"])
+
+            calendars = Calendar.objects.filter(user=request.user).in_bulk(
+                {item["calendar_id"] for item in items.values()},
+            )
+
+            for index, item in list(items.items()):
+                item["calendar"] = calendars.get(item.pop("calendar_id"))
+
+                if item["calendar"] is None:
+                    errors[index] = {"calendar_id": ["Calendar not found."]}
+                    del items[index]
+
+            events = event_bulk_create(user=request.user, events=list(items.values()))
+
+            created = {index: {"id": str(event.id)} for index, event in zip(items, events)}
+
+            return Response(bulk_results(done=created, errors=errors, status_name="created"), status=status.HTTP_200_OK)
+
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class EventBulkUpdateApi(ApiAuthMixin, APIView):
+    """
+    Updates up to `EVENT_BULK_MAX_ITEMS` events of the user in one transaction, see `EventBulkCreateApi`.
+    """
+
+    class InputSerializer(serializers.Serializer):
+        events = serializers.ListField(
+            child=serializers.DictField(),
+            allow_empty=False,
+            max_length=settings.EVENT_BULK_MAX_ITEMS,
+        )
+
+    class ItemSerializer(EventInputSerializer):
+        id = serializers.UUIDField()
+
+    serializer_class = InputSerializer
+
+    def put(self, request):
+        serializer = self.InputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            items, errors = validate_bulk_items(self.ItemSerializer(), serializer.validated_data["events"])
+
+            event_ids = {item["id"] for item in items.values()}
+            events = (
+                Event.objects.filter(user=request.user)
+                .select_related("user", "calendar__user", "recurrence")
+                .in_bulk(event_ids)
+            )
+            calendars = (
+                Calendar.objects.filter(user=request.user)
+                .select_related("user")
+                .in_bulk(
+                    {item["calendar_id"] for item in items.values()},
+                )
+            )
+
+            seen = set()
+            for index, item in list(items.items()):
+                event_id = item.pop("id")
+                item["calendar"] = calendars.get(item.pop("calendar_id"))
+
+                if event_id not in events:
+                    errors[index] = {"id": ["Event not found."]}
+                elif event_id in seen:
+                    errors[index] = {"id": ["The event is already updated by another item."]}
+                elif item["calendar"] is None:
+                    errors[index] = {"calendar_id": ["Calendar not found."]}
+                else:
+                    seen.add(event_id)
+                    items[index] = (events[event_id], item)
+                    continue
+
+                del items[index]
+
+            updated_ids = {event.id for event in event_bulk_update(events=list(items.values()))}
+
+            updated = {}
+            for index, (event, _) in items.items():
+                if event.id in updated_ids:
+                    updated[index] = {"id": str(event.id)}
+                else:
+                    errors[index] = {"id": ["Event not found."]}
+
+            return Response(bulk_results(done=updated, errors=errors, status_name="updated"), status=status.HTTP_200_OK)
+
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class EventBulkDeleteApi(ApiAuthMixin, APIView):
+    """
+    Deletes up to `EVENT_BULK_MAX_ITEMS` events of the user in one transaction.
+    """
+
+    class InputSerializer(serializers.Serializer):
+        ids = serializers.ListField(
+            child=serializers.UUIDField(),
+            allow_empty=False,
+            max_length=settings.EVENT_BULK_MAX_ITEMS,
+        )
+
+    serializer_class = InputSerializer
+
+    def post(self, request):
+        serializer = self.InputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            event_ids = serializer.validated_data["ids"]
+
+            deleted_ids = event_bulk_delete(user=request.user, event_ids=event_ids)
+
+            deleted = {
+                index: {"id": str(event_id)} for index, event_id in enumerate(event_ids) if event_id in deleted_ids
+            }
+            errors = {
+                index: {"id": ["Event not found."]}
+                for index, event_id in enumerate(event_ids)
+                if event_id not in deleted_ids
+            }
+
+            return Response(bulk_results(done=deleted, errors=errors, status_name="deleted"), status=status.HTTP_200_OK)
+
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
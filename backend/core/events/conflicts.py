@@ -0,0 +1,249 @@
+"""
+Conflict detection: which events have an occurrence overlapping one of an event's.
+
+Candidates come from a single query over the owner's visible calendars, restricted
+to the span of the event (or of its series). On PostgreSQL single events are
+matched with an overlap (`&&`) lookup on `tstzrange(start_time, end_time)`,
+served by the `event_time_range_gist_idx` GiST index; elsewhere with the
+`start_time`/`end_time` range conditions of the btree indexes.
+
+Candidates are then checked without expanding the series where possible: the
+starts of a daily or weekly series are arithmetic progressions (one per weekday),
+and whether two progressions ever come within an event duration of each other is
+a question about `gcd(step_a, step_b)`, answered in constant time however long the
+series run. Monthly and yearly series are walked, for at most
+`EVENT_CONFLICT_HORIZON_DAYS` past the later of the two starts.
+
+All-day events neither conflict nor are conflicted with.
+"""
+
+import math
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from core.api.exceptions import ApplicationError
+from core.common.utils import datetime_to_representation
+
+from .models import Event, EventOccurrence, TsTzRange
+from .recurrence import EXPANSION_FIELDS, RECURRING_FREQUENCY_VALUES, RecurrenceExpander
+
+# The most conflicting events reported for one event.
+MAX_CONFLICTS = 20
+
+
+class EventConflictError(ApplicationError):
+    def __init__(self, conflicts: list[Event]):
+        super().__init__(
+            "The event overlaps other events.",
+            extra={
+                "conflicts": [
+                    {
+                        "id": str(event.id),
+                        "title": event.title,
+                        "calendar": str(event.calendar_id),
+                        "start_time": datetime_to_representation(event.start_time),
+                        "end_time": datetime_to_representation(event.end_time),
+                    }
+                    for event in conflicts
+                ],
+            },
+        )
+
+
+def progressions_overlap(
+    a: tuple[int, int, int, Optional[int]],
+    b: tuple[int, int, int, Optional[int]],
+) -> bool:
+    """
+    Whether two arithmetic series of intervals overlap anywhere. Each series is
+    `(first, step, duration, end)`: the intervals `[first + k * step, first + k * step + duration)`
+    for every `k >= 0` with a start below `end` (`None` for no end), all in integer seconds.
+
+    Over a span of at least `lcm(step_a, step_b)` the differences between a start of `a` and a
+    start of `b` take every value `first_b - first_a + n * gcd(step_a, step_b)`, so two
+    long enough series overlap iff one of those values falls in `(-duration_b, duration_a)`.
+    Shorter common spans are checked occurrence by occurrence.
+    """
+    first_a, step_a, duration_a, end_a = a
+    first_b, step_b, duration_b, end_b = b
+
+    common_start = max(first_a, first_b)
+    common_end = min((end for end in (end_a, end_b) if end is not None), default=None)
+    gcd = math.gcd(step_a, step_b)
+
+    if common_end is None or common_end - common_start >= step_a // gcd * step_b + duration_a + duration_b:
+        # The smallest difference `start_b - start_a` above `-duration_b`.
+        difference = -duration_b + 1 + (first_b - first_a + duration_b - 1) % gcd
+        return difference < duration_a
+
+    # Walk the sparser series, looking up the other one around each of its starts.
+    if step_a < step_b:
+        first_a, step_a, duration_a, end_a, first_b, step_b, duration_b, end_b = b + a
+
+    # `start_a + duration_a > first_b`, and `start_a` below both the end of `a` and the last end of `b`.
+    lowest = first_b - duration_a + 1
+    start = first_a + max(0, math.ceil((lowest - first_a) / step_a)) * step_a
+    stop = min(end for end in (end_a, end_b + duration_b if end_b is not None else None) if end is not None)
+
+    for start_a in range(start, stop, step_a):
+        # The first start of `b` with `start_b + duration_b > start_a`.
+        start_b = first_b + max(0, (start_a - duration_b - first_b) // step_b + 1) * step_b
+
+        if start_b < start_a + duration_a and (end_b is None or start_b < end_b):
+            return True
+
+    return False
+
+
+def occurrences_end(expander: RecurrenceExpander) -> Optional[datetime]:
+    """
+    An exclusive bound on the ends of the occurrences, `None` for series that never end.
+    """
+    if not expander.is_recurring:
+        return expander.start_time + expander.duration
+
+    starts_before = expander.starts_before()
+
+    return starts_before + expander.duration if starts_before else None
+
+
+def series_overlap(a: RecurrenceExpander, b: RecurrenceExpander, *, horizon: timedelta) -> bool:
+    """
+    Whether any occurrence of `a` overlaps any occurrence of `b`. Series without a closed
+    form are only walked up to `horizon` after the later of the two starts.
+    """
+    progressions_a, progressions_b = a.progressions(), b.progressions()
+
+    if progressions_a is not None and progressions_b is not None:
+        firsts_a, step_a, end_a = progressions_a
+        firsts_b, step_b, end_b = progressions_b
+
+        return any(
+            progressions_overlap(
+                (first_a, step_a, a.duration_seconds, end_a),
+                (first_b, step_b, b.duration_seconds, end_b),
+            )
+            for first_a in firsts_a
+            for first_b in firsts_b
+        )
+
+    # Walk the one without a closed form (single events have exactly one occurrence),
+    # looking the other one up around each occurrence.
+    if progressions_a is not None or (b.is_recurring and not a.is_recurring):
+        a, b = b, a
+        progressions_b = progressions_a
+
+    window_start = b.start_time
+    window_end = min(
+        (end for end in (occurrences_end(a), occurrences_end(b)) if end is not None),
+        default=datetime.max.replace(tzinfo=window_start.tzinfo),
+    )
+
+    if a.is_recurring:
+        window_end = min(window_end, max(a.start_time, b.start_time) + horizon)
+
+    if progressions_b is not None:
+        return any(
+            progressions_hit(
+                progressions_b,
+                b.duration_seconds,
+                math.floor(occurrence.start_time.timestamp()),
+                math.ceil(occurrence.end_time.timestamp()),
+            )
+            for occurrence in a.between(window_start, window_end)
+        )
+
+    return any(
+        next(b.between(occurrence.start_time, occurrence.end_time), None) is not None
+        for occurrence in a.between(window_start, window_end)
+    )
+
+
+def progressions_hit(progressions: tuple[list[int], int, Optional[int]], duration: int, start: int, end: int) -> bool:
+    """
+    Whether an interval of `RecurrenceExpander.progressions()` overlaps `[start, end)`.
+    """
+    firsts, step, stop = progressions
+
+    for first in firsts:
+        # The first start with `start_b + duration > start`.
+        start_b = first + max(0, (start - duration - first) // step + 1) * step
+
+        if start_b < end and (stop is None or start_b < stop):
+            return True
+
+    return False
+
+
+def event_conflicts_q(*, window_start: datetime, window_end: datetime) -> Q:
+    """
+    Like `selectors.in_window_q`, with single events matched through the GiST index on PostgreSQL.
+    The query must be annotated with `time_range=TsTzRange("start_time", "end_time")` there.
+    """
+    is_recurring = Q(recurrence__frequency__in=RECURRING_FREQUENCY_VALUES)
+    series_not_ended = Q(recurrence__end_date__isnull=True) | Q(recurrence__end_date__gte=window_start.date())
+
+    if connection.vendor == "postgresql":
+        from psycopg2.extras import DateTimeTZRange
+
+        overlaps = Q(time_range__overlap=DateTimeTZRange(window_start, window_end, "[)"))
+    else:
+        overlaps = Q(start_time__lt=window_end, end_time__gt=window_start)
+
+    return (~is_recurring & overlaps) | (is_recurring & Q(start_time__lt=window_end) & series_not_ended)
+
+
+def get_event_conflicts(*, event: Event, limit: int = MAX_CONFLICTS) -> list[Event]:
+    """
+    Up to `limit` events from the visible calendars of the event's owner that overlap `event`
+    (any occurrence of either, for series), in start order.
+    """
+    if event.is_all_day:
+        return []
+
+    expander = RecurrenceExpander(start_time=event.start_time, end_time=event.end_time, rule=event.recurrence)
+    window_end = event.end_time
+
+    if expander.is_recurring:
+        starts_before = expander.starts_before()
+        window_end = starts_before + expander.duration if starts_before else EventOccurrence.SERIES_COMPLETE
+
+    candidates = (
+        Event.objects.filter(user_id=event.user_id, calendar__is_visible=True, is_all_day=False)
+        .exclude(id=event.id)
+        .alias(time_range=TsTzRange("start_time", "end_time"))
+        .filter(event_conflicts_q(window_start=event.start_time, window_end=window_end))
+        .order_by("start_time", "id")
+        # Plain rows: most candidates are discarded, model instances would cost more than the check.
+        .values_list("id", "start_time", "end_time", *[f"recurrence__{field}" for field in EXPANSION_FIELDS])
+    )
+
+    horizon = timedelta(days=settings.EVENT_CONFLICT_HORIZON_DAYS)
+    conflict_ids = []
+
+    for candidate_id, start_time, end_time, *rule in candidates.iterator(chunk_size=2000):
+        other = RecurrenceExpander(
+            start_time=start_time,
+            end_time=end_time,
+            rule=SimpleNamespace(**dict(zip(EXPANSION_FIELDS, rule))) if rule[0] is not None else None,
+        )
+
+        if series_overlap(expander, other, horizon=horizon):
+            conflict_ids.append(candidate_id)
+
+            if len(conflict_ids) >= limit:
+                break
+
+    if not conflict_ids:
+        return []
+
+    return list(
+        Event.objects.filter(id__in=conflict_ids)
+        .only("id", "title", "calendar_id", "start_time", "end_time")
+        .order_by("start_time", "id"),
+    )
@@ -0,0 +1,34 @@
+"""
+Free/busy: turns occurrences into the sorted, non-overlapping busy blocks of a window.
+"""
+
+from itertools import compress, islice
+from operator import gt
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def merge_intervals(starts: list[T], ends: list[T], *, window_start: T, window_end: T) -> list[tuple[T, T]]:
+    """
+    Union of the intervals `[starts[i], ends[i])`, which must all overlap `[window_start, window_end)`,
+    as sorted blocks clipped to the window. Intervals that overlap or touch are merged.
+
+    With the starts and the ends sorted independently, nothing is busy between the i-th end and
+    the (i+1)-th start exactly when that start comes after that end: i+1 intervals have started
+    and at least i+1 have ended. So the gaps are found with two sorts and one C-level pass over
+    the lists, instead of a Python loop over sorted (start, end) pairs. Works on anything ordered;
+    plain ints sort fastest.
+    """
+    if not starts:
+        return []
+
+    starts.sort()
+    ends.sort()
+
+    gaps = list(compress(range(len(starts) - 1), map(gt, islice(starts, 1, None), ends)))
+
+    block_starts = [max(starts[0], window_start), *[starts[index + 1] for index in gaps]]
+    block_ends = [*[ends[index] for index in gaps], min(ends[-1], window_end)]
+
+    return list(zip(block_starts, block_ends))
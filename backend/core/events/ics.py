@@ -0,0 +1,585 @@
+"""
+iCalendar (RFC 5545) export and import.
+
+Everything here works on one event at a time, so a calendar is streamed out of a
+server-side cursor, or in from an uploaded file, without ever holding more than a
+chunk of it.
+
+Recurrence maps onto RRULE the way `core.events.recurrence` expands it: weekdays
+follow the client convention (0 is Sunday), `end_date` is an inclusive date and
+series are expanded in UTC, which is what DTSTART is written in.
+"""
+
+import re
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from itertools import islice
+from types import SimpleNamespace
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .models import RecurrenceRule
+from .recurrence import RecurrenceExpander, normalize_frequency
+
+PRODID = "-//Event Management System//Calendar export//EN"
+
+ICS_WEEKDAYS = ["SU", "MO", "TU", "WE", "TH", "FR", "SA"]
+
+# Lines longer than this many octets are folded, see RFC 5545 3.1.
+MAX_LINE_OCTETS = 75
+
+
+RECURRENCE_EXPORT_FIELDS = (
+    "frequency",
+    "monthly_type",
+    "interval",
+    "weekdays",
+    "weekday_ordinal",
+    "end_date",
+    "repeat_count",
+)
+
+EXPORT_VALUES = (
+    "id",
+    "title",
+    "description",
+    "start_time",
+    "end_time",
+    "is_all_day",
+    "created_at",
+    "updated_at",
+    "recurrence_id",
+    *[f"recurrence__{field}" for field in RECURRENCE_EXPORT_FIELDS],
+)
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+        .replace("\r", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    encoded = line.encode()
+
+    if len(encoded) <= MAX_LINE_OCTETS:
+        return line + "\r\n"
+
+    parts = []
+    start = 0
+    limit = MAX_LINE_OCTETS
+
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a UTF-8 sequence: continuation bytes look like 0b10xxxxxx.
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+
+        parts.append(encoded[start:end].decode())
+        start = end
+        # Continuation lines start with a space, which counts towards their length.
+        limit = MAX_LINE_OCTETS - 1
+
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_datetime(value: datetime) -> str:
+    # Formatted by hand, `strftime` is the most expensive call of an export.
+    value = value.astimezone(dt_timezone.utc)
+    return f"{value.year:04}{value.month:02}{value.day:02}T{value.hour:02}{value.minute:02}{value.second:02}Z"
+
+
+def format_date(value) -> str:
+    return f"{value.year:04}{value.month:02}{value.day:02}"
+
+
+def rrule_for(
+    *,
+    start_time: datetime,
+    end_time: datetime,
+    rule: Optional[RecurrenceRule],
+    is_all_day: bool = False,
+) -> Optional[str]:
+    frequency = normalize_frequency(rule.frequency) if rule is not None else None
+
+    if frequency is None:
+        return None
+
+    parts = [f"FREQ={frequency}"]
+
+    if rule.interval and rule.interval > 1:
+        parts.append(f"INTERVAL={rule.interval}")
+
+    weekdays = [ICS_WEEKDAYS[day] for day in sorted(set(rule.weekdays or [])) if 0 <= day <= 6]
+
+    if frequency == RecurrenceRule.WEEKLY:
+        # Weekly periods are anchored on Mondays.
+        parts.append("WKST=MO")
+        if weekdays:
+            parts.append(f"BYDAY={",".join(weekdays)}")
+
+    if frequency == RecurrenceRule.MONTHLY and (rule.monthly_type or "").upper() == RecurrenceRule.WEEKDAY:
+        ordinal = rule.weekday_ordinal or 1
+        weekdays = weekdays or [ICS_WEEKDAYS[(start_time.weekday() + 1) % 7]]
+        parts.append(f"BYDAY={",".join(f"{ordinal}{day}" for day in weekdays)}")
+
+    until = None
+    if rule.end_date:
+        until = datetime.combine(rule.end_date, time(23, 59, 59), tzinfo=dt_timezone.utc)
+
+    # RRULE can not hold both COUNT and UNTIL: keep whichever ends the series first.
+    if rule.repeat_count and until is not None:
+        expander = RecurrenceExpander(start_time=start_time, end_time=end_time, rule=rule)
+        occurrences = expander.between(start_time, until + timedelta(seconds=1))
+        # The series reaches its last counted occurrence before `end_date`.
+        if next(islice(occurrences, rule.repeat_count - 1, None), None) is not None:
+            until = None
+
+    if rule.repeat_count and until is None:
+        parts.append(f"COUNT={rule.repeat_count}")
+    elif until is not None:
+        # UNTIL has the value type of DTSTART.
+        parts.append(f"UNTIL={format_date(until) if is_all_day else format_datetime(until)}")
+
+    return ";".join(parts)
+
+
+def vevent_lines(
+    *,
+    uid: str,
+    title: str,
+    description: str,
+    start_time: datetime,
+    end_time: datetime,
+    is_all_day: bool,
+    created_at: datetime,
+    updated_at: datetime,
+    rule: Optional[RecurrenceRule],
+) -> Iterator[str]:
+    yield "BEGIN:VEVENT"
+    yield f"UID:{uid}"
+    yield f"DTSTAMP:{format_datetime(updated_at)}"
+    yield f"CREATED:{format_datetime(created_at)}"
+    yield f"LAST-MODIFIED:{format_datetime(updated_at)}"
+
+    if is_all_day:
+        # DTEND of an all-day event is the (exclusive) day after the last one.
+        end_date = end_time.date() if end_time.time() == time(0) else end_time.date() + timedelta(days=1)
+        end_date = max(end_date, start_time.date() + timedelta(days=1))
+        yield f"DTSTART;VALUE=DATE:{format_date(start_time)}"
+        yield f"DTEND;VALUE=DATE:{format_date(end_date)}"
+    else:
+        yield f"DTSTART:{format_datetime(start_time)}"
+        yield f"DTEND:{format_datetime(end_time)}"
+
+    rrule = rrule_for(start_time=start_time, end_time=end_time, rule=rule, is_all_day=is_all_day)
+    if rrule is not None:
+        yield f"RRULE:{rrule}"
+
+    yield f"SUMMARY:{escape_text(title)}"
+
+    if description:
+        yield f"DESCRIPTION:{escape_text(description)}"
+
+    yield "END:VEVENT"
+
+
+def calendar_header_lines(*, name: str, description: str) -> Iterator[str]:
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield f"PRODID:{PRODID}"
+    yield "CALSCALE:GREGORIAN"
+    yield "METHOD:PUBLISH"
+    yield f"X-WR-CALNAME:{escape_text(name)}"
+
+    if description:
+        yield f"X-WR-CALDESC:{escape_text(description)}"
+
+
+def event_row_to_ics(row: dict) -> str:
+    """
+    The folded VEVENT of an `EXPORT_VALUES` row.
+    """
+    rule = None
+    if row["recurrence_id"] is not None:
+        # Only the attributes are needed, a model instance is several times slower to build.
+        rule = SimpleNamespace(**{field: row[f"recurrence__{field}"] for field in RECURRENCE_EXPORT_FIELDS})
+
+    return "".join(
+        fold_line(line)
+        for line in vevent_lines(
+            uid=str(row["id"]),
+            title=row["title"],
+            description=row["description"],
+            start_time=row["start_time"],
+            end_time=row["end_time"],
+            is_all_day=row["is_all_day"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            rule=rule,
+        )
+    )
+
+
+def calendar_to_ics(*, name: str, description: str, event_rows: Iterable[dict], chunk_size: int = 500) -> Iterator[str]:
+    """
+    Yields the calendar as text, `chunk_size` events at a time.
+    `event_rows` are `EXPORT_VALUES` rows, typically a `.values().iterator()`.
+    """
+    yield "".join(fold_line(line) for line in calendar_header_lines(name=name, description=description))
+
+    chunk = []
+    for index, row in enumerate(event_rows, start=1):
+        chunk.append(event_row_to_ics(row))
+
+        if index % chunk_size == 0:
+            yield "".join(chunk)
+            chunk = []
+
+    chunk.append(fold_line("END:VCALENDAR"))
+    yield "".join(chunk)
+
+
+async def acalendar_to_ics(
+    *,
+    name: str,
+    description: str,
+    event_rows: AsyncIterable[dict],
+    chunk_size: int = 500,
+) -> AsyncIterator[str]:
+    """
+    `calendar_to_ics` for ASGI, over a `.values().aiterator()`: Django reads a sync iterator
+    into a list before sending any of it there.
+    """
+    yield "".join(fold_line(line) for line in calendar_header_lines(name=name, description=description))
+
+    chunk = []
+    index = 0
+    async for row in event_rows:
+        index += 1
+        chunk.append(event_row_to_ics(row))
+
+        if index % chunk_size == 0:
+            yield "".join(chunk)
+            chunk = []
+
+    chunk.append(fold_line("END:VCALENDAR"))
+    yield "".join(chunk)
+
+
+class IcsError(ValueError):
+    pass
+
+
+# An unfolded line longer than this is dropped, whatever the file holds.
+MAX_UNFOLDED_LINE_LENGTH = 1_000_000
+
+DURATION_RE = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+UNESCAPE_RE = re.compile(r"\\([\\;,nN])")
+
+
+def unescape_text(value: str) -> str:
+    return UNESCAPE_RE.sub(lambda match: "\n" if match.group(1) in "nN" else match.group(1), value)
+
+
+def unfold_lines(lines: Iterable[Union[str, bytes]]) -> Iterator[tuple[int, str]]:
+    """
+    Yields `(line number, unfolded line)` from physical lines, e.g. an uploaded file.
+    """
+    current = None
+    current_number = 0
+
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+
+        line = line.rstrip("\r\n")
+
+        if line[:1] in (" ", "\t"):
+            if current is not None and len(current) < MAX_UNFOLDED_LINE_LENGTH:
+                current += line[1:]
+            continue
+
+        if current:
+            yield current_number, current
+
+        current, current_number = line, number
+
+    if current:
+        yield current_number, current
+
+
+def parse_content_line(line: str) -> tuple[str, dict[str, str], str]:
+    """
+    `NAME;PARAM=VALUE;PARAM="QUOTED:VALUE":value` into `(NAME, {PARAM: VALUE}, value)`.
+    """
+    if len(line) > MAX_UNFOLDED_LINE_LENGTH:
+        raise IcsError("Line too long.")
+
+    if '"' not in line.partition(":")[0]:
+        head, separator, value = line.partition(":")
+        segments = head.split(";")
+    else:
+        segments, separator, value = [], "", ""
+        in_quotes, start = False, 0
+        for index, character in enumerate(line):
+            if character == '"':
+                in_quotes = not in_quotes
+            elif not in_quotes and character in ";:":
+                segments.append(line[start:index])
+                start = index + 1
+                if character == ":":
+                    separator, value = ":", line[start:]
+                    break
+
+    if not separator or not segments[0]:
+        raise IcsError("Invalid content line.")
+
+    params = {}
+    for segment in segments[1:]:
+        key, _, param_value = segment.partition("=")
+        params[key.upper()] = param_value.strip('"')
+
+    return segments[0].upper(), params, value
+
+
+def iter_vevents(lines: Iterable[Union[str, bytes]]) -> Iterator[tuple[int, dict]]:
+    """
+    Yields `(line number, properties)` for every VEVENT, properties being `{NAME: (params, value)}`.
+    Nested components (VALARM) and everything outside of VEVENTs (VTIMEZONE) are skipped.
+    """
+    components = []
+    properties = None
+    start = 0
+
+    for number, line in unfold_lines(lines):
+        try:
+            name, params, value = parse_content_line(line)
+        except IcsError as e:
+            if properties is not None:
+                properties.setdefault("X-IMPORT-ERROR", ({}, f"Line {number}: {e}"))
+            continue
+
+        if name == "BEGIN":
+            components.append(value.upper())
+            if components == ["VCALENDAR", "VEVENT"] or components == ["VEVENT"]:
+                properties, start = {}, number
+
+        elif name == "END":
+            component = components.pop() if components else None
+            if component == "VEVENT" and properties is not None:
+                yield start, properties
+                properties = None
+
+        elif properties is not None and components[-1] == "VEVENT":
+            # Only the first EXDATE, ATTENDEE, ... is kept, none of them is imported anyway.
+            properties.setdefault(name, (params, value))
+
+    if properties is not None:
+        properties.setdefault("X-IMPORT-ERROR", ({}, "Missing END:VEVENT."))
+        yield start, properties
+
+
+def parse_date_time(params: dict, value: str, *, default_tz) -> tuple[datetime, bool]:
+    """
+    Returns the value in UTC, and whether it is a DATE. Floating times are taken in `default_tz`.
+    """
+    value = value.strip()
+
+    try:
+        if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+            return datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]), tzinfo=dt_timezone.utc), True
+
+        moment = datetime(
+            int(value[0:4]),
+            int(value[4:6]),
+            int(value[6:8]),
+            int(value[9:11]),
+            int(value[11:13]),
+            int(value[13:15]),
+        )
+    except ValueError:
+        raise IcsError(f"Invalid date-time {value!r}.")
+
+    if value.endswith("Z"):
+        tz = dt_timezone.utc
+    elif "TZID" in params:
+        try:
+            tz = ZoneInfo(params["TZID"].lstrip("/"))
+        except (ZoneInfoNotFoundError, ValueError):
+            raise IcsError(f"Unknown time zone {params["TZID"]!r}.")
+    else:
+        tz = default_tz
+
+    return moment.replace(tzinfo=tz).astimezone(dt_timezone.utc), False
+
+
+def parse_duration(value: str) -> timedelta:
+    match = DURATION_RE.match(value.strip())
+
+    if match is None:
+        raise IcsError(f"Invalid duration {value!r}.")
+
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(
+        weeks=int(weeks or 0),
+        days=int(days or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=int(seconds or 0),
+    )
+
+    return -duration if sign == "-" else duration
+
+
+def _parse_byday(value: str) -> list[tuple[Optional[int], int]]:
+    days = []
+
+    for part in value.split(","):
+        part = part.strip().upper()
+        if part[-2:] not in ICS_WEEKDAYS:
+            raise IcsError(f"Invalid BYDAY {value!r}.")
+        days.append((int(part[:-2]) if part[:-2] else None, ICS_WEEKDAYS.index(part[-2:])))
+
+    return days
+
+
+def rrule_to_recurrence(value: str, *, start_time: datetime, is_all_day: bool = False) -> dict:
+    """
+    Maps an RRULE onto the fields of `RecurrenceRule`, the inverse of `rrule_for`.
+    Rules that `RecurrenceRule` can not express raise `IcsError`.
+    """
+    parts = {}
+    for part in value.split(";"):
+        if part:
+            key, _, part_value = part.partition("=")
+            parts[key.strip().upper()] = part_value.strip()
+
+    frequency = parts.pop("FREQ", "").upper()
+    if frequency not in (RecurrenceRule.DAILY, RecurrenceRule.WEEKLY, RecurrenceRule.MONTHLY, RecurrenceRule.YEARLY):
+        raise IcsError(f"Unsupported frequency {frequency!r}.")
+
+    try:
+        interval = int(parts.pop("INTERVAL", 1))
+        repeat_count = int(parts["COUNT"]) if "COUNT" in parts else None
+        set_position = int(parts["BYSETPOS"]) if "BYSETPOS" in parts else None
+    except ValueError:
+        raise IcsError(f"Invalid RRULE {value!r}.")
+
+    parts.pop("COUNT", None)
+    parts.pop("BYSETPOS", None)
+    parts.pop("WKST", None)
+    until = parts.pop("UNTIL", None)
+    by_day = _parse_byday(parts.pop("BYDAY")) if "BYDAY" in parts else []
+    by_month_day = parts.pop("BYMONTHDAY", None)
+    by_month = parts.pop("BYMONTH", None)
+
+    if interval < 1:
+        raise IcsError(f"Invalid INTERVAL {interval}.")
+
+    recurrence = {
+        "frequency": frequency,
+        "interval": interval,
+        "weekdays": None,
+        "monthly_type": None,
+        "weekday_ordinal": None,
+        "end_date": None,
+        "repeat_count": repeat_count,
+    }
+
+    # "Every weekday" is commonly written as a daily rule limited to some days.
+    if frequency == RecurrenceRule.DAILY and by_day and interval == 1:
+        frequency = recurrence["frequency"] = RecurrenceRule.WEEKLY
+
+    if frequency == RecurrenceRule.WEEKLY and by_day:
+        if any(ordinal is not None for ordinal, _ in by_day):
+            raise IcsError("Weekly rules can not have ordinal weekdays.")
+        recurrence["weekdays"] = sorted({day for _, day in by_day})
+
+    elif frequency == RecurrenceRule.MONTHLY and by_day:
+        ordinals = {ordinal if ordinal is not None else set_position for ordinal, _ in by_day}
+        if len(ordinals) != 1 or None in ordinals or ordinals == {0}:
+            raise IcsError("Monthly rules need a single weekday ordinal, e.g. BYDAY=2MO.")
+        recurrence["monthly_type"] = RecurrenceRule.WEEKDAY
+        recurrence["weekday_ordinal"] = ordinals.pop()
+        recurrence["weekdays"] = sorted({day for _, day in by_day})
+
+    elif frequency == RecurrenceRule.MONTHLY:
+        recurrence["monthly_type"] = RecurrenceRule.DATE
+
+    elif by_day:
+        raise IcsError(f"BYDAY is not supported for {frequency} rules.")
+
+    if by_month_day is not None and (
+        frequency not in (RecurrenceRule.MONTHLY, RecurrenceRule.YEARLY)
+        or by_day
+        or by_month_day != str(start_time.day)
+    ):
+        raise IcsError("BYMONTHDAY is only supported on the day of DTSTART.")
+
+    if by_month is not None and (frequency != RecurrenceRule.YEARLY or by_month != str(start_time.month)):
+        raise IcsError("BYMONTH is only supported on the month of DTSTART.")
+
+    if parts:
+        raise IcsError(f"Unsupported RRULE parts: {", ".join(sorted(parts))}.")
+
+    if until:
+        until_time, until_is_date = parse_date_time({}, until, default_tz=dt_timezone.utc)
+        end_date: date = until_time.date()
+        # Occurrences keep the time of DTSTART, the last one is the last day it fits before UNTIL.
+        if not until_is_date and not is_all_day and until_time.time() < start_time.time():
+            end_date -= timedelta(days=1)
+        recurrence["end_date"] = end_date
+
+    return recurrence
+
+
+def vevent_to_event_data(properties: dict, *, default_tz) -> dict:
+    """
+    Maps the properties of a VEVENT onto the keyword arguments of `event_create` but `user` and `calendar`.
+    """
+    if "X-IMPORT-ERROR" in properties:
+        raise IcsError(properties["X-IMPORT-ERROR"][1])
+
+    if "RECURRENCE-ID" in properties:
+        raise IcsError("Modified occurrences of a series are not supported.")
+
+    if "DTSTART" not in properties:
+        raise IcsError("DTSTART is required.")
+
+    start_time, is_all_day = parse_date_time(*properties["DTSTART"], default_tz=default_tz)
+
+    if "DTEND" in properties:
+        end_time, _ = parse_date_time(*properties["DTEND"], default_tz=default_tz)
+    elif "DURATION" in properties:
+        end_time = start_time + parse_duration(properties["DURATION"][1])
+    elif is_all_day:
+        end_time = start_time + timedelta(days=1)
+    else:
+        raise IcsError("DTEND or DURATION is required.")
+
+    if end_time <= start_time:
+        raise IcsError("DTEND must be after DTSTART.")
+
+    if "RRULE" in properties:
+        recurrence = rrule_to_recurrence(properties["RRULE"][1], start_time=start_time, is_all_day=is_all_day)
+    else:
+        recurrence = {"frequency": "none", "interval": 1}
+
+    title = unescape_text(properties.get("SUMMARY", ({}, ""))[1]).strip()
+
+    return {
+        "title": (title or "Untitled")[:255],
+        "description": unescape_text(properties.get("DESCRIPTION", ({}, ""))[1]),
+        "start_time": start_time,
+        "end_time": end_time,
+        "color": None,
+        "is_all_day": is_all_day,
+        **recurrence,
+    }
@@ -0,0 +1,107 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from easyaudit.models import CRUDEvent, RequestEvent
+
+from core.calendar.models import Calendar
+from core.common.audit import get_audit_sink
+from core.events.services import event_create
+from core.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Updates an event N times through the API with the audit events written inside the request "
+        "(AUDIT_ASYNC=False) and by the batched background writer (AUDIT_ASYNC=True), and reports the "
+        "latency and the queries per request. The audit rows are written for real (no rollback, the "
+        "background writer has its own connection); the benchmark user and its data are deleted at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+
+    def handle(self, *args, **options):
+        count = options["requests"]
+
+        user = User.objects.create_user(
+            email=f"audit-{uuid.uuid4().hex}@example.com",
+            first_name="Audit",
+            last_name="Benchmark",
+            phone_number=uuid.uuid4().int % 10**12,
+        )
+
+        try:
+            calendar = Calendar.objects.create(user=user, name="Audit", color="#3B82F6")
+            start_time = datetime(2026, 1, 1, 9, tzinfo=timezone.utc)
+            event = event_create(
+                user=user,
+                calendar=calendar,
+                title="Audited",
+                description="",
+                start_time=start_time,
+                end_time=start_time + timedelta(hours=1),
+                color=None,
+                is_all_day=False,
+                frequency="none",
+                interval=1,
+            )
+
+            client = Client()
+            client.force_login(user)
+
+            url = reverse("api:events:event-update", kwargs={"event_id": event.id})
+
+            for audit_async in [False, True]:
+                with override_settings(AUDIT_ASYNC=audit_async):
+                    self.run(client=client, url=url, calendar=calendar, count=count, audit_async=audit_async)
+        finally:
+            user.delete()
+            get_audit_sink().flush()
+
+    def run(self, *, client: Client, url: str, calendar: Calendar, count: int, audit_async: bool):
+        crud_events = CRUDEvent.objects.count()
+        request_events = RequestEvent.objects.count()
+
+        reset_queries()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for index in range(count):
+                response = client.put(
+                    url,
+                    {
+                        "calendar_id": str(calendar.id),
+                        "title": f"Audited {index}",
+                        "description": "",
+                        "start_time": "2026-01-01T09:00:00Z",
+                        "end_time": "2026-01-01T10:00:00Z",
+                        "color": "#3B82F6",
+                        "is_all_day": False,
+                        "frequency": "none",
+                    },
+                    content_type="application/json",
+                )
+
+                if response.status_code != 200:
+                    raise CommandError(f"{url} returned {response.status_code}: {response.content[:500]}")
+        seconds = time.perf_counter() - started
+
+        flush_started = time.perf_counter()
+        if not get_audit_sink().flush():
+            raise CommandError("The audit queue was not flushed in time")
+        flush_seconds = time.perf_counter() - flush_started
+
+        inserts = [query for query in queries.captured_queries if 'INSERT INTO "easyaudit_' in query["sql"]]
+
+        self.stdout.write(
+            f"AUDIT_ASYNC={audit_async!s:<5} {count:>6} updates {seconds / count * 1000:>7.3f} ms/request "
+            f"{len(queries) / count:>5.2f} queries/request ({len(inserts) / count:.2f} audit INSERTs) "
+            f"flush {flush_seconds * 1000:>6.1f} ms, "
+            f"+{CRUDEvent.objects.count() - crud_events} CRUD / +{RequestEvent.objects.count() - request_events} "
+            "request events",
+        )
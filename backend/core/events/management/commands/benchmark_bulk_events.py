@@ -0,0 +1,118 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.calendar.models import Calendar
+from core.events.models import Event
+from core.events.services import event_create
+from core.users.models import User
+
+
+def event_payload(*, calendar: Calendar, index: int) -> dict:
+    start_time = datetime(2026, 1, 1, 9, tzinfo=timezone.utc) + timedelta(hours=index)
+
+    return {
+        "calendar_id": str(calendar.id),
+        "title": f"Event {index}",
+        "description": "",
+        "start_time": start_time.isoformat(),
+        "end_time": (start_time + timedelta(hours=1)).isoformat(),
+        "color": "#3B82F6",
+        "is_all_day": False,
+        "frequency": "WEEKLY" if index % 2 else "none",
+        "interval": 1,
+        "weekdays": [1, 3] if index % 2 else None,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates, updates and deletes N events through the bulk endpoints and through `event_create`, "
+        "and reports the timings. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=10_000)
+        parser.add_argument(
+            "--baseline",
+            type=int,
+            default=1000,
+            help="How many events to create one by one with `event_create` for comparison.",
+        )
+
+    def handle(self, *args, **options):
+        count = options["events"]
+
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email=f"bulk-{uuid.uuid4().hex}@example.com",
+                first_name="Bulk",
+                last_name="Events",
+                phone_number=uuid.uuid4().int % 10**12,
+            )
+            calendar = Calendar.objects.create(user=user, name="Bulk", color="#3B82F6")
+
+            client = Client()
+            client.force_login(user)
+
+            payload = [event_payload(calendar=calendar, index=index) for index in range(count)]
+
+            response = self.request(client, "post", "api:events:event-bulk-create", {"events": payload}, count)
+            ids = [result["id"] for result in response["results"]]
+
+            for item, event_id in zip(payload, ids):
+                item["id"] = event_id
+                item["title"] += " (updated)"
+                item["frequency"] = "DAILY"
+
+            self.request(client, "put", "api:events:event-bulk-update", {"events": payload}, count)
+            self.request(client, "post", "api:events:event-bulk-delete", {"ids": ids}, count)
+
+            self.baseline(user=user, calendar=calendar, count=options["baseline"])
+
+            transaction.set_rollback(True)
+
+    def request(self, client: Client, method: str, url_name: str, data: dict, count: int) -> dict:
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(reverse(url_name), data, content_type="application/json")
+        seconds = time.perf_counter() - started
+
+        if response.status_code != 200 or response.json()["failed"]:
+            raise CommandError(f"{url_name} returned {response.status_code}: {response.content[:500]}")
+
+        self.report(url_name, count=count, seconds=seconds, queries=len(queries))
+
+        return response.json()
+
+    def baseline(self, *, user: User, calendar: Calendar, count: int):
+        if not count:
+            return
+
+        items = [event_payload(calendar=calendar, index=index) for index in range(count)]
+        for item in items:
+            item.pop("calendar_id")
+            item["start_time"] = datetime.fromisoformat(item["start_time"])
+            item["end_time"] = datetime.fromisoformat(item["end_time"])
+
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for item in items:
+                event_create(user=user, calendar=calendar, **item)
+        seconds = time.perf_counter() - started
+
+        self.report("event_create (one by one)", count=count, seconds=seconds, queries=len(queries))
+
+        Event.objects.filter(user=user).delete()
+
+    def report(self, name: str, *, count: int, seconds: float, queries: int):
+        self.stdout.write(
+            f"{name:<28} {count:>7} events {seconds * 1000:>9.1f} ms "
+            f"{count / seconds:>9.0f} events/s {queries:>6} queries",
+        )
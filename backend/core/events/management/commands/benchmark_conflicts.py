@@ -0,0 +1,142 @@
+import statistics
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.events.conflicts import EventConflictError, get_event_conflicts
+from core.events.management.commands.benchmark_freebusy import seed_calendars
+from core.events.models import Event
+from core.events.recurrence import RecurrenceExpander
+from core.events.services import event_create
+
+# Events to create on top of the seeded calendars: (name, start, minutes, recurrence).
+PROBES = [
+    ("single, free", datetime(2026, 5, 4, 3, 0, tzinfo=timezone.utc), 30, {"frequency": "none"}),
+    ("single, busy", datetime(2026, 5, 4, 9, 30, tzinfo=timezone.utc), 60, {"frequency": "none"}),
+    (
+        "weekly, endless",
+        datetime(2026, 4, 6, 21, 0, tzinfo=timezone.utc),
+        45,
+        {"frequency": "WEEKLY", "weekdays": [1, 4]},
+    ),
+    (
+        "daily, 30 times",
+        datetime(2026, 4, 1, 6, 0, tzinfo=timezone.utc),
+        30,
+        {"frequency": "DAILY", "repeat_count": 30},
+    ),
+    ("monthly, endless", datetime(2026, 4, 15, 12, 0, tzinfo=timezone.utc), 60, {"frequency": "MONTHLY"}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates single and recurring events next to a user with N calendars, with and without the conflict "
+        "check, and reports the write latency. The conflicts found are checked against a brute-force expansion "
+        "of every series over --horizon-days. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calendars", type=int, default=50)
+        parser.add_argument("--events", type=int, default=20, help="Events per calendar.")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--horizon-days", type=int, default=730)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = seed_calendars(calendars=options["calendars"], events=options["events"])
+            calendar = user.calendars.first()
+
+            self.stdout.write(f"{options["calendars"]} calendars x {options["events"]} events")
+
+            for name, start_time, minutes, recurrence in PROBES:
+                data = {
+                    "user": user,
+                    "calendar": calendar,
+                    "title": name,
+                    "description": "",
+                    "start_time": start_time,
+                    "end_time": start_time + timedelta(minutes=minutes),
+                    "color": None,
+                    "is_all_day": False,
+                    "interval": 1,
+                    **recurrence,
+                }
+
+                plain = self.measure(lambda: self.create(data, check_conflicts=False), repeat=options["repeat"])
+                checked = self.measure(lambda: self.create(data, check_conflicts=True), repeat=options["repeat"])
+
+                with transaction.atomic():
+                    event = event_create(**data)
+                    found = get_event_conflicts(event=event, limit=10**9)
+
+                    started = time.perf_counter()
+                    expected = self.brute_force(event, horizon=timedelta(days=options["horizon_days"]))
+                    brute_force = (time.perf_counter() - started) * 1000
+
+                    transaction.set_rollback(True)
+
+                if {conflict.id for conflict in found} != expected:
+                    raise CommandError(f"{name}: {len(found)} conflicts, {len(expected)} expected by expansion")
+
+                self.stdout.write(
+                    f"  {name:<18} {len(found):>4} conflicts: create {plain:.2f} ms, "
+                    f"create + check {checked:.2f} ms, brute-force expansion {brute_force:.2f} ms (median)",
+                )
+
+            transaction.set_rollback(True)
+
+    def create(self, data: dict, *, check_conflicts: bool):
+        try:
+            with transaction.atomic():
+                event_create(**data, check_conflicts=check_conflicts)
+                transaction.set_rollback(True)
+        except EventConflictError:
+            pass
+
+    def brute_force(self, event: Event, *, horizon: timedelta) -> set:
+        """
+        The ids of the events with an occurrence overlapping one of `event`'s, every series
+        expanded over `horizon` from the start of the event.
+        """
+        window_start, window_end = event.start_time, event.start_time + horizon
+        expander = RecurrenceExpander(start_time=event.start_time, end_time=event.end_time, rule=event.recurrence)
+        occurrences = list(expander.between(window_start, window_end))
+        starts = [occurrence.start_time for occurrence in occurrences]
+
+        candidates = (
+            Event.objects.filter(user_id=event.user_id, calendar__is_visible=True, is_all_day=False)
+            .exclude(id=event.id)
+            .select_related("recurrence")
+        )
+        conflicts = set()
+
+        for candidate in candidates:
+            other = RecurrenceExpander(
+                start_time=candidate.start_time,
+                end_time=candidate.end_time,
+                rule=candidate.recurrence,
+            )
+
+            for start_time, end_time in other.between(window_start, window_end):
+                # The last occurrence of `event` starting before this one ends.
+                index = bisect_right(starts, end_time - timedelta(microseconds=1)) - 1
+
+                if index >= 0 and occurrences[index].end_time > start_time:
+                    conflicts.add(candidate.id)
+                    break
+
+        return conflicts
+
+    def measure(self, function, *, repeat: int) -> float:
+        timings = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return statistics.median(timings)
@@ -0,0 +1,156 @@
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+
+from core.calendar.models import Calendar
+from core.events.freebusy import merge_intervals
+from core.events.models import Event, RecurrenceRule
+from core.events.recurrence import event_series_end_time
+from core.events.selectors import get_user_busy_blocks
+from core.users.models import User
+
+WINDOW_START = datetime(2026, 4, 1, tzinfo=timezone.utc)
+WINDOW_END = datetime(2026, 7, 1, tzinfo=timezone.utc)
+
+
+def seed_calendars(*, calendars: int, events: int) -> User:
+    """
+    `calendars` calendars with `events` events each: a mix of one-off events in the quarter
+    and daily / weekly / monthly series started before it.
+    """
+    user = User.objects.create_user(
+        email=f"freebusy-{uuid.uuid4().hex}@example.com",
+        first_name="Free",
+        last_name="Busy",
+        phone_number=uuid.uuid4().int % 10**12,
+    )
+    rules = [
+        lambda: None,
+        lambda: None,
+        lambda: RecurrenceRule(frequency=RecurrenceRule.DAILY, interval=1),
+        lambda: RecurrenceRule(frequency=RecurrenceRule.WEEKLY, interval=1, weekdays=[1, 3, 5]),
+        lambda: RecurrenceRule(frequency=RecurrenceRule.MONTHLY, interval=1),
+    ]
+
+    for calendar_index in range(calendars):
+        calendar = Calendar.objects.create(user=user, name=f"Calendar {calendar_index}", color="#3B82F6")
+        items = []
+
+        for index in range(events):
+            rule = rules[index % len(rules)]()
+            if rule is None:
+                start_time = WINDOW_START + timedelta(hours=(calendar_index * 7 + index * 13) % (24 * 91))
+            else:
+                start_time = datetime(2026, 1, 1, 8 + index % 10, calendar_index % 4 * 15, tzinfo=timezone.utc)
+                start_time += timedelta(days=calendar_index % 7)
+
+            items.append((rule, start_time))
+
+        saved_rules = RecurrenceRule.objects.bulk_create([rule for rule, _ in items if rule is not None])
+        saved_rules.reverse()
+
+        calendar_events = [
+            Event(
+                user=user,
+                calendar=calendar,
+                title=f"Event {index}",
+                start_time=start_time,
+                end_time=start_time + timedelta(minutes=45),
+                recurrence=saved_rules.pop() if rule is not None else None,
+            )
+            for index, (rule, start_time) in enumerate(items)
+        ]
+        for event in calendar_events:
+            event.series_end_time = event_series_end_time(event)
+        Event.objects.bulk_create(calendar_events)
+
+    return user
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes the busy blocks of a user with N calendars over a quarter and reports the timings, "
+        "next to listing the occurrences of the same window. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calendars", type=int, default=50)
+        parser.add_argument("--events", type=int, default=20, help="Events per calendar.")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = seed_calendars(calendars=options["calendars"], events=options["events"])
+
+            client = Client()
+            client.force_login(user)
+            url = reverse("api:events:event-freebusy")
+            params = {"from": WINDOW_START.isoformat(), "to": WINDOW_END.isoformat()}
+
+            self.stdout.write(
+                f"{options["calendars"]} calendars x {options["events"]} events, "
+                f"{WINDOW_START:%Y-%m-%d} to {WINDOW_END:%Y-%m-%d}",
+            )
+
+            with override_settings(API_CACHE_ENABLED=False):
+                blocks = get_user_busy_blocks(user=user, window_start=WINDOW_START, window_end=WINDOW_END)
+
+                selector = self.measure(
+                    lambda: get_user_busy_blocks(user=user, window_start=WINDOW_START, window_end=WINDOW_END),
+                    repeat=options["repeat"],
+                )
+                api = self.measure(lambda: self.call(client, url, params), repeat=options["repeat"])
+                # What a client has to do without the endpoint: fetch every occurrence.
+                occurrences = self.measure(
+                    lambda: self.call(client, reverse("api:events:event-occurrences"), params),
+                    repeat=max(options["repeat"] // 10, 1),
+                )
+
+            self.check_blocks(blocks, client=client, params=params)
+
+            self.stdout.write(
+                f"  {len(blocks)} busy blocks: selector {selector:.2f} ms, API {api:.2f} ms, "
+                f"occurrences API {occurrences:.2f} ms (median)",
+            )
+
+            transaction.set_rollback(True)
+
+    def call(self, client: Client, url: str, params: dict) -> list:
+        response = client.get(url, params)
+
+        if response.status_code != 200:
+            raise CommandError(f"{url} returned {response.status_code}: {response.content[:500]}")
+
+        return response.json()
+
+    def check_blocks(self, blocks: list, *, client: Client, params: dict):
+        """
+        The blocks must be the merged occurrences listed by the occurrences API.
+        """
+        occurrences = self.call(client, reverse("api:events:event-occurrences"), params)
+        expected = merge_intervals(
+            [parse_datetime(occurrence["start_time"]) for occurrence in occurrences],
+            [parse_datetime(occurrence["end_time"]) for occurrence in occurrences],
+            window_start=WINDOW_START,
+            window_end=WINDOW_END,
+        )
+
+        if blocks != expected:
+            raise CommandError(f"{len(blocks)} busy blocks, {len(expected)} expected from the occurrences")
+
+    def measure(self, function, *, repeat: int) -> float:
+        timings = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return statistics.median(timings)
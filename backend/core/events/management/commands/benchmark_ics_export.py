@@ -0,0 +1,185 @@
+import asyncio
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.calendar.models import Calendar
+from core.events.models import Event, RecurrenceRule
+from core.events.recurrence import event_series_end_time
+from core.users.models import User
+
+
+def seed_calendar(*, events: int, batch_size: int = 5000) -> Calendar:
+    user = User.objects.create_user(
+        email=f"ics-export-{uuid.uuid4().hex}@example.com",
+        first_name="Ics",
+        last_name="Export",
+        phone_number=uuid.uuid4().int % 10**12,
+    )
+    calendar = Calendar.objects.create(user=user, name="Export", color="#3B82F6")
+    start = datetime(2026, 1, 1, 9, tzinfo=timezone.utc)
+
+    for offset in range(0, events, batch_size):
+        indexes = range(offset, min(offset + batch_size, events))
+        rules = RecurrenceRule.objects.bulk_create(
+            [
+                RecurrenceRule(frequency=RecurrenceRule.WEEKLY if index % 2 else "none", weekdays=[1, 3])
+                for index in indexes
+            ],
+        )
+        batch = [
+            Event(
+                user=user,
+                calendar=calendar,
+                title=f"Event {index}",
+                description="Exported by benchmark_ics_export",
+                start_time=start + timedelta(hours=index),
+                end_time=start + timedelta(hours=index + 1),
+                recurrence=rule,
+            )
+            for index, rule in zip(indexes, rules)
+        ]
+        for event in batch:
+            event.series_end_time = event_series_end_time(event)
+        Event.objects.bulk_create(batch)
+
+    return calendar
+
+
+def wsgi_export(client: Client, url: str) -> tuple[int, int]:
+    response = client.get(url)
+    if response.status_code != 200:
+        raise CommandError(f"{url} returned {response.status_code}")
+
+    size = 0
+    events = 0
+    for chunk in response.streaming_content:
+        size += len(chunk)
+        events += chunk.count(b"BEGIN:VEVENT")
+
+    return size, events
+
+
+def asgi_export(application, url: str, cookie: str) -> tuple[int, int]:
+    """
+    The export through Django's ASGI handler, as daphne or uvicorn would run it. Called from the
+    thread holding the transaction, whose connection the handler's sync code then runs on.
+    """
+    # Like the test client: closing the connections at the end of the request would end the transaction.
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+
+    try:
+        return async_to_sync(asgi_request)(application, url, cookie)
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+
+
+async def asgi_request(application, url: str, cookie: str) -> tuple[int, int]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url,
+        "raw_path": url.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    requested = False
+    status = None
+    size = 0
+    events = 0
+
+    async def receive():
+        nonlocal requested
+
+        if requested:
+            # Never disconnects: the handler stops listening once the response is sent.
+            await asyncio.Event().wait()
+
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, size, events
+
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            events += message.get("body", b"").count(b"BEGIN:VEVENT")
+
+    await application(scope, receive, send)
+
+    if status != 200:
+        raise CommandError(f"{url} returned {status}")
+
+    return size, events
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams the .ics export of a calendar with N events through the WSGI and the ASGI handlers, and "
+        "reports the throughput and the peak memory allocated while streaming. Everything runs in a "
+        "transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, nargs="+", default=[10_000, 100_000])
+        parser.add_argument("--servers", nargs="+", choices=["wsgi", "asgi"], default=["wsgi", "asgi"])
+
+    def handle(self, *args, **options):
+        asgi_application = get_asgi_application()
+
+        for count in options["events"]:
+            for server in options["servers"]:
+                self.export(count, server, asgi_application)
+
+    def export(self, count: int, server: str, asgi_application):
+        # The audit log written in the requests, not by a thread of its own outside of the transaction.
+        with transaction.atomic(), override_settings(AUDIT_ASYNC=False):
+            calendar = seed_calendar(events=count)
+
+            client = Client()
+            client.force_login(calendar.user)
+            cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+            url = reverse("api:calendar:calendar-export", kwargs={"calendar_id": calendar.id})
+
+            tracemalloc.start()
+            started = time.perf_counter()
+
+            if server == "wsgi":
+                size, events = wsgi_export(client, url)
+            else:
+                size, events = asgi_export(asgi_application, url, cookie)
+
+            seconds = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            transaction.set_rollback(True)
+
+        if events != count:
+            raise CommandError(f"Exported {events} events out of {count}")
+
+        self.stdout.write(
+            f"{server} {count:>8} events {size / 2**20:>8.1f} MiB {seconds * 1000:>9.1f} ms "
+            f"{count / seconds:>8.0f} events/s  peak {peak / 2**20:>6.1f} MiB",
+        )
@@ -0,0 +1,84 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+
+from core.events.models import RecurrenceRule
+from core.events.recurrence import RecurrenceExpander
+
+
+def build_rules(*, count: int, series_start: datetime, seed: int) -> list[RecurrenceExpander]:
+    rng = random.Random(seed)
+    expanders = []
+
+    for _ in range(count):
+        start_time = series_start + timedelta(days=rng.randint(0, 365), hours=rng.randint(0, 23))
+        frequency = rng.choice(
+            [
+                RecurrenceRule.DAILY,
+                RecurrenceRule.WEEKLY,
+                RecurrenceRule.WEEKLY,
+                RecurrenceRule.MONTHLY,
+                RecurrenceRule.YEARLY,
+            ],
+        )
+        rule = RecurrenceRule(
+            frequency=frequency,
+            interval=rng.choice([1, 1, 1, 2, 3]),
+            weekdays=rng.sample(range(7), rng.randint(1, 3)) if frequency == RecurrenceRule.WEEKLY else None,
+            monthly_type=rng.choice([RecurrenceRule.DATE, RecurrenceRule.WEEKDAY]),
+            weekday_ordinal=rng.choice([1, 2, 3, 4, -1]),
+            repeat_count=rng.choice([None, None, 500, 2000]),
+        )
+        expanders.append(
+            RecurrenceExpander(
+                start_time=start_time,
+                end_time=start_time + timedelta(hours=1),
+                rule=rule,
+            ),
+        )
+
+    return expanders
+
+
+class Command(BaseCommand):
+    help = "Expands N synthetic recurrence rules over a window and reports the timings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rules", type=int, default=10_000)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument(
+            "--series-age",
+            type=int,
+            default=5,
+            help="How many years before the window the series start. Expansion cost should not depend on it.",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        window_start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        window_end = window_start + timedelta(days=options["days"])
+        series_age = options["series_age"]
+        series_start = window_start - timedelta(days=365 * series_age)
+
+        started = time.perf_counter()
+        expanders = build_rules(count=options["rules"], series_start=series_start, seed=options["seed"])
+        built = time.perf_counter()
+
+        occurrences = 0
+        for expander in expanders:
+            for _ in expander.between(window_start, window_end):
+                occurrences += 1
+        expanded = time.perf_counter()
+
+        expand_seconds = expanded - built
+
+        self.stdout.write(f"rules:            {len(expanders)}")
+        self.stdout.write(f"window:           {window_start:%Y-%m-%d} -> {window_end:%Y-%m-%d}")
+        self.stdout.write(f"series age:       {series_age} years")
+        self.stdout.write(f"occurrences:      {occurrences}")
+        self.stdout.write(f"build:            {(built - started) * 1000:.1f} ms")
+        self.stdout.write(f"expand:           {expand_seconds * 1000:.1f} ms")
+        self.stdout.write(f"per rule:         {expand_seconds / len(expanders) * 1_000_000:.1f} us")
+        self.stdout.write(f"per occurrence:   {expand_seconds / max(occurrences, 1) * 1_000_000:.2f} us")
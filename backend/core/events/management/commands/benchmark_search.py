@@ -0,0 +1,126 @@
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from core.calendar.models import Calendar
+from core.events.models import Event
+from core.events.selectors import search_user_events
+from core.users.models import User
+
+WORDS = (
+    "planning review budget standup retro sync design roadmap hiring interview lunch dinner dentist doctor "
+    "gym yoga flight train hotel conference workshop launch release migration incident postmortem onboarding "
+    "training offsite birthday wedding anniversary call demo sprint kickoff quarterly weekly monthly report "
+    "finance legal marketing sales support security audit backup deploy database invoice payroll"
+).split()
+
+# (name, query): common and rare words, a phrase, an exclusion, a prefix and a typo.
+QUERIES = [
+    ("common word", "review"),
+    ("two words", "budget finance"),
+    ("phrase", '"quarterly report"'),
+    ("exclusion", "launch -marketing"),
+    ("rare word", "postmortem"),
+    ("prefix", "onboard"),
+    ("typo", "migraton"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds N events for one user (random titles and descriptions) and times the search selector against "
+        "an `icontains` filter on title/description, for a handful of queries. Everything runs in a "
+        "transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=1_000_000)
+        parser.add_argument("--calendars", type=int, default=10)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.seed(events=options["events"], calendars=options["calendars"], batch_size=options["batch_size"])
+
+            if connection.vendor == "postgresql":
+                # The planner needs statistics on the new rows to pick the GIN indexes.
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {Event._meta.db_table}")
+
+            self.stdout.write(f"{options["events"]} events, {connection.vendor}")
+
+            for name, query in QUERIES:
+                found = search_user_events(user=user, query=query)
+                search = self.measure(lambda: search_user_events(user=user, query=query), repeat=options["repeat"])
+                scan = self.measure(lambda: self.scan(user, query), repeat=max(options["repeat"] // 5, 1))
+
+                self.stdout.write(
+                    f"  {name:<12} {query!r:<22} {len(found):>3} results: search {search:.2f} ms, "
+                    f"icontains scan {scan:.2f} ms (median)",
+                )
+
+            transaction.set_rollback(True)
+
+    def seed(self, *, events: int, calendars: int, batch_size: int) -> User:
+        rng = random.Random(17)
+        user = User.objects.create_user(
+            email=f"search-{uuid.uuid4().hex}@example.com",
+            first_name="Search",
+            last_name="Benchmark",
+            phone_number=uuid.uuid4().int % 10**12,
+        )
+        calendar_ids = [
+            Calendar.objects.create(user=user, name=f"Calendar {index}", color="#3B82F6").id
+            for index in range(calendars)
+        ]
+        first = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+        for offset in range(0, events, batch_size):
+            batch = []
+
+            for index in range(offset, min(offset + batch_size, events)):
+                start_time = first + timedelta(minutes=30 * index)
+                batch.append(
+                    Event(
+                        user=user,
+                        calendar_id=calendar_ids[index % calendars],
+                        title=" ".join(rng.choices(WORDS, k=rng.randint(1, 4))).capitalize(),
+                        description=" ".join(rng.choices(WORDS, k=rng.randint(0, 20))),
+                        start_time=start_time,
+                        end_time=start_time + timedelta(minutes=30),
+                        series_end_time=start_time + timedelta(minutes=30),
+                    ),
+                )
+
+            Event.objects.bulk_create(batch)
+
+        return user
+
+    def scan(self, user: User, query: str) -> list:
+        events = Event.objects.filter(user=user)
+
+        # What a search without an index looks like, the closest to the query it can get.
+        for term in query.replace('"', "").split():
+            if term.startswith("-"):
+                continue
+
+            events = events.filter(Q(title__icontains=term) | Q(description__icontains=term))
+
+        return list(events.defer("search_vector").order_by("-start_time")[:20])
+
+    def measure(self, function, *, repeat: int) -> float:
+        timings = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return statistics.median(timings)
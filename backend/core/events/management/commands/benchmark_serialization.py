@@ -0,0 +1,130 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.calendar.apis import CalendarListApi
+from core.calendar.models import Calendar
+from core.calendar.selectors import calendar_events_prefetch, get_all_calendars_for_user, get_calendar_events
+from core.events.apis import EventListApi
+from core.events.models import Event, RecurrenceRule
+from core.events.recurrence import event_series_end_time
+from core.events.representations import (
+    calendar_values,
+    calendars_to_representation,
+    event_values,
+    events_to_representation,
+)
+from core.events.selectors import get_user_events
+from core.users.models import User
+
+
+def seed_events(*, events: int, events_per_calendar: int) -> User:
+    user = User.objects.create_user(
+        email=f"benchmark-{uuid.uuid4().hex}@example.com",
+        first_name="Bench",
+        last_name="Mark",
+        phone_number=uuid.uuid4().int % 10**12,
+    )
+    start = datetime(2026, 1, 1, 9, tzinfo=timezone.utc)
+
+    calendars = Calendar.objects.bulk_create(
+        [
+            Calendar(user=user, name=f"Calendar {index}", color="#3B82F6")
+            for index in range(max(events // events_per_calendar, 1))
+        ],
+        batch_size=5000,
+    )
+    rules = RecurrenceRule.objects.bulk_create(
+        [
+            RecurrenceRule(frequency=RecurrenceRule.WEEKLY if index % 3 else "none", interval=1, weekdays=[1, 3])
+            for index in range(events)
+        ],
+        batch_size=5000,
+    )
+    events = [
+        Event(
+            user=user,
+            calendar=calendars[index % len(calendars)],
+            title=f"Event {index}",
+            description="Benchmark event",
+            start_time=start + timedelta(minutes=37 * index),
+            end_time=start + timedelta(minutes=37 * index + 45),
+            color="#10B981" if index % 2 else None,
+            recurrence=rule,
+        )
+        for index, rule in enumerate(rules)
+    ]
+    for event in events:
+        event.series_end_time = event_series_end_time(event)
+    Event.objects.bulk_create(events, batch_size=5000)
+
+    return user
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the DRF serializers of the event and calendar lists with the `.values()` read path, "
+        "checking both produce the same bytes. Seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+        parser.add_argument(
+            "--events-per-calendar",
+            type=int,
+            default=10,
+            help="Every event row embeds all the events of its calendar, keep this small.",
+        )
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+
+        self.stdout.write(f"{"endpoint":<10} {"events":>8} {"drf":>10} {"fast":>10} {"speedup":>8} {"bytes":>12}")
+
+        for size in options["sizes"]:
+            with transaction.atomic():
+                user = seed_events(events=size, events_per_calendar=options["events_per_calendar"])
+
+                cases = {
+                    "events": (
+                        lambda: EventListApi.OutputSerializer(
+                            # `calendar` is serialized with its own events, load them all at once.
+                            get_user_events(user=user).prefetch_related(
+                                calendar_events_prefetch(lookup="calendar__events"),
+                            ),
+                            many=True,
+                        ).data,
+                        lambda: events_to_representation(event_values(get_user_events(user=user))),
+                    ),
+                    "calendars": (
+                        lambda: CalendarListApi.OutputSerializer(get_all_calendars_for_user(user=user), many=True).data,
+                        lambda: calendars_to_representation(
+                            calendar_values(get_all_calendars_for_user(user=user)),
+                            events=get_calendar_events(),
+                        ),
+                    ),
+                }
+
+                for name, (drf, fast) in cases.items():
+                    drf_bytes, drf_seconds = timed(lambda: renderer.render(drf()))
+                    fast_bytes, fast_seconds = timed(lambda: renderer.render(fast()))
+
+                    if drf_bytes != fast_bytes:
+                        raise CommandError(f"{name}: the fast path output differs from the serializer output.")
+
+                    self.stdout.write(
+                        f"{name:<10} {size:>8} {drf_seconds * 1000:>8.0f}ms {fast_seconds * 1000:>8.0f}ms "
+                        f"{drf_seconds / fast_seconds:>7.1f}x {len(fast_bytes):>12}",
+                    )
+
+                transaction.set_rollback(True)
@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from core.events.models import Event
+from core.events.services import event_occurrences_extend, event_occurrences_prune
+
+
+class Command(BaseCommand):
+    help = (
+        "Materializes event occurrences up to the rolling horizon and deletes the ones that ended before the "
+        "retention start. Run it daily: reads expand the occurrences past an event's materialized horizon on "
+        "the fly, and the fewer there are, the cheaper the reads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.EVENT_OCCURRENCES_HORIZON_DAYS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        until = timezone.now() + timedelta(days=options["days"])
+        batch_size = options["batch_size"]
+
+        events = (
+            Event.objects.filter(Q(occurrences_until__isnull=True) | Q(occurrences_until__lt=until))
+            .select_related("recurrence")
+            .order_by("id")
+        )
+
+        started = time.perf_counter()
+        batch: list[Event] = []
+        extended_events = 0
+        created = 0
+
+        for event in events.iterator(chunk_size=batch_size):
+            batch.append(event)
+
+            if len(batch) == batch_size:
+                created += event_occurrences_extend(events=batch, until=until, batch_size=batch_size)
+                extended_events += len(batch)
+                batch = []
+
+        if batch:
+            created += event_occurrences_extend(events=batch, until=until, batch_size=batch_size)
+            extended_events += len(batch)
+
+        pruned = event_occurrences_prune()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Extended {extended_events} events up to {until:%Y-%m-%d}: "
+                f"{created} occurrences created, {pruned} past the retention deleted "
+                f"in {time.perf_counter() - started:.1f}s.",
+            ),
+        )
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.calendar.models import Calendar
+from core.events.services import event_ics_import
+
+
+class Command(BaseCommand):
+    help = "Imports the events of an iCalendar (.ics) file into a calendar, reporting the progress."
+
+    def add_arguments(self, parser):
+        parser.add_argument("calendar_id")
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            calendar = Calendar.objects.select_related("user").get(id=options["calendar_id"])
+        except (Calendar.DoesNotExist, ValueError):
+            raise CommandError(f"Calendar {options["calendar_id"]} does not exist.")
+
+        started = time.perf_counter()
+
+        def progress(result):
+            seconds = time.perf_counter() - started
+            self.stdout.write(
+                f"imported {result["imported"]:>8}  failed {result["failed"]:>6}  "
+                f"{result["imported"] / seconds:>8.0f} events/s",
+            )
+
+        with open(options["path"], "rb") as file:
+            result = event_ics_import(
+                user=calendar.user,
+                calendar=calendar,
+                lines=file,
+                batch_size=options["batch_size"],
+                progress=progress,
+            )
+
+        for error in result["errors"]:
+            self.stderr.write(f"line {error["line"]} ({error["uid"]}): {error["error"]}")
+
+        if result["failed"] > len(result["errors"]):
+            self.stderr.write(f"... and {result["failed"] - len(result["errors"])} more errors")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result["imported"]} events, {result["failed"]} failed, "
+                f"in {time.perf_counter() - started:.1f} s.",
+            ),
+        )
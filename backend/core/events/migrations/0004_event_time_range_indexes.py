@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar', '0002_alter_calendar_user'),
+        ('events', '0003_rename_byweekday_recurrencerule_weekdays'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'start_time', 'end_time'], name='event_user_start_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'end_time'], name='event_user_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['calendar', 'start_time', 'end_time'], name='event_calendar_start_end_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar', '0003_keyset_pagination_indexes'),
+        ('events', '0005_event_occurrences'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'start_time', 'id'], name='event_user_start_id_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:41
+
+import core.events.models
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations
+
+from core.common.operations import AddPostgresIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar', '0003_keyset_pagination_indexes'),
+        ('events', '0006_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddPostgresIndex(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GistIndex(core.events.models.TsTzRange('start_time', 'end_time'), name='event_time_range_gist_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:48
+
+import core.events.models
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+from core.common.operations import AddPostgresIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar', '0003_keyset_pagination_indexes'),
+        ('events', '0007_event_time_range_gist_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # `gin_trgm_ops` of `event_title_trgm_idx`, a no-op on other databases.
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(core.events.models.PortableSearchVector('title', config='english', weight='A'), '||', core.events.models.PortableSearchVector('description', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        AddPostgresIndex(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='event_search_vector_idx'),
+        ),
+        AddPostgresIndex(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='event_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+from core.events.recurrence import event_series_end_time
+
+BATCH_SIZE = 2000
+
+
+def backfill_series_end_time(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    batch = []
+
+    for event in Event.objects.select_related('recurrence').order_by('id').iterator(chunk_size=BATCH_SIZE):
+        event.series_end_time = event_series_end_time(event)
+        batch.append(event)
+
+        if len(batch) == BATCH_SIZE:
+            Event.objects.bulk_update(batch, ['series_end_time'])
+            batch = []
+
+    Event.objects.bulk_update(batch, ['series_end_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar', '0004_sync_indexes'),
+        ('events', '0009_sync_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='series_end_time',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        # Until it is set, NULL would make every event a candidate of every window.
+        migrations.RunPython(backfill_series_end_time, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'series_end_time'], name='event_user_series_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['calendar', 'series_end_time'], name='event_calendar_series_end_idx'),
+        ),
+    ]
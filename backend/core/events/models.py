@@ -1,6 +1,11 @@
+from datetime import datetime, timezone
+
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Coalesce, Concat, Lower
 
 from core.calendar.models import Calendar
 from core.common.models import BaseModel
@@ -45,6 +50,31 @@ class RecurrenceRule(BaseModel):
             raise ValidationError({"interval": "Interval must be between 1 and 365."})
 
 
+class TsTzRange(models.Func):
+    """
+    `tstzrange(start, end)`: the half-open `[start, end)` range of an event or an occurrence (PostgreSQL).
+    """
+
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+# Text search configuration of `Event.search_vector`, changing it needs a migration.
+SEARCH_CONFIG = "english"
+
+
+class PortableSearchVector(SearchVector):
+    """
+    `SearchVector` that compiles to the lower-cased text on SQLite, which has no full-text
+    search: the column exists everywhere, only PostgreSQL searches it (see `search_user_events`).
+    """
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        (expression,) = self.get_source_expressions()
+
+        return compiler.compile(Concat(Lower(Coalesce(expression, models.Value(""))), models.Value(" ")))
+
+
 class Event(BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="events")
     calendar = models.ForeignKey(Calendar, on_delete=models.CASCADE, related_name="events")
@@ -61,6 +91,20 @@ class Event(BaseModel):
         related_name="event",
     )
     is_all_day = models.BooleanField(default=False)
+    # No occurrence ends after it, `None` for a series with no end: the window queries are range
+    # scans on it, see `in_window_q`. Set by the services, see `series_end_time`.
+    series_end_time = models.DateTimeField(null=True, blank=True, editable=False)
+    # How far the materialized occurrences of this event reach, see `EventOccurrence`.
+    occurrences_until = models.DateTimeField(null=True, blank=True, editable=False)
+    # Maintained by the database, the title ranking above the description.
+    search_vector = models.GeneratedField(
+        expression=(
+            PortableSearchVector("title", config=SEARCH_CONFIG, weight="A")
+            + PortableSearchVector("description", config=SEARCH_CONFIG, weight="B")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     def clean(self):
         if self.end_time <= self.start_time:
@@ -72,3 +116,51 @@ class Event(BaseModel):
     class Meta:
         verbose_name = "Event"
         verbose_name_plural = "Events"
+        indexes = [
+            models.Index(fields=["user", "start_time", "end_time"], name="event_user_start_end_idx"),
+            models.Index(fields=["user", "start_time", "id"], name="event_user_start_id_idx"),
+            models.Index(fields=["user", "end_time"], name="event_user_end_idx"),
+            models.Index(fields=["calendar", "start_time", "end_time"], name="event_calendar_start_end_idx"),
+            # Window queries, see `in_window_q`.
+            models.Index(fields=["user", "series_end_time"], name="event_user_series_end_idx"),
+            models.Index(fields=["calendar", "series_end_time"], name="event_calendar_series_end_idx"),
+            # Delta sync, see `core.sync.selectors`.
+            models.Index(fields=["user", "updated_at"], name="event_user_updated_idx"),
+            models.Index(fields=["calendar", "updated_at"], name="event_calendar_updated_idx"),
+        ]
+        # PostgreSQL only, created by the migrations with `AddPostgresIndex`:
+        # - `event_time_range_gist_idx`, GiST on `tstzrange(start_time, end_time)`: overlap (`&&`)
+        #   lookups of the conflict check, see `core.events.conflicts`.
+        # - `event_search_vector_idx`, GIN on `search_vector`, and `event_title_trgm_idx`, trigram
+        #   GIN on `title`: the matches of `search_user_events`.
+
+
+class EventOccurrence(BaseModel):
+    """
+    A materialized occurrence of an `Event`, kept only when `EVENT_OCCURRENCES_MATERIALIZED` is on.
+
+    The stored occurrences are the ones ending after the retention start (`EVENT_OCCURRENCES_RETENTION_DAYS`
+    ago, see `occurrences_retention_start`) and starting before `Event.occurrences_until`: a rolling window,
+    extended and pruned daily by `extend_occurrence_horizon`.
+    `user` and `calendar` are copied from the event so a window query is a single range scan.
+    """
+
+    # `Event.occurrences_until` of a series that has no occurrences left to materialize.
+    SERIES_COMPLETE = datetime(9999, 12, 31, tzinfo=timezone.utc)
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="occurrences")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="event_occurrences")
+    calendar = models.ForeignKey(Calendar, on_delete=models.CASCADE, related_name="event_occurrences")
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.event_id} ({self.start_time} to {self.end_time})"
+
+    class Meta:
+        verbose_name = "Event Occurrence"
+        verbose_name_plural = "Event Occurrences"
+        indexes = [
+            models.Index(fields=["user", "start_time", "end_time"], name="occurrence_user_start_end_idx"),
+            models.Index(fields=["calendar", "start_time", "end_time"], name="occurrence_cal_start_end_idx"),
+        ]
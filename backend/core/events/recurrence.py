@@ -0,0 +1,365 @@
+"""
+Occurrence expansion for `RecurrenceRule`.
+
+The expansion is period based: every frequency splits the timeline into periods
+(a run of `interval` days, weeks, months or years) anchored at the series start.
+For a `[window_start, window_end)` window we compute the period containing
+`window_start` arithmetically and start generating there, instead of walking the
+series from its first occurrence. When a `repeat_count` is set we still need the
+number of occurrences before that period, which is closed form for every rule
+that yields a constant number of occurrences per period.
+
+Weekdays follow the client convention: 0 is Sunday, 6 is Saturday.
+"""
+
+import calendar as _calendar
+import math
+from datetime import datetime, time, timedelta
+from typing import Iterator, NamedTuple, Optional
+
+from .models import RecurrenceRule
+
+RECURRING_FREQUENCIES = {
+    RecurrenceRule.DAILY,
+    RecurrenceRule.WEEKLY,
+    RecurrenceRule.MONTHLY,
+    RecurrenceRule.YEARLY,
+}
+
+# The frontend sends "custom" for "weekly on the selected weekdays".
+CUSTOM = "CUSTOM"
+
+# Frequencies are stored the way clients send them, which is not always upper case.
+RECURRING_FREQUENCY_VALUES = [
+    value for frequency in [*RECURRING_FREQUENCIES, CUSTOM] for value in (frequency, frequency.lower())
+]
+
+# What `RecurrenceExpander` reads from a rule.
+EXPANSION_FIELDS = ("frequency", "monthly_type", "interval", "weekdays", "weekday_ordinal", "end_date", "repeat_count")
+
+
+class Occurrence(NamedTuple):
+    start_time: datetime
+    end_time: datetime
+
+
+def normalize_frequency(frequency: Optional[str]) -> Optional[str]:
+    if not frequency:
+        return None
+
+    frequency = frequency.upper()
+
+    if frequency == CUSTOM:
+        return RecurrenceRule.WEEKLY
+
+    if frequency not in RECURRING_FREQUENCIES:
+        return None
+
+    return frequency
+
+
+def is_recurring(rule) -> bool:
+    return rule is not None and normalize_frequency(rule.frequency) is not None
+
+
+def _to_python_weekday(weekday: int) -> int:
+    return (weekday + 6) % 7
+
+
+def _floor_div(value: float, step: float) -> int:
+    return int(value // step)
+
+
+class RecurrenceExpander:
+    """
+    Expands a single series. Build it once per event and call `between` for as many
+    windows as needed; all the per-rule work is done in `__init__`.
+    """
+
+    def __init__(self, *, start_time: datetime, end_time: datetime, rule=None):
+        self.start_time = start_time
+        self.duration = end_time - start_time
+        self.frequency = normalize_frequency(rule.frequency) if rule is not None else None
+
+        if self.frequency is None:
+            return
+
+        self.interval = max(rule.interval or 1, 1)
+        self.end_date = rule.end_date
+        self.repeat_count = rule.repeat_count
+        self.weekdays = sorted({_to_python_weekday(day) for day in rule.weekdays or []})
+        self.monthly_type = (rule.monthly_type or RecurrenceRule.DATE).upper()
+        self.weekday_ordinal = rule.weekday_ordinal or 1
+
+        if self.frequency == RecurrenceRule.WEEKLY:
+            self.weekdays = self.weekdays or [start_time.weekday()]
+            self.anchor = start_time - timedelta(days=start_time.weekday())
+            self.step = timedelta(weeks=self.interval)
+        elif self.frequency == RecurrenceRule.DAILY:
+            self.anchor = start_time
+            self.step = timedelta(days=self.interval)
+        elif self.frequency == RecurrenceRule.MONTHLY:
+            self.weekdays = self.weekdays or [start_time.weekday()]
+            self.anchor_month = start_time.year * 12 + start_time.month - 1
+        else:
+            self.anchor_year = start_time.year
+
+        self.per_period = self._occurrences_per_period()
+
+    @property
+    def is_recurring(self) -> bool:
+        return self.frequency is not None
+
+    def between(self, window_start: datetime, window_end: datetime) -> Iterator[Occurrence]:
+        """
+        Lazily yields every occurrence overlapping `[window_start, window_end)`, in order.
+        """
+        if self.frequency is None:
+            if self.start_time < window_end and self.start_time + self.duration > window_start:
+                yield Occurrence(self.start_time, self.start_time + self.duration)
+            return
+
+        if window_start >= window_end:
+            return
+
+        duration, end_date, repeat_count = self.duration, self.end_date, self.repeat_count
+
+        # An occurrence starting before the window can still overlap it.
+        period = max(self._period_index(window_start - duration), 0)
+        index = self._count_before(period) if repeat_count else 0
+
+        while self._period_start(period) < window_end:
+            for start in self._period_occurrences(period):
+                if repeat_count and index >= repeat_count:
+                    return
+                if end_date and start.date() > end_date:
+                    return
+                if start >= window_end:
+                    return
+
+                index += 1
+                end = start + duration
+
+                if end > window_start:
+                    yield Occurrence(start, end)
+
+            period += 1
+
+    def starts_before(self) -> Optional[datetime]:
+        """
+        An exclusive bound on the starts of a recurring series, `None` when it has no end
+        (or, for a `repeat_count` on the 31st or the 5th Friday, when finding it means walking the series).
+        """
+        bounds = []
+
+        if self.end_date:
+            bounds.append(datetime.combine(self.end_date + timedelta(days=1), time(), tzinfo=self.start_time.tzinfo))
+
+        if self.repeat_count and self.per_period is not None:
+            bounds.append(self._nth_occurrence(self.repeat_count - 1) + timedelta(microseconds=1))
+
+        return min(bounds, default=None)
+
+    def progressions(self) -> Optional[tuple[list[int], int, Optional[int]]]:
+        """
+        The starts of a daily or weekly series on whole seconds as arithmetic progressions of
+        POSIX timestamps, one per weekday: `(firsts, step, end)`, every `first + k * step` below
+        `end` (`None` for an endless series) being a start. `None` for the other series.
+        """
+        if self.frequency not in (RecurrenceRule.DAILY, RecurrenceRule.WEEKLY):
+            return None
+
+        if self.start_time.microsecond or self.duration.microseconds:
+            return None
+
+        step = int(self.step.total_seconds())
+        series_start = int(self.start_time.timestamp())
+        starts_before = self.starts_before()
+
+        anchor = int(self.anchor.timestamp())
+        offsets = [0] if self.frequency == RecurrenceRule.DAILY else [day * 86400 for day in self.weekdays]
+        firsts = []
+
+        for offset in offsets:
+            first = anchor + offset
+            first += -((first - series_start) // step) * step if first < series_start else 0
+            firsts.append(first)
+
+        return firsts, step, math.ceil(starts_before.timestamp()) if starts_before else None
+
+    @property
+    def duration_seconds(self) -> int:
+        return math.ceil(self.duration.total_seconds())
+
+    def start_timestamps_between(self, window_start: datetime, window_end: datetime) -> Optional[list[range]]:
+        """
+        The starts, as POSIX timestamps, of the occurrences overlapping `[window_start, window_end)`:
+        one arithmetic progression per weekday, not merged in order. Only for daily and weekly
+        series on whole seconds, `None` otherwise (use `between`).
+        """
+        progressions = self.progressions()
+
+        if progressions is None:
+            return None
+
+        firsts, step, end = progressions
+
+        # `start + duration > window_start` and `start < window_end`, on integers.
+        lower = math.floor(window_start.timestamp() - self.duration_seconds) + 1
+        upper = math.ceil(window_end.timestamp())
+        upper = min(upper, end) if end is not None else upper
+        ranges = []
+
+        for first in firsts:
+            first += -((first - lower) // step) * step if first < lower else 0
+            ranges.append(range(first, upper, step))
+
+        return ranges
+
+    def _nth_occurrence(self, index: int) -> datetime:
+        # Only for rules with a constant number of occurrences per period.
+        first = self._period_occurrences(0)
+
+        if index < len(first):
+            return first[index]
+
+        period, position = divmod(index - len(first), self.per_period)
+
+        return self._period_occurrences(period + 1)[position]
+
+    def _period_index(self, moment: datetime) -> int:
+        if self.frequency in (RecurrenceRule.DAILY, RecurrenceRule.WEEKLY):
+            return _floor_div((moment - self.anchor).total_seconds(), self.step.total_seconds())
+
+        if self.frequency == RecurrenceRule.MONTHLY:
+            return _floor_div(moment.year * 12 + moment.month - 1 - self.anchor_month, self.interval)
+
+        return _floor_div(moment.year - self.anchor_year, self.interval)
+
+    def _period_start(self, period: int) -> datetime:
+        if self.frequency in (RecurrenceRule.DAILY, RecurrenceRule.WEEKLY):
+            return self.anchor + self.step * period
+
+        if self.frequency == RecurrenceRule.MONTHLY:
+            year, month = divmod(self.anchor_month + period * self.interval, 12)
+            return self._midnight(year, month + 1, 1)
+
+        return self._midnight(self.anchor_year + period * self.interval, 1, 1)
+
+    def _midnight(self, year: int, month: int, day: int) -> datetime:
+        return self.start_time.replace(year=year, month=month, day=day, hour=0, minute=0, second=0, microsecond=0)
+
+    def _period_occurrences(self, period: int) -> list[datetime]:
+        if self.frequency == RecurrenceRule.DAILY:
+            candidates = [self.anchor + self.step * period]
+        elif self.frequency == RecurrenceRule.WEEKLY:
+            week_start = self.anchor + self.step * period
+            candidates = [week_start + timedelta(days=day) for day in self.weekdays]
+        elif self.frequency == RecurrenceRule.MONTHLY:
+            year, month = divmod(self.anchor_month + period * self.interval, 12)
+            candidates = self._monthly_candidates(year, month + 1)
+        else:
+            candidates = self._yearly_candidates(self.anchor_year + period * self.interval)
+
+        if period == 0:
+            return [start for start in candidates if start >= self.start_time]
+
+        return candidates
+
+    def _monthly_candidates(self, year: int, month: int) -> list[datetime]:
+        first_weekday, days_in_month = _calendar.monthrange(year, month)
+
+        if self.monthly_type != RecurrenceRule.WEEKDAY:
+            if self.start_time.day > days_in_month:
+                return []
+            return [self.start_time.replace(year=year, month=month)]
+
+        days = []
+        for weekday in self.weekdays:
+            first = 1 + (weekday - first_weekday) % 7
+            if self.weekday_ordinal > 0:
+                day = first + 7 * (self.weekday_ordinal - 1)
+            else:
+                last = first + 7 * ((days_in_month - first) // 7)
+                day = last + 7 * (self.weekday_ordinal + 1)
+            if 1 <= day <= days_in_month:
+                days.append(day)
+
+        return [self.start_time.replace(year=year, month=month, day=day) for day in sorted(days)]
+
+    def _yearly_candidates(self, year: int) -> list[datetime]:
+        if self.start_time.day > _calendar.monthrange(year, self.start_time.month)[1]:
+            return []
+        return [self.start_time.replace(year=year)]
+
+    def _occurrences_per_period(self) -> Optional[int]:
+        """
+        The number of occurrences in every period after the first one, or None when
+        it depends on the period (the 31st, the 5th Friday, February 29th).
+        """
+        if self.frequency == RecurrenceRule.DAILY:
+            return 1
+
+        if self.frequency == RecurrenceRule.WEEKLY:
+            return len(self.weekdays)
+
+        if self.frequency == RecurrenceRule.MONTHLY:
+            if self.monthly_type == RecurrenceRule.WEEKDAY:
+                return len(self.weekdays) if 1 <= abs(self.weekday_ordinal) <= 4 else None
+            return 1 if self.start_time.day <= 28 else None
+
+        return None if (self.start_time.month, self.start_time.day) == (2, 29) else 1
+
+    def _count_before(self, period: int) -> int:
+        if period == 0:
+            return 0
+
+        first = len(self._period_occurrences(0))
+
+        if self.per_period is not None:
+            return first + (period - 1) * self.per_period
+
+        return first + sum(len(self._period_occurrences(index)) for index in range(1, period))
+
+
+def expand_occurrences(
+    *,
+    start_time: datetime,
+    end_time: datetime,
+    rule=None,
+    window_start: datetime,
+    window_end: datetime,
+) -> Iterator[Occurrence]:
+    expander = RecurrenceExpander(start_time=start_time, end_time=end_time, rule=rule)
+    return expander.between(window_start, window_end)
+
+
+def series_end_time(*, start_time: datetime, end_time: datetime, rule=None) -> Optional[datetime]:
+    """
+    `Event.series_end_time`: no occurrence of the event ends after it. The end of a single event,
+    `None` for a series with no end (or whose end takes walking the series, see `starts_before`).
+    """
+    expander = RecurrenceExpander(start_time=start_time, end_time=end_time, rule=rule)
+
+    if not expander.is_recurring:
+        return end_time
+
+    try:
+        starts_before = expander.starts_before()
+        return starts_before + expander.duration if starts_before else None
+    except OverflowError:
+        return None
+
+
+def event_series_end_time(event) -> Optional[datetime]:
+    return series_end_time(start_time=event.start_time, end_time=event.end_time, rule=event.recurrence)
+
+
+def event_occurrences(*, event, window_start: datetime, window_end: datetime) -> Iterator[Occurrence]:
+    return expand_occurrences(
+        start_time=event.start_time,
+        end_time=event.end_time,
+        rule=event.recurrence,
+        window_start=window_start,
+        window_end=window_end,
+    )
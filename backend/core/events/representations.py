@@ -0,0 +1,244 @@
+"""
+Read path for the hot list endpoints that skips DRF field-by-field serialization.
+
+Rows come straight from `.values()` and are turned into plain dicts, which the
+regular `JSONRenderer` turns into bytes. The output is byte-for-byte the one of
+the `OutputSerializer` of `EventListApi` / `CalendarListApi`, which stay the
+reference (and the schema) for these endpoints; `benchmark_serialization`
+checks that the two agree.
+"""
+
+from typing import Iterable, Optional
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from core.calendar.models import Calendar
+from core.common.profiling import timed
+from core.common.utils import date_to_representation, datetime_to_representation
+
+from .models import Event
+
+RECURRENCE_VALUES = (
+    "recurrence_id",
+    "recurrence__frequency",
+    "recurrence__monthly_type",
+    "recurrence__interval",
+    "recurrence__weekdays",
+    "recurrence__weekday_ordinal",
+    "recurrence__end_date",
+    "recurrence__repeat_count",
+)
+
+USER_VALUES = (
+    "user__first_name",
+    "user__last_name",
+    "user__email",
+    "user__phone_number",
+    "user__is_active",
+    "user__is_staff",
+    "user__is_admin",
+    "user__is_superuser",
+)
+
+CALENDAR_VALUES = ("id", "name", "description", "color", "is_visible", "created_at", "updated_at")
+
+CALENDAR_EVENT_VALUES = ("calendar_id", "title", "description", "start_time", "end_time", "color", "is_all_day")
+
+EVENT_VALUES = (
+    "id",
+    "calendar_id",
+    "title",
+    "description",
+    "start_time",
+    "end_time",
+    "color",
+    "is_all_day",
+    "created_at",
+    "updated_at",
+    *USER_VALUES,
+    *RECURRENCE_VALUES,
+)
+
+
+def recurrence_to_representation(row: dict) -> Optional[dict]:
+    if row["recurrence_id"] is None:
+        return None
+
+    return {
+        "frequency": row["recurrence__frequency"],
+        "monthly_type": row["recurrence__monthly_type"],
+        "interval": row["recurrence__interval"],
+        "weekdays": row["recurrence__weekdays"],
+        "weekday_ordinal": row["recurrence__weekday_ordinal"],
+        "end_date": date_to_representation(row["recurrence__end_date"]),
+        "repeat_count": row["recurrence__repeat_count"],
+    }
+
+
+def user_to_representation(row: dict) -> dict:
+    return {
+        "first_name": row["user__first_name"],
+        "last_name": row["user__last_name"],
+        "email": row["user__email"],
+        "phone_number": row["user__phone_number"],
+        "is_active": row["user__is_active"],
+        "is_staff": row["user__is_staff"],
+        "is_admin": row["user__is_admin"],
+        "is_superuser": row["user__is_superuser"],
+    }
+
+
+def calendar_values(calendars: QuerySet[Calendar]) -> QuerySet:
+    return calendars.prefetch_related(None).values(*CALENDAR_VALUES)
+
+
+def calendar_event_values(events: QuerySet[Event], calendar_rows: list[dict], *, with_recurrence: bool) -> QuerySet:
+    values = CALENDAR_EVENT_VALUES + RECURRENCE_VALUES if with_recurrence else CALENDAR_EVENT_VALUES
+
+    return events.filter(calendar_id__in=[row["id"] for row in calendar_rows]).values(*values)
+
+
+@timed("serialize")
+def calendars_to_representation(
+    calendar_rows: Iterable[dict],
+    *,
+    events: Optional[QuerySet[Event]],
+    with_recurrence: bool = True,
+) -> list[dict]:
+    """
+    `events` is the queryset the nested `calendar.events` are taken from, e.g. limited to a window.
+    With `None` the calendars come without `events`: that is the shape of the paginated lists, whose
+    pages would otherwise grow with the number of events in the calendars.
+    `CalendarSerializer` (used inside the event list) does not output the nested recurrence.
+    """
+    calendar_rows = list(calendar_rows)
+
+    if events is None:
+        return calendar_rows_to_representation(calendar_rows, None, with_recurrence=with_recurrence)
+
+    event_rows = calendar_event_values(events, calendar_rows, with_recurrence=with_recurrence)
+
+    return calendar_rows_to_representation(calendar_rows, event_rows, with_recurrence=with_recurrence)
+
+
+async def acalendars_to_representation(
+    calendar_rows: Iterable[dict],
+    *,
+    events: Optional[QuerySet[Event]],
+    with_recurrence: bool = True,
+) -> list[dict]:
+    calendar_rows = list(calendar_rows)
+
+    if events is None:
+        return calendar_rows_to_representation(calendar_rows, None, with_recurrence=with_recurrence)
+
+    event_rows = [row async for row in calendar_event_values(events, calendar_rows, with_recurrence=with_recurrence)]
+
+    return calendar_rows_to_representation(calendar_rows, event_rows, with_recurrence=with_recurrence)
+
+
+@timed("serialize")
+def calendar_rows_to_representation(
+    calendar_rows: list[dict],
+    event_rows: Optional[Iterable[dict]],
+    *,
+    with_recurrence: bool,
+) -> list[dict]:
+    tz = timezone.get_current_timezone()
+    nested_events: dict = {row["id"]: [] for row in calendar_rows}
+
+    for row in event_rows or ():
+        event = {
+            "title": row["title"],
+            "description": row["description"],
+            "start_time": datetime_to_representation(row["start_time"], tz),
+            "end_time": datetime_to_representation(row["end_time"], tz),
+            "color": row["color"],
+        }
+        if with_recurrence:
+            event["recurrence"] = recurrence_to_representation(row)
+        event["is_all_day"] = row["is_all_day"]
+
+        nested_events[row["calendar_id"]].append(event)
+
+    calendars = [
+        {
+            "id": str(row["id"]),
+            "name": row["name"],
+            "description": row["description"],
+            "color": row["color"],
+            "is_visible": row["is_visible"],
+            "created_at": datetime_to_representation(row["created_at"], tz),
+            "updated_at": datetime_to_representation(row["updated_at"], tz),
+        }
+        for row in calendar_rows
+    ]
+
+    if event_rows is not None:
+        for calendar, row in zip(calendars, calendar_rows):
+            calendar["events"] = nested_events[row["id"]]
+
+    return calendars
+
+
+def event_values(events: QuerySet[Event]) -> QuerySet:
+    return events.prefetch_related(None).values(*EVENT_VALUES)
+
+
+def event_calendar_values(event_rows: list[dict]) -> QuerySet:
+    return Calendar.objects.filter(id__in={row["calendar_id"] for row in event_rows}).values(*CALENDAR_VALUES)
+
+
+@timed("serialize")
+def events_to_representation(event_rows: Iterable[dict], *, with_calendar_events: bool = True) -> list[dict]:
+    """
+    Every row embeds its calendar, itself embedding all of the calendar's events unless
+    `with_calendar_events` is False, as in the pages of the paginated list.
+    """
+    event_rows = list(event_rows)
+
+    # Build each calendar once and share it between the rows.
+    calendars = calendars_to_representation(
+        event_calendar_values(event_rows),
+        events=Event.objects.order_by("start_time") if with_calendar_events else None,
+        with_recurrence=False,
+    )
+
+    return event_rows_to_representation(event_rows, calendars)
+
+
+async def aevents_to_representation(event_rows: Iterable[dict], *, with_calendar_events: bool = True) -> list[dict]:
+    event_rows = list(event_rows)
+
+    calendars = await acalendars_to_representation(
+        [row async for row in event_calendar_values(event_rows)],
+        events=Event.objects.order_by("start_time") if with_calendar_events else None,
+        with_recurrence=False,
+    )
+
+    return event_rows_to_representation(event_rows, calendars)
+
+
+@timed("serialize")
+def event_rows_to_representation(event_rows: list[dict], calendar_representations: list[dict]) -> list[dict]:
+    tz = timezone.get_current_timezone()
+    calendars = {calendar["id"]: calendar for calendar in calendar_representations}
+
+    return [
+        {
+            "id": str(row["id"]),
+            "user": user_to_representation(row),
+            "calendar": calendars[str(row["calendar_id"])],
+            "title": row["title"],
+            "description": row["description"],
+            "start_time": datetime_to_representation(row["start_time"], tz),
+            "end_time": datetime_to_representation(row["end_time"], tz),
+            "color": row["color"],
+            "is_all_day": row["is_all_day"],
+            "created_at": datetime_to_representation(row["created_at"], tz),
+            "updated_at": datetime_to_representation(row["updated_at"], tz),
+            "recurrence": recurrence_to_representation(row),
+        }
+        for row in event_rows
+    ]
@@ -1,11 +1,255 @@
-from django.db.models import QuerySet
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Optional
 
-from core.events.models import Event
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.utils.timezone import now
 
+from core.events.models import SEARCH_CONFIG, Event, EventOccurrence
 
-def get_event_by_id(event_id: str) -> Event:
-    return Event.objects.select_related("calendar", "recurrence").get(id=event_id)
+from .freebusy import merge_intervals
+from .recurrence import EXPANSION_FIELDS, RecurrenceExpander
 
 
-def get_user_events(user) -> QuerySet[Event]:
-    return Event.objects.filter(user=user).select_related("calendar", "recurrence").order_by("-start_time")
+def event_detail_queryset(user=None) -> QuerySet[Event]:
+    events = Event.objects.select_related("calendar", "recurrence")
+
+    if user is not None:
+        events = events.filter(user=user)
+
+    return events
+
+
+def get_event_by_id(event_id: str, user=None) -> Event:
+    return event_detail_queryset(user).get(id=event_id)
+
+
+async def aget_event_by_id(event_id: str, user=None) -> Event:
+    return await event_detail_queryset(user).aget(id=event_id)
+
+
+def get_event_data_version(event_id: str, user) -> tuple:
+    # `event_update` saves the event along with its recurrence rule.
+    return (Event.objects.filter(id=event_id, user=user).values_list("updated_at", flat=True).first(),)
+
+
+async def aget_event_data_version(event_id: str, user) -> tuple:
+    return (await Event.objects.filter(id=event_id, user=user).values_list("updated_at", flat=True).afirst(),)
+
+
+def get_user_events(
+    user,
+    *,
+    calendar_id: Optional[str] = None,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+) -> QuerySet[Event]:
+    events = Event.objects.filter(user=user)
+
+    if calendar_id is not None:
+        events = events.filter(calendar_id=calendar_id)
+
+    if window_start is not None and window_end is not None:
+        events = events.filter(in_window_q(window_start=window_start, window_end=window_end))
+
+    return events.select_related("user", "calendar", "recurrence").order_by("-start_time")
+
+
+def search_user_events(
+    *,
+    user,
+    query: str,
+    calendar_id: Optional[str] = None,
+    limit: int = 20,
+) -> list[Event]:
+    """
+    The user's events matching `query`, best first, each with a `rank`.
+
+    On PostgreSQL the query uses the `websearch_to_tsquery` syntax ("quoted phrase", `or`,
+    `-word`) against `search_vector`, or matches titles with a trigram-similar word (prefixes,
+    typos); the rank is `ts_rank` plus the trigram word similarity. Both are served by GIN
+    indexes. Elsewhere (SQLite, offline and in tests) every word of the query must appear in
+    the title or the description, `-word`s must not, and the most recent events come first.
+    """
+    events = Event.objects.filter(user=user)
+
+    if calendar_id is not None:
+        events = events.filter(calendar_id=calendar_id)
+
+    if connection.vendor == "postgresql":
+        search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+
+        events = (
+            events.filter(Q(search_vector=search_query) | Q(title__trigram_word_similar=query))
+            .annotate(rank=SearchRank(F("search_vector"), search_query) + TrigramWordSimilarity(query, "title"))
+            .order_by("-rank", "-start_time", "id")
+        )
+    else:
+        for term in query.replace('"', " ").split():
+            matches = Q(title__icontains=term.lstrip("-")) | Q(description__icontains=term.lstrip("-"))
+            events = events.exclude(matches) if term.startswith("-") and len(term) > 1 else events.filter(matches)
+
+        events = events.annotate(rank=Value(0.0, output_field=FloatField())).order_by("-start_time", "-id")
+
+    return list(events.select_related("recurrence").defer("search_vector")[:limit])
+
+
+def in_window_q(*, window_start: datetime, window_end: datetime) -> Q:
+    """
+    Matches every event that can have an occurrence in `[window_start, window_end)`:
+    single events overlapping the window, including the ones straddling either edge,
+    and series started before the end of the window that have not ended before it.
+
+    No join: `series_end_time` is the end of a single event and bounds the ends of a series,
+    so the events that ended before the window, however many, are skipped by a range scan
+    on the `(user, series_end_time)` / `(calendar, series_end_time)` indexes. Series with
+    no end (`NULL`) are always candidates.
+    """
+    return Q(start_time__lt=window_end) & (Q(series_end_time__isnull=True) | Q(series_end_time__gt=window_start))
+
+
+def get_user_events_to_expand(*, user, window_start: datetime, window_end: datetime) -> QuerySet[Event]:
+    return (
+        Event.objects.filter(user=user)
+        .filter(in_window_q(window_start=window_start, window_end=window_end))
+        .select_related("calendar", "recurrence")
+    )
+
+
+def get_user_event_occurrences(*, user, window_start: datetime, window_end: datetime) -> list[dict]:
+    if settings.EVENT_OCCURRENCES_MATERIALIZED:
+        return get_user_materialized_occurrences(user=user, window_start=window_start, window_end=window_end)
+
+    occurrences = [
+        {"event": event, "start_time": occurrence.start_time, "end_time": occurrence.end_time}
+        for event in get_user_events_to_expand(user=user, window_start=window_start, window_end=window_end)
+        for occurrence in RecurrenceExpander(
+            start_time=event.start_time,
+            end_time=event.end_time,
+            rule=event.recurrence,
+        ).between(window_start, window_end)
+    ]
+
+    occurrences.sort(key=lambda occurrence: occurrence["start_time"])
+
+    return occurrences
+
+
+def occurrences_retention_start() -> datetime:
+    """
+    The stored occurrences are the ones ending after it, see `EventOccurrence`.
+    """
+    return now() - timedelta(days=settings.EVENT_OCCURRENCES_RETENTION_DAYS)
+
+
+def get_user_materialized_occurrences(*, user, window_start: datetime, window_end: datetime) -> list[dict]:
+    """
+    The stored occurrences in the window, and the others expanded on the fly: the ones ending
+    before the retention start, and past `Event.occurrences_until` (beyond the rolling horizon,
+    or events `extend_occurrence_horizon` has not reached yet).
+    Reads never materialize: that is left to the services and `extend_occurrence_horizon`.
+    """
+    retention_start = occurrences_retention_start()
+
+    occurrences = [
+        {"event": occurrence.event, "start_time": occurrence.start_time, "end_time": occurrence.end_time}
+        for occurrence in EventOccurrence.objects.filter(
+            user=user,
+            start_time__lt=window_end,
+            end_time__gt=max(window_start, retention_start),
+        ).select_related("event", "event__recurrence")
+    ]
+
+    to_expand = get_user_events_to_expand(user=user, window_start=window_start, window_end=window_end)
+
+    if window_start >= retention_start:
+        # Within the horizon, with the events materialized, this finds none.
+        to_expand = to_expand.filter(Q(occurrences_until__isnull=True) | Q(occurrences_until__lt=window_end))
+
+    for event in to_expand:
+        materialized_until = event.occurrences_until
+
+        occurrences.extend(
+            {"event": event, "start_time": occurrence.start_time, "end_time": occurrence.end_time}
+            for occurrence in RecurrenceExpander(
+                start_time=event.start_time,
+                end_time=event.end_time,
+                rule=event.recurrence,
+            ).between(window_start, window_end)
+            if occurrence.end_time <= retention_start
+            or materialized_until is None
+            or occurrence.start_time >= materialized_until
+        )
+
+    occurrences.sort(key=lambda occurrence: occurrence["start_time"])
+
+    return occurrences
+
+
+def _timestamp(value: datetime) -> float:
+    # Whole seconds as ints: a list of ints sorts a lot faster than a mixed one.
+    timestamp = value.timestamp()
+
+    return int(timestamp) if timestamp.is_integer() else timestamp
+
+
+def get_user_busy_blocks(
+    *,
+    user,
+    window_start: datetime,
+    window_end: datetime,
+    include_all_day: bool = True,
+) -> list[tuple[datetime, datetime]]:
+    """
+    Busy blocks of `user` in `[window_start, window_end)`, over the events of their visible calendars.
+
+    Occurrences are handled as POSIX timestamps: daily and weekly series come out of
+    `start_timestamps_between` as ranges, without building a datetime per occurrence.
+    """
+    events = Event.objects.filter(calendar__user=user, calendar__is_visible=True).filter(
+        in_window_q(window_start=window_start, window_end=window_end),
+    )
+
+    if not include_all_day:
+        events = events.filter(is_all_day=False)
+
+    rows = events.values_list("start_time", "end_time", *[f"recurrence__{field}" for field in EXPANSION_FIELDS])
+
+    starts: list[float] = []
+    ends: list[float] = []
+    series = set()
+
+    for start_time, end_time, *rule in rows:
+        # `frequency` is never NULL on a rule: NULL means no rule.
+        expander = RecurrenceExpander(
+            start_time=start_time,
+            end_time=end_time,
+            rule=SimpleNamespace(**dict(zip(EXPANSION_FIELDS, rule))) if rule[0] is not None else None,
+        )
+        ranges = expander.start_timestamps_between(window_start, window_end)
+
+        if ranges is None:
+            for occurrence in expander.between(window_start, window_end):
+                starts.append(_timestamp(occurrence.start_time))
+                ends.append(_timestamp(occurrence.end_time))
+            continue
+
+        duration = int(expander.duration.total_seconds())
+        for start in ranges:
+            # Identical series (e.g. the same daily stand-up in several calendars) are expanded once.
+            if (start, duration) in series:
+                continue
+
+            series.add((start, duration))
+            starts.extend(start)
+            ends.extend(range(start.start + duration, start.stop + duration, start.step))
+
+    blocks = merge_intervals(starts, ends, window_start=_timestamp(window_start), window_end=_timestamp(window_end))
+
+    return [
+        (datetime.fromtimestamp(start, tz=timezone.utc), datetime.fromtimestamp(end, tz=timezone.utc))
+        for start, end in blocks
+    ]
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from core.common.utils import create_serializer_class
+
 
 class RecurrenceRuleSerializer(serializers.Serializer):
     frequency = serializers.CharField()
@@ -9,3 +11,72 @@ class RecurrenceRuleSerializer(serializers.Serializer):
     weekday_ordinal = serializers.IntegerField()
     end_date = serializers.DateField()
     repeat_count = serializers.IntegerField()
+
+
+class TimeWindowSerializer(
+    create_serializer_class(
+        name="TimeWindowFields",
+        fields={
+            "from": serializers.DateTimeField(),
+            "to": serializers.DateTimeField(),
+        },
+    ),
+):
+    """
+    Validates a `?from=...&to=...` half-open `[from, to)` window.
+    `from` is a keyword, hence the fields are declared through `create_serializer_class`.
+    """
+
+    max_span = None
+
+    def validate(self, attrs):
+        if attrs["to"] <= attrs["from"]:
+            raise serializers.ValidationError({"to": "`to` must be after `from`."})
+
+        if self.max_span is not None and attrs["to"] - attrs["from"] > self.max_span:
+            raise serializers.ValidationError({"to": f"The window can not be longer than {self.max_span.days} days."})
+
+        return attrs
+
+
+class EventInputSerializer(serializers.Serializer):
+    """
+    An event as written by `EventCreateApi`, `EventUpdateApi` and each item of the bulk APIs.
+    """
+
+    calendar_id = serializers.UUIDField()
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_blank=True)
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+    color = serializers.CharField(max_length=7, allow_blank=True, required=False)
+    is_all_day = serializers.BooleanField()
+    frequency = serializers.CharField()
+    interval = serializers.IntegerField(default=1)
+    weekdays = serializers.JSONField(required=False, allow_null=True)
+    weekday_ordinal = serializers.IntegerField(required=False, allow_null=True)
+    end_date = serializers.DateField(required=False, allow_null=True)
+    repeat_count = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs["end_time"] <= attrs["start_time"]:
+            raise serializers.ValidationError({"end_time": "End time must be after start time."})
+
+        return attrs
+
+
+def validate_bulk_items(serializer: serializers.Serializer, items: list) -> tuple[dict[int, dict], dict[int, dict]]:
+    """
+    Validates every item of a bulk request on its own with `serializer`,
+    returning `(validated_data, errors)`, both keyed by the index of the item.
+    """
+    validated_data = {}
+    errors = {}
+
+    for index, item in enumerate(items):
+        try:
+            validated_data[index] = serializer.run_validation(item)
+        except serializers.ValidationError as e:
+            errors[index] = e.detail
+
+    return validated_data, errors
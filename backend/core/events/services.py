@@ -1,11 +1,27 @@
-from typing import Optional
+import copy
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional, Union
 
+from django.conf import settings
 from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from easyaudit.models import CRUDEvent
+from easyaudit.utils import model_delta
 
 from core.calendar.models import Calendar
+from core.calendar.services import calendar_users_cache_invalidate
+from core.common.audit import audit_crud_log
+from core.sync.models import Tombstone
+from core.sync.notifications import CREATED, DELETED, UPDATED, changes_notify
+from core.sync.services import tombstones_create
 from core.users.models import User
 
-from .models import Event, RecurrenceRule
+from .conflicts import EventConflictError, get_event_conflicts
+from .ics import IcsError, iter_vevents, vevent_to_event_data
+from .models import Event, EventOccurrence, RecurrenceRule
+from .recurrence import RecurrenceExpander, event_series_end_time, series_end_time
+from .selectors import occurrences_retention_start
 
 
 def event_create(
@@ -24,6 +40,7 @@ def event_create(
     weekday_ordinal: Optional[int] = None,
     end_date=None,
     repeat_count: Optional[int] = None,
+    check_conflicts: bool = False,
 ) -> Event:
     with transaction.atomic():
         recurrence_obj = RecurrenceRule.objects.create(
@@ -35,7 +52,7 @@ def event_create(
             repeat_count=repeat_count,
         )
 
-        return Event.objects.create(
+        event = Event.objects.create(
             user=user,
             calendar=calendar,
             title=title,
@@ -45,8 +62,21 @@ def event_create(
             color=color,
             is_all_day=is_all_day,
             recurrence=recurrence_obj,
+            series_end_time=series_end_time(start_time=start_time, end_time=end_time, rule=recurrence_obj),
         )
 
+        if check_conflicts:
+            event_conflicts_check(event=event)
+
+        if settings.EVENT_OCCURRENCES_MATERIALIZED:
+            event_occurrences_rebuild(event=event)
+
+        # Events are nested in the calendar, which is in the lists of its owner and everyone with an event in it.
+        calendar_users_cache_invalidate([calendar.id])
+        changes_notify(kind=Tombstone.EVENT, action=CREATED, changes=[(event.id, [user.id, calendar.user_id])])
+
+        return event
+
 
 def event_update(
     *,
@@ -64,8 +94,12 @@ def event_update(
     weekday_ordinal: Optional[int] = None,
     end_date=None,
     repeat_count: Optional[int] = None,
+    check_conflicts: bool = False,
 ) -> Event:
     with transaction.atomic():
+        previous_calendar_id = event.calendar_id
+        previous_calendar_user_id = event.calendar.user_id
+
         has_recurrence_data = any([
             frequency,
             interval,
@@ -97,9 +131,17 @@ def event_update(
 
         elif event.recurrence:
             # Remove recurrence if no recurrence data is sent
+            tombstones_create(
+                kind=Tombstone.RECURRENCE_RULE,
+                deletions=[(event.recurrence_id, [event.user_id, previous_calendar_user_id, calendar.user_id])],
+            )
             event.recurrence.delete()
             event.recurrence = None
 
+        if previous_calendar_user_id not in (event.user_id, calendar.user_id):
+            # Moved out of another user's calendar: gone from their lists.
+            event_tombstones_create(events=[(event.id, event.recurrence_id, previous_calendar_user_id)])
+
         event.calendar = calendar
         event.title = title
         event.description = description
@@ -107,11 +149,405 @@ def event_update(
         event.end_time = end_time
         event.color = color
         event.is_all_day = is_all_day
+        event.series_end_time = event_series_end_time(event)
 
         event.save()
 
+        if check_conflicts:
+            event_conflicts_check(event=event)
+
+        if settings.EVENT_OCCURRENCES_MATERIALIZED:
+            event_occurrences_rebuild(event=event)
+
+        calendar_users_cache_invalidate({previous_calendar_id, calendar.id}, event.user_id)
+        changes_notify(
+            kind=Tombstone.EVENT,
+            action=UPDATED,
+            changes=[(event.id, [event.user_id, previous_calendar_user_id, calendar.user_id])],
+        )
+
     return event
 
 
+def event_conflicts_check(*, event: Event):
+    """
+    Raises `EventConflictError` when the saved `event` overlaps other events of its owner,
+    rolling back the surrounding transaction. Checked after the write, so an update is
+    checked with the rule as it ends up after merging the new recurrence data.
+    Concurrent writes are not serialized against each other: the check is advisory.
+    """
+    conflicts = get_event_conflicts(event=event)
+
+    if conflicts:
+        raise EventConflictError(conflicts)
+
+
 def event_delete(*, event_id: str, user: User):
-    Event.objects.get(id=event_id, user=user).delete()
+    event = Event.objects.select_related("calendar").get(id=event_id, user=user)
+
+    with transaction.atomic():
+        event_tombstones_create(events=[(event.id, event.recurrence_id, user.id, event.calendar.user_id)])
+
+        # Materialized occurrences go with the event through the cascade.
+        event.delete()
+        RecurrenceRule.objects.filter(id=event.recurrence_id).delete()
+
+        changes_notify(kind=Tombstone.EVENT, action=DELETED, changes=[(event_id, [user.id, event.calendar.user_id])])
+        calendar_users_cache_invalidate([event.calendar_id], user.id)
+
+
+def event_tombstones_create(*, events: Iterable[tuple]):
+    """
+    Tombstones for deleted events and their recurrence rules, given as `(event id, recurrence id, *user ids)`.
+    """
+    events = list(events)
+
+    tombstones_create(kind=Tombstone.EVENT, deletions=[(event_id, user_ids) for event_id, _, *user_ids in events])
+    tombstones_create(
+        kind=Tombstone.RECURRENCE_RULE,
+        deletions=[(recurrence_id, user_ids) for _, recurrence_id, *user_ids in events if recurrence_id],
+    )
+
+
+def raw_delete(queryset: QuerySet) -> int:
+    """
+    Deletes the rows of `queryset` with one DELETE, without loading them, cascading, or sending signals.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+RECURRENCE_FIELDS = ("frequency", "interval", "weekdays", "weekday_ordinal", "end_date", "repeat_count")
+
+EVENT_FIELDS = ("calendar", "title", "description", "start_time", "end_time", "color", "is_all_day")
+
+
+def event_bulk_create(*, user: User, events: list[dict], batch_size: int = 1000) -> list[Event]:
+    """
+    `event_create` for many events: each item holds the keyword arguments of `event_create` but `user`,
+    and optionally a `monthly_type`.
+    The rules and the events are inserted with one INSERT per `batch_size` rows, in a single transaction.
+    `bulk_create` sends no `post_save`: their audit log is written in batches, see `audit_crud_log`.
+    """
+    rules = []
+    created = []
+
+    for item in events:
+        rule = RecurrenceRule(**{field: item.get(field) for field in (*RECURRENCE_FIELDS, "monthly_type")})
+        rules.append(rule)
+        event = Event(user=user, recurrence=rule, **{field: item.get(field) for field in EVENT_FIELDS})
+        event.series_end_time = event_series_end_time(event)
+        created.append(event)
+
+    with transaction.atomic():
+        RecurrenceRule.objects.bulk_create(rules, batch_size=batch_size)
+        Event.objects.bulk_create(created, batch_size=batch_size)
+        audit_crud_log(CRUDEvent.CREATE, rules)
+        audit_crud_log(CRUDEvent.CREATE, created)
+
+        if settings.EVENT_OCCURRENCES_MATERIALIZED:
+            event_occurrences_extend(events=created, until=occurrences_horizon(), batch_size=batch_size)
+
+        calendar_users_cache_invalidate({event.calendar_id for event in created})
+        changes_notify(
+            kind=Tombstone.EVENT,
+            action=CREATED,
+            changes=[(event.id, [user.id, event.calendar.user_id]) for event in created],
+        )
+
+    return created
+
+
+def event_bulk_update(*, events: list[tuple[Event, dict]], batch_size: int = 1000) -> list[Event]:
+    """
+    `event_update` for many events: each item is an event, loaded with its `user`, `calendar` and
+    `recurrence`, and the keyword arguments of `event_update` but `event`. The recurrence is handled the
+    same way. Returns the updated events, leaving out the ones deleted since they were loaded.
+    The calendars, old and new, come with their `user`, whom the audit log names them by.
+
+    Rows are written with `INSERT ... ON CONFLICT (id) DO UPDATE`, one statement per `batch_size` rows.
+    `bulk_update` would build a `CASE WHEN id = ...` per field and row, which is much slower past a few
+    hundred rows. The audit log is written in batches, see `audit_crud_log`.
+    """
+    with transaction.atomic():
+        # The upsert would bring back an event deleted in the meantime, lock the ones still there.
+        existing_ids = set(
+            Event.objects.select_for_update()
+            .filter(id__in=[event.id for event, _ in events])
+            .values_list("id", flat=True),
+        )
+
+        rules = []
+        # The rules and events as loaded, to log what changed.
+        previous_rules = {}
+        previous_events = []
+        rules_to_delete = []
+        updated = []
+        # `(event id, user ids)` of the updated events.
+        changes = []
+        # `(object id, user ids)` of the rules removed, and of the events moved out of another user's calendar.
+        rule_deletions = []
+        moved_away = []
+
+        for event, data in events:
+            if event.id not in existing_ids:
+                continue
+
+            changes.append((event.id, [event.user_id, event.calendar.user_id, data["calendar"].user_id]))
+            previous_events.append(copy.copy(event))
+
+            recurrence_data = {field: data.get(field) for field in RECURRENCE_FIELDS}
+
+            if any(recurrence_data.values()):
+                # Clean out keys with None to avoid unnecessary overwrites
+                recurrence_data = {key: value for key, value in recurrence_data.items() if value is not None}
+
+                if event.recurrence:
+                    previous_rules[event.recurrence_id] = copy.copy(event.recurrence)
+
+                    for key, value in recurrence_data.items():
+                        setattr(event.recurrence, key, value)
+                else:
+                    event.recurrence = RecurrenceRule(**recurrence_data)
+
+                rules.append(event.recurrence)
+
+            elif event.recurrence:
+                rules_to_delete.append(event.recurrence)
+                rule_deletions.append(
+                    (event.recurrence_id, [event.user_id, event.calendar.user_id, data["calendar"].user_id]),
+                )
+                event.recurrence = None
+
+            if event.calendar.user_id not in (event.user_id, data["calendar"].user_id):
+                moved_away.append((event.id, event.recurrence_id, event.calendar.user_id))
+
+            for field in EVENT_FIELDS:
+                setattr(event, field, data.get(field))
+            event.series_end_time = event_series_end_time(event)
+
+            updated.append(event)
+
+        # New rules are inserted, the existing ones updated. `updated_at` is set by `auto_now` either way.
+        RecurrenceRule.objects.bulk_create(
+            rules,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=[*RECURRENCE_FIELDS, "updated_at"],
+        )
+        Event.objects.bulk_create(
+            updated,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=[*EVENT_FIELDS, "recurrence", "series_end_time", "updated_at"],
+        )
+
+        # `bulk_create` sets `auto_now_add` fields as for new rows, the database kept the original ones.
+        for previous, event in zip(previous_events, updated):
+            event.created_at = previous.created_at
+        for rule in rules:
+            if rule.id in previous_rules:
+                rule.created_at = previous_rules[rule.id].created_at
+
+        # The events do not point to these rules anymore, deleting them no longer cascades to the events.
+        raw_delete(RecurrenceRule.objects.filter(id__in=[rule.id for rule in rules_to_delete]))
+
+        new_rules = [rule for rule in rules if rule.id not in previous_rules]
+        updated_rules = [rule for rule in rules if rule.id in previous_rules]
+        audit_crud_log(CRUDEvent.CREATE, new_rules)
+        audit_crud_log(
+            CRUDEvent.UPDATE,
+            updated_rules,
+            changed_fields=[model_delta(previous_rules[rule.id], rule) for rule in updated_rules],
+        )
+        audit_crud_log(CRUDEvent.DELETE, rules_to_delete)
+        audit_crud_log(
+            CRUDEvent.UPDATE,
+            updated,
+            changed_fields=[model_delta(previous, event) for previous, event in zip(previous_events, updated)],
+        )
+        tombstones_create(kind=Tombstone.RECURRENCE_RULE, deletions=rule_deletions)
+        event_tombstones_create(events=moved_away)
+
+        if settings.EVENT_OCCURRENCES_MATERIALIZED:
+            EventOccurrence.objects.filter(event__in=updated).delete()
+            for event in updated:
+                event.occurrences_until = None
+            event_occurrences_extend(events=updated, until=occurrences_horizon(), batch_size=batch_size)
+
+        calendar_users_cache_invalidate(
+            {*(previous.calendar_id for previous in previous_events), *(event.calendar_id for event in updated)},
+            *{event.user_id for event in updated},
+        )
+        changes_notify(kind=Tombstone.EVENT, action=UPDATED, changes=changes)
+
+    return updated
+
+
+def event_bulk_delete(*, user: User, event_ids: Iterable[str]) -> set:
+    """
+    Deletes the events of `user` among `event_ids` along with their recurrence rules.
+    Returns the ids of the deleted events.
+
+    The rows are deleted with one statement per table. `QuerySet.delete` would load and delete them one
+    at a time to send the `post_delete` signals easyaudit listens to: the audit log is written in
+    batches instead, see `audit_crud_log`.
+    """
+    with transaction.atomic():
+        events = list(
+            Event.objects.filter(user=user, id__in=list(event_ids)).select_related("user", "calendar", "recurrence"),
+        )
+        rules = [event.recurrence for event in events if event.recurrence]
+        rows = [(event.id, event.recurrence_id, event.calendar.user_id) for event in events]
+
+        # Nothing else points to the events and their rules.
+        raw_delete(EventOccurrence.objects.filter(event__in=events))
+        raw_delete(Event.objects.filter(id__in=[event.id for event in events]))
+        raw_delete(RecurrenceRule.objects.filter(id__in=[rule.id for rule in rules]))
+        audit_crud_log(CRUDEvent.DELETE, events)
+        audit_crud_log(CRUDEvent.DELETE, rules)
+        event_tombstones_create(
+            events=[
+                (event_id, recurrence_id, user.id, calendar_user_id)
+                for event_id, recurrence_id, calendar_user_id in rows
+            ],
+        )
+
+        calendar_users_cache_invalidate({event.calendar_id for event in events}, user.id)
+        changes_notify(
+            kind=Tombstone.EVENT,
+            action=DELETED,
+            changes=[(event_id, [user.id, calendar_user_id]) for event_id, _, calendar_user_id in rows],
+        )
+
+    return {event_id for event_id, _, _ in rows}
+
+
+# How many per-event errors an import reports, the others are only counted.
+MAX_IMPORT_ERRORS = 1000
+
+
+def event_ics_import(
+    *,
+    user: User,
+    calendar: Calendar,
+    lines: Iterable[Union[str, bytes]],
+    batch_size: int = 1000,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Imports the VEVENTs of an iCalendar file into `calendar`, reading `lines` (e.g. an open file) one at a time
+    and inserting `batch_size` events at a time, each batch in its own transaction. Memory use does not depend
+    on the size of the file.
+
+    Events that can not be imported are reported in `errors` with the line they start at. `progress`,
+    when given, is called with the running result after every batch.
+    """
+    default_tz = timezone.get_default_timezone()
+    result = {"imported": 0, "failed": 0, "errors": []}
+    batch = []
+
+    def flush():
+        event_bulk_create(user=user, events=batch, batch_size=batch_size)
+        result["imported"] += len(batch)
+        batch.clear()
+
+        if progress is not None:
+            progress(result)
+
+    for line_number, properties in iter_vevents(lines):
+        try:
+            batch.append({"calendar": calendar, **vevent_to_event_data(properties, default_tz=default_tz)})
+        except IcsError as e:
+            result["failed"] += 1
+
+            if len(result["errors"]) < MAX_IMPORT_ERRORS:
+                uid = properties.get("UID", ({}, None))[1]
+                result["errors"].append({"line": line_number, "uid": uid, "error": str(e)})
+
+            continue
+
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    return result
+
+
+def occurrences_horizon() -> datetime:
+    return timezone.now() + timedelta(days=settings.EVENT_OCCURRENCES_HORIZON_DAYS)
+
+
+def _event_occurrences_build(*, event: Event, until: datetime) -> tuple[list[EventOccurrence], datetime]:
+    """
+    Builds the occurrences of `event` starting in `[event.occurrences_until, until)` and ending after the
+    retention start, returning them together with the new value of `event.occurrences_until`.
+    """
+    expander = RecurrenceExpander(start_time=event.start_time, end_time=event.end_time, rule=event.recurrence)
+    materialized_until = event.occurrences_until
+    # The occurrences that ended before the retention start are not kept, see `EventOccurrence`.
+    materialized_from = max(materialized_until or event.start_time, occurrences_retention_start())
+
+    occurrences = [
+        EventOccurrence(
+            event=event,
+            user_id=event.user_id,
+            calendar_id=event.calendar_id,
+            start_time=occurrence.start_time,
+            end_time=occurrence.end_time,
+        )
+        for occurrence in expander.between(materialized_from, until)
+        if materialized_until is None or occurrence.start_time >= materialized_until
+    ]
+
+    if not expander.is_recurring or next(expander.between(until, EventOccurrence.SERIES_COMPLETE), None) is None:
+        return occurrences, EventOccurrence.SERIES_COMPLETE
+
+    return occurrences, until
+
+
+@transaction.atomic
+def event_occurrences_rebuild(*, event: Event, until: Optional[datetime] = None) -> Event:
+    EventOccurrence.objects.filter(event=event).delete()
+
+    event.occurrences_until = None
+    occurrences, event.occurrences_until = _event_occurrences_build(event=event, until=until or occurrences_horizon())
+
+    EventOccurrence.objects.bulk_create(occurrences)
+    Event.objects.filter(id=event.id).update(occurrences_until=event.occurrences_until)
+
+    return event
+
+
+@transaction.atomic
+def event_occurrences_extend(*, events: Iterable[Event], until: datetime, batch_size: int = 1000) -> int:
+    """
+    Materializes the occurrences of `events` up to `until`, picking up where each event left off.
+    Returns the number of occurrences created.
+    """
+    occurrences: list[EventOccurrence] = []
+    extended = []
+
+    for event in events:
+        if event.occurrences_until is not None and event.occurrences_until >= until:
+            continue
+
+        event_occurrences, event.occurrences_until = _event_occurrences_build(event=event, until=until)
+        occurrences.extend(event_occurrences)
+        extended.append(event)
+
+    EventOccurrence.objects.bulk_create(occurrences, batch_size=batch_size)
+    Event.objects.bulk_update(extended, ["occurrences_until"], batch_size=batch_size)
+
+    return len(occurrences)
+
+
+def event_occurrences_prune(*, before: Optional[datetime] = None) -> int:
+    """
+    Deletes the stored occurrences ending before the retention start, or `before`, with one DELETE.
+    Returns the number of occurrences deleted.
+    """
+    return raw_delete(EventOccurrence.objects.filter(end_time__lte=before or occurrences_retention_start()))
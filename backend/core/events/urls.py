@@ -1,14 +1,41 @@
+from django.conf import settings
 from django.urls import path
 from django.urls.resolvers import URLPattern
 
-from .apis import EventCreateApi, EventDeleteApi, EventDetailApi, EventListApi, EventUpdateApi
+from .apis import (
+    AsyncEventDetailApi,
+    AsyncEventListApi,
+    EventBulkCreateApi,
+    EventBulkDeleteApi,
+    EventBulkUpdateApi,
+    EventCreateApi,
+    EventDeleteApi,
+    EventDetailApi,
+    EventFreeBusyApi,
+    EventListApi,
+    EventOccurrenceListApi,
+    EventSearchApi,
+    EventUpdateApi,
+)
 
 app_name = "events"
 
+# See `API_ASYNC_VIEWS`.
+if settings.API_ASYNC_VIEWS:
+    list_api, detail_api = AsyncEventListApi, AsyncEventDetailApi
+else:
+    list_api, detail_api = EventListApi, EventDetailApi
+
 urlpatterns: list[URLPattern] = [
-    path("", EventListApi.as_view(), name="event-list"),
+    path("", list_api.as_view(), name="event-list"),
+    path("occurrences/", EventOccurrenceListApi.as_view(), name="event-occurrences"),
+    path("freebusy/", EventFreeBusyApi.as_view(), name="event-freebusy"),
+    path("search/", EventSearchApi.as_view(), name="event-search"),
     path("create/", EventCreateApi.as_view(), name="event-create"),
-    path("<uuid:event_id>/", EventDetailApi.as_view(), name="event-detail"),
+    path("bulk/create/", EventBulkCreateApi.as_view(), name="event-bulk-create"),
+    path("bulk/update/", EventBulkUpdateApi.as_view(), name="event-bulk-update"),
+    path("bulk/delete/", EventBulkDeleteApi.as_view(), name="event-bulk-delete"),
+    path("<uuid:event_id>/", detail_api.as_view(), name="event-detail"),
     path("<uuid:event_id>/update/", EventUpdateApi.as_view(), name="event-update"),
     path("<uuid:event_id>/delete/", EventDeleteApi.as_view(), name="event-delete"),
 ]
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.api.mixins import ApiAuthMixin
+from core.api.pagination import decode_cursor, encode_cursor
+
+from .selectors import changes_to_representation, get_sync_token_time, get_user_changes
+
+
+class SyncApi(ApiAuthMixin, APIView):
+    """
+    Delta sync: the calendars, events and recurrence rules created, updated or deleted
+    since `?token=...`, and the token for the next sync. Without a token, everything.
+
+    Clients upsert the rows, then drop the deleted ids. A token older than
+    `SYNC_TOMBSTONE_RETENTION_DAYS` gets a 410: sync again without a token.
+    """
+
+    class FilterSerializer(serializers.Serializer):
+        token = serializers.CharField(required=False)
+
+        def validate_token(self, value: str) -> datetime:
+            try:
+                (since,) = decode_cursor(value)
+                since = datetime.fromisoformat(since)
+            except (ValidationError, TypeError, ValueError):
+                raise serializers.ValidationError("Invalid token.")
+
+            if since.tzinfo is None:
+                raise serializers.ValidationError("Invalid token.")
+
+            return since
+
+    class OutputSerializer(serializers.Serializer):
+        class DeletedSerializer(serializers.Serializer):
+            calendars = serializers.ListField(child=serializers.UUIDField())
+            events = serializers.ListField(child=serializers.UUIDField())
+            recurrence_rules = serializers.ListField(child=serializers.UUIDField())
+
+        token = serializers.CharField()
+        calendars = serializers.ListField(child=serializers.DictField())
+        events = serializers.ListField(child=serializers.DictField())
+        recurrence_rules = serializers.ListField(child=serializers.DictField())
+        deleted = DeletedSerializer()
+
+    serializer_class = OutputSerializer
+
+    def get(self, request):
+        filter_serializer = self.FilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+
+        since = filter_serializer.validated_data.get("token")
+
+        try:
+            if since is not None and since < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+                return Response(
+                    {"message": "The sync token has expired, sync again without a token.", "extra": {}},
+                    status=status.HTTP_410_GONE,
+                )
+
+            # Taken before reading: rows written while reading are sent again next time.
+            until = get_sync_token_time(since=since)
+            changes = get_user_changes(user=request.user, since=since)
+
+            return Response(
+                {"token": encode_cursor([until.isoformat()]), **changes_to_representation(changes)},
+                status=status.HTTP_200_OK,
+            )
+
+        except ValidationError as e:
+            raise ValidationError(e)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,38 @@
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .notifications import user_group_name
+
+
+class ChangesConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Pushes the changes of `core.sync.notifications` to the clients of the connected user, so that
+    they sync when something changed instead of polling. Authenticated with the session cookie.
+
+    Clients may send `{"type": "ping"}` to keep the connection open through idle timeouts.
+    """
+
+    group_name = None
+
+    async def connect(self):
+        user = self.scope.get("user")
+
+        if user is None or not user.is_authenticated:
+            # Rejects the handshake.
+            await self.close()
+            return
+
+        self.group_name = user_group_name(user.id)
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if self.group_name is not None:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if isinstance(content, dict) and content.get("type") == "ping":
+            await self.send_json({"type": "pong"})
+
+    async def changes_push(self, event):
+        await self.send_json({"type": "changes", "kind": event["kind"], "action": event["action"], "ids": event["ids"]})
@@ -0,0 +1,142 @@
+import asyncio
+import multiprocessing
+import statistics
+import tempfile
+import time
+
+from channels.layers import InMemoryChannelLayer
+from django.core.management.base import BaseCommand, CommandError
+
+from core.common.channel_layers import UnixSocketChannelLayer
+
+GROUP = "benchmark"
+
+
+async def echo(layer, ready=None):
+    """
+    Joins `GROUP` and answers its messages: a pong per ping, the number of other messages seen on `count`.
+    """
+    channel = await layer.new_channel()
+    await layer.group_add(GROUP, channel)
+
+    if ready is not None:
+        ready.set()
+
+    received = 0
+
+    while True:
+        message = await layer.receive(channel)
+
+        if message["type"] == "ping":
+            await layer.send(message["reply"], {"type": "pong"})
+        elif message["type"] == "count":
+            await layer.send(message["reply"], {"type": "count", "received": received})
+            received = 0
+        elif message["type"] == "stop":
+            return
+        else:
+            received += 1
+
+
+def echo_process(directory: str, capacity: int, ready):
+    asyncio.run(echo(UnixSocketChannelLayer(directory=directory, capacity=capacity), ready))
+
+
+async def measure(layer, *, pings: int, burst: int) -> tuple[list[float], float, int]:
+    """
+    Round trips of `pings` group messages, then `burst` group messages in a row.
+    Returns the round trip times (ms), the burst throughput (messages/s) and the messages received.
+    """
+    reply = await layer.new_channel()
+    timings = []
+
+    for _ in range(pings):
+        started = time.perf_counter()
+        await layer.group_send(GROUP, {"type": "ping", "reply": reply})
+        await asyncio.wait_for(layer.receive(reply), timeout=5)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+
+    for index in range(burst):
+        await layer.group_send(GROUP, {"type": "message", "index": index})
+
+    await layer.group_send(GROUP, {"type": "count", "reply": reply})
+    received = (await asyncio.wait_for(layer.receive(reply), timeout=30))["received"]
+    throughput = received / (time.perf_counter() - started)
+
+    await layer.group_send(GROUP, {"type": "stop"})
+
+    return timings, throughput, received
+
+
+async def in_process(layer, *, pings: int, burst: int):
+    echo_task = asyncio.create_task(echo(layer))
+    await asyncio.sleep(0)
+
+    try:
+        return await measure(layer, pings=pings, burst=burst)
+    finally:
+        await echo_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the in-memory channel layer with the Unix socket one, in one process and across two: "
+        "round trip latency of a group message and a reply, and throughput of a burst of group messages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pings", type=int, default=2000)
+        parser.add_argument("--burst", type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        burst = options["burst"]
+        # Room for the whole burst: what is measured is the transport, not drops of full channels.
+        capacity = burst + 10
+
+        with tempfile.TemporaryDirectory() as directory:
+            results = [
+                ("in-memory, 1 process", asyncio.run(self.run_in_process(InMemoryChannelLayer, capacity, options))),
+                (
+                    "unix, 1 process",
+                    asyncio.run(
+                        self.run_in_process(
+                            lambda capacity: UnixSocketChannelLayer(directory=directory, capacity=capacity),
+                            capacity,
+                            options,
+                        ),
+                    ),
+                ),
+                ("unix, 2 processes", self.run_across_processes(directory, capacity, options)),
+            ]
+
+        for name, (timings, throughput, received) in results:
+            timings.sort()
+            self.stdout.write(
+                f"  {name:<22} round trip median {statistics.median(timings):.3f} ms, "
+                f"p99 {timings[int(len(timings) * 0.99)]:.3f} ms; "
+                f"burst {throughput:,.0f} messages/s ({received}/{burst} delivered)",
+            )
+
+    async def run_in_process(self, layer_class, capacity, options):
+        return await in_process(layer_class(capacity=capacity), pings=options["pings"], burst=options["burst"])
+
+    def run_across_processes(self, directory, capacity, options):
+        context = multiprocessing.get_context("fork")
+        ready = context.Event()
+        process = context.Process(target=echo_process, args=(directory, capacity, ready))
+        process.start()
+
+        try:
+            if not ready.wait(timeout=10):
+                raise CommandError("The echo process did not start.")
+
+            layer = UnixSocketChannelLayer(directory=directory, capacity=capacity)
+
+            return asyncio.run(measure(layer, pings=options["pings"], burst=options["burst"]))
+        finally:
+            process.join(timeout=10)
+
+            if process.is_alive():
+                process.kill()
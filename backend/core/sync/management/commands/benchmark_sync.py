@@ -0,0 +1,85 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from core.api.management.commands.check_query_counts import seed_account
+from core.api.pagination import encode_cursor
+from core.events.models import Event, RecurrenceRule
+from core.events.services import event_bulk_delete
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the sync endpoint for accounts of growing size: a full sync, and a delta sync after --changes "
+        "events were updated and as many deleted. The delta should cost the same whatever the size of the "
+        "account. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+        parser.add_argument("--calendars", type=int, default=10)
+        parser.add_argument("--changes", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        url = reverse("api:sync:sync")
+
+        with transaction.atomic():
+            for events in options["events"]:
+                user = seed_account(calendars=options["calendars"], events_per_calendar=events // options["calendars"])
+                client = Client()
+                client.force_login(user)
+
+                # The account as synced yesterday, then `--changes` updates and deletes since.
+                synced_at = timezone.now() - timedelta(days=1)
+                Event.objects.filter(user=user).update(updated_at=synced_at - timedelta(hours=1))
+                RecurrenceRule.objects.filter(event__user=user).update(updated_at=synced_at - timedelta(hours=1))
+                user.calendars.update(updated_at=synced_at - timedelta(hours=1))
+
+                ids = list(
+                    Event.objects.filter(user=user)
+                    .order_by("?")
+                    .values_list("id", flat=True)[: 2 * options["changes"]],
+                )
+                Event.objects.filter(id__in=ids[: options["changes"]]).update(
+                    title="Changed",
+                    updated_at=timezone.now(),
+                )
+                event_bulk_delete(user=user, event_ids=ids[options["changes"] :])
+
+                token = encode_cursor([synced_at.isoformat()])
+                response = client.get(f"{url}?token={token}")
+
+                if response.status_code != 200:
+                    raise CommandError(f"{url} returned {response.status_code}")
+
+                data = response.json()
+                if len(data["events"]) != options["changes"] or len(data["deleted"]["events"]) != options["changes"]:
+                    raise CommandError(f"{len(data["events"])} changed, {len(data["deleted"]["events"])} deleted")
+
+                full = self.measure(lambda: client.get(url), repeat=max(options["repeat"] // 5, 1))
+                delta = self.measure(lambda: client.get(f"{url}?token={token}"), repeat=options["repeat"])
+
+                self.stdout.write(
+                    f"  {Event.objects.filter(user=user).count():>7} events: full sync {full:.2f} ms, "
+                    f"delta sync of {options["changes"]} updates + {options["changes"]} deletes {delta:.2f} ms "
+                    "(median)",
+                )
+
+            transaction.set_rollback(True)
+
+    def measure(self, function, *, repeat: int) -> float:
+        timings = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return statistics.median(timings)
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sync.services import tombstones_purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS. "
+        "Meant to run periodically, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        deleted = tombstones_purge_expired(batch_size=options["batch_size"])
+
+        retention = settings.SYNC_TOMBSTONE_RETENTION_DAYS
+
+        self.stdout.write(f"Deleted {deleted} sync tombstones (SYNC_TOMBSTONE_RETENTION_DAYS={retention}).")
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from core.common.models import BaseModel
+
+User = get_user_model()
+
+
+class Tombstone(BaseModel):
+    """
+    A row deleted at `created_at`, kept for the delta sync of `user` (see `core.sync.selectors`).
+
+    Calendars, events and recurrence rules are hard-deleted; one tombstone is written per user
+    whose clients can hold the row, and purged after `SYNC_TOMBSTONE_RETENTION_DAYS`.
+    """
+
+    CALENDAR = "calendar"
+    EVENT = "event"
+    RECURRENCE_RULE = "recurrence_rule"
+
+    KIND_CHOICES = [
+        (CALENDAR, "Calendar"),
+        (EVENT, "Event"),
+        (RECURRENCE_RULE, "Recurrence rule"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.UUIDField()
+
+    class Meta:
+        verbose_name = "Tombstone"
+        verbose_name_plural = "Tombstones"
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="tombstone_user_created_idx"),
+        ]
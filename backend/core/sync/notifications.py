@@ -0,0 +1,75 @@
+"""
+Push of changes to connected clients, over WebSockets (see `core.sync.consumers`).
+
+The services call `changes_notify` in the transaction of a write, with the users whose
+clients hold the written rows. Once the transaction commits, every connected client of
+those users gets
+
+    {"type": "changes", "kind": "event", "action": "updated", "ids": ["..."]}
+
+and pulls the rows from the delta sync endpoint. `ids` is `null` past `MAX_PUSHED_IDS`.
+Pushes are best effort: nothing is sent for rolled back writes, a failing channel layer
+does not fail the write, and clients that were offline catch up on their next sync.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Iterable
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+# The most ids pushed in one notification, clients are told to sync beyond that.
+MAX_PUSHED_IDS = 500
+
+
+def user_group_name(user_id) -> str:
+    return f"sync.user.{user_id}"
+
+
+def changes_notify(*, kind: str, action: str, changes: Iterable[tuple]) -> None:
+    """
+    Pushes `kind` rows written with `action`, given as `(object_id, user ids)`: the users whose clients
+    hold the row, each getting only the ids of their rows. Sent once the current transaction commits.
+    """
+    if not settings.SYNC_PUSH_ENABLED:
+        return
+
+    ids_by_user = defaultdict(list)
+
+    for object_id, user_ids in changes:
+        for user_id in set(user_ids):
+            ids_by_user[user_id].append(str(object_id))
+
+    if not ids_by_user:
+        return
+
+    messages = [
+        (
+            user_group_name(user_id),
+            {
+                "type": "changes.push",
+                "kind": kind,
+                "action": action,
+                "ids": ids if len(ids) <= MAX_PUSHED_IDS else None,
+            },
+        )
+        for user_id, ids in ids_by_user.items()
+    ]
+
+    transaction.on_commit(lambda: async_to_sync(changes_send)(messages), robust=True)
+
+
+async def changes_send(messages: list[tuple[str, dict]]) -> None:
+    channel_layer = get_channel_layer()
+
+    if channel_layer is None:
+        return
+
+    await asyncio.gather(*(channel_layer.group_send(group, message) for group, message in messages))
@@ -0,0 +1,156 @@
+"""
+Delta sync: what changed for a user since a point in time.
+
+The rows a user's clients hold are their calendars, the events they own or that are
+in their calendars, and the recurrence rules of those events. Created and updated
+rows are found by `updated_at` (every write goes through `auto_now`), deleted ones
+by their `Tombstone`. Each part is a range scan on a `(user or calendar, updated_at)`
+index, so a sync reads the changed rows only, whatever the size of the account. The
+exception is the calendars of other users: finding them reads the calendar of every
+event of the user.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.calendar.models import Calendar
+from core.common.profiling import timed
+from core.common.utils import date_to_representation, datetime_to_representation
+from core.events.models import Event, RecurrenceRule
+
+from .models import Tombstone
+
+CALENDAR_VALUES = ("id", "user_id", "name", "description", "color", "is_visible", "created_at", "updated_at")
+
+EVENT_VALUES = (
+    "id",
+    "user_id",
+    "calendar_id",
+    "recurrence_id",
+    "title",
+    "description",
+    "start_time",
+    "end_time",
+    "color",
+    "is_all_day",
+    "created_at",
+    "updated_at",
+)
+
+RECURRENCE_RULE_VALUES = (
+    "id",
+    "frequency",
+    "monthly_type",
+    "interval",
+    "weekdays",
+    "weekday_ordinal",
+    "end_date",
+    "repeat_count",
+    "created_at",
+    "updated_at",
+)
+
+TOMBSTONE_KEYS = {
+    Tombstone.CALENDAR: "calendars",
+    Tombstone.EVENT: "events",
+    Tombstone.RECURRENCE_RULE: "recurrence_rules",
+}
+
+
+def get_sync_token_time(*, since: Optional[datetime]) -> datetime:
+    """
+    The time of the token handed out with the changes read now, see `SYNC_TOKEN_LAG_SECONDS`.
+    """
+    until = timezone.now() - timedelta(seconds=settings.SYNC_TOKEN_LAG_SECONDS)
+
+    return max(since, until) if since is not None else until
+
+
+def get_user_changes(*, user, since: Optional[datetime] = None) -> dict:
+    """
+    The calendars, events and recurrence rules created or updated after `since` (everything
+    without it), and the ids of the ones deleted after it. Apply the deletions last.
+
+    Calendars of other users come along with the events of `user` in them, and when they change.
+    """
+    calendars = Calendar.objects.filter(user=user)
+    # Calendars of other users holding events of `user`.
+    guest_calendars = Calendar.objects.filter(
+        id__in=Event.objects.filter(user=user).values("calendar_id"),
+    ).exclude(user=user)
+    events = Event.objects.filter(user=user)
+    # Events of other users in the calendars of `user`, through the `(calendar, updated_at)` index.
+    guest_events = Event.objects.filter(calendar_id__in=list(calendars.values_list("id", flat=True))).exclude(user=user)
+    tombstones = Tombstone.objects.filter(user=user)
+
+    if since is not None:
+        calendars = calendars.filter(updated_at__gt=since)
+        guest_calendars = guest_calendars.filter(updated_at__gt=since)
+        events = events.filter(updated_at__gt=since)
+        guest_events = guest_events.filter(updated_at__gt=since)
+        tombstones = tombstones.filter(created_at__gt=since)
+
+    calendar_rows = sorted(
+        [*calendars.values(*CALENDAR_VALUES), *guest_calendars.values(*CALENDAR_VALUES)],
+        key=lambda row: (row["updated_at"], row["id"]),
+    )
+    event_rows = sorted(
+        [*events.values(*EVENT_VALUES), *guest_events.values(*EVENT_VALUES)],
+        key=lambda row: (row["updated_at"], row["id"]),
+    )
+
+    # Calendars of changed events the client is not sent otherwise: the ones of other users, unchanged.
+    calendar_ids = {row["id"] for row in calendar_rows}
+    missing_calendar_ids = {row["calendar_id"] for row in event_rows} - calendar_ids
+
+    if missing_calendar_ids:
+        calendar_rows += (
+            Calendar.objects.filter(id__in=missing_calendar_ids).exclude(user=user).values(*CALENDAR_VALUES)
+        )
+
+    # Saving a rule always saves its event too, the changed rules are among the ones of the changed events.
+    rules = RecurrenceRule.objects.filter(id__in=[row["recurrence_id"] for row in event_rows if row["recurrence_id"]])
+
+    if since is not None:
+        rules = rules.filter(updated_at__gt=since)
+
+    deleted = {key: [] for key in TOMBSTONE_KEYS.values()}
+
+    for kind, object_id in tombstones.order_by("created_at").values_list("kind", "object_id"):
+        deleted[TOMBSTONE_KEYS[kind]].append(object_id)
+
+    return {
+        "calendars": calendar_rows,
+        "events": event_rows,
+        "recurrence_rules": list(rules.values(*RECURRENCE_RULE_VALUES)),
+        "deleted": deleted,
+    }
+
+
+@timed("serialize")
+def changes_to_representation(changes: dict) -> dict:
+    tz = timezone.get_current_timezone()
+
+    def row_to_representation(row: dict) -> dict:
+        return {
+            key: (
+                datetime_to_representation(value, tz)
+                if isinstance(value, datetime)
+                else date_to_representation(value)
+                if key == "end_date"
+                else str(value)
+                if key == "id" or key.endswith("_id") and value is not None
+                else value
+            )
+            for key, value in row.items()
+        }
+
+    return {
+        "calendars": [row_to_representation(row) for row in changes["calendars"]],
+        "events": [row_to_representation(row) for row in changes["events"]],
+        "recurrence_rules": [row_to_representation(row) for row in changes["recurrence_rules"]],
+        "deleted": {key: [str(object_id) for object_id in ids] for key, ids in changes["deleted"].items()},
+    }
@@ -0,0 +1,39 @@
+from datetime import timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Tombstone
+
+
+def tombstones_create(*, kind: str, deletions: Iterable[tuple], batch_size: int = 1000) -> None:
+    """
+    Records deleted `kind` rows, given as `(object_id, user ids)`: the users whose clients can hold the row.
+    Call it in the transaction of the delete.
+    """
+    Tombstone.objects.bulk_create(
+        [
+            Tombstone(user_id=user_id, kind=kind, object_id=object_id)
+            for object_id, user_ids in deletions
+            for user_id in set(user_ids)
+        ],
+        batch_size=batch_size,
+    )
+
+
+def tombstones_purge_expired(*, batch_size: int = 5000) -> int:
+    """
+    Deletes the tombstones older than `SYNC_TOMBSTONE_RETENTION_DAYS`, `batch_size` rows at a time.
+    """
+    expired_before = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    deleted = 0
+
+    while True:
+        ids = list(Tombstone.objects.filter(created_at__lt=expired_before).values_list("id", flat=True)[:batch_size])
+
+        if not ids:
+            return deleted
+
+        Tombstone.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
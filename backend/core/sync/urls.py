@@ -0,0 +1,10 @@
+from django.urls import path
+from django.urls.resolvers import URLPattern
+
+from .apis import SyncApi
+
+app_name = "sync"
+
+urlpatterns: list[URLPattern] = [
+    path("", SyncApi.as_view(), name="sync"),
+]
@@ -1,3 +1,7 @@
+import gc
+import math
+import os
+
 # If you are not having memory issues, just delete this.
 # This is primarily to prevent memory leaks
 # Based on https://devcenter.heroku.com/articles/python-gunicorn
@@ -6,3 +10,96 @@
 # https://docs.gunicorn.org/en/latest/settings.html#max-requests-jitter
 max_requests = 1200
 max_requests_jitter = 100
+
+"""
+`GUNICORN_PRESET`, worker and thread counts following the CPUs of the container and the database
+connections its workers may hold (`DB_MAX_CONNECTIONS`, see `config.settings.database`):
+
+    sync     2 x CPUs + 1 single threaded workers (`config.wsgi`), a persistent connection each.
+             Simplest, but a slow request or client holds a whole worker
+    gthread  a worker per CPU (`config.wsgi`), each running `GUNICORN_THREADS` requests at once
+             (default: its share of the connections, at most 4), a persistent connection per thread
+    uvicorn  a uvicorn worker per CPU (`config.asgi`: HTTP and the WebSockets of `core.sync`), the
+             connections lent by a pool per worker (`DB_CONNECTION_MODE=pool`)
+
+No preset opens more connections than `DB_MAX_CONNECTIONS`. `WEB_CONCURRENCY` overrides the number
+of workers, `DB_CONNECTION_MODE` the way they connect. The app is loaded before the workers fork
+(`preload_app`) so that they share its memory, copy-on-write; `GUNICORN_PRELOAD=False` loads it in
+every worker (e.g. to restart workers one at a time on new code with `kill -HUP`).
+"""
+
+
+def cpu_count() -> int:
+    cpus = len(os.sched_getaffinity(0))
+
+    # A container limited with `--cpus` still sees every CPU of the host.
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+    except (OSError, ValueError):
+        return cpus
+
+    if quota == "max":
+        return cpus
+
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+preset = os.environ.get("GUNICORN_PRESET", "gthread")
+cpus = cpu_count()
+db_connections = int(os.environ.get("DB_MAX_CONNECTIONS", 80))
+
+if preset == "sync":
+    workers = 2 * cpus + 1
+    db_connection_mode = "persistent"
+elif preset == "gthread":
+    workers = cpus
+    db_connection_mode = "persistent"
+elif preset == "uvicorn":
+    workers = cpus
+    db_connection_mode = "pool"
+else:
+    raise ValueError(f"GUNICORN_PRESET must be one of sync, gthread, uvicorn, not {preset!r}")
+
+workers = int(os.environ.get("WEB_CONCURRENCY") or min(workers, db_connections))
+
+if preset == "gthread":
+    threads = int(os.environ.get("GUNICORN_THREADS") or max(1, min(4, db_connections // workers)))
+    worker_class = "gthread"
+elif preset == "uvicorn":
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+wsgi_app = "config.asgi:application" if preset == "uvicorn" else "config.wsgi:application"
+
+# Read by the settings of the workers (`config.settings.database`): the pools split the connections between them.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+os.environ.setdefault("DB_CONNECTION_MODE", db_connection_mode)
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True").lower() in ("true", "1", "yes")
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+# Longer than nginx keeps idle upstream connections.
+keepalive = 5
+
+# The workers' heartbeat files, on tmpfs: a slow disk would have them killed for not answering.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+
+def when_ready(server):
+    server.log.info(
+        "Preset %s: %d workers x %d threads (%s), DB_CONNECTION_MODE=%s, DB_MAX_CONNECTIONS=%d, preload %s",
+        preset,
+        server.cfg.workers,
+        server.cfg.threads,
+        server.cfg.worker_class_str,
+        os.environ["DB_CONNECTION_MODE"],
+        db_connections,
+        server.cfg.preload_app,
+    )
+
+    if server.cfg.preload_app:
+        # Out of the collector's reach, the objects of the app are never written to by the workers' garbage
+        # collections, and their pages stay shared.
+        gc.freeze()